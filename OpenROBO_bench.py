@@ -0,0 +1,690 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+OpenROBO bench
+
+Benchmarks of OpenROBO_utils.py. They live apart from it so that
+'OpenROBO_utils.py update' does not download them onto every subsystem.
+
+Copyright (c) 2017 r01hee
+
+This software is released under the MIT License.
+http://opensource.org/licenses/mit-license.php
+"""
+
+import sys
+import os
+import os.path
+import argparse
+import glob
+from collections import OrderedDict
+import socket
+import shutil
+import io
+import time
+import tempfile
+import threading
+import json
+import platform
+import ConfigParser
+
+from OpenROBO_utils import CONFIG_FILE_PATH, VERSION, DEFAULT_SYNC_MULTICAST_RATE, SYNC_FEATURES, default_config, cpu_time, peak_rss, kernel_sendfile, file_digest
+from OpenROBO_utils import CPrototypeParser, CStructParser, CsubthreadinittermTermParser, CHeaderScanner, HeaderParseCache, SyncStream, SyncDigestCache, SyncStore, SourceCodeSync
+from OpenROBO_utils import gen_sources, sync_features
+
+
+class SyntheticHeaderCorpus:
+    """
+    Generates annotated OpenROBO headers for benchmarks.
+    The output is deterministic for the same parameters.
+    """
+
+    arg_types = ['int', 'double', 'float', 'char']
+
+    def __init__(self, headers=100, functions=20, args=4, array_num=8, structs=2, subthreads=0, inits=0, terms=0):
+        self.headers = headers
+        self.functions = functions
+        self.args = args
+        self.array_num = array_num
+        self.structs = structs
+        self.subthreads = subthreads
+        self.inits = inits
+        self.terms = terms
+
+    def genFunction(self, f, h, n):
+        f.write('/**\n * @brief synthetic function %d of header %d\n * MessageFunction@OpenROBO\n' % (n, h))
+        args = []
+        for a in xrange(self.args):
+            _type = self.arg_types[(n + a) % len(self.arg_types)]
+            kind = a % 3
+            if kind == 0:
+                f.write(' * @param[in] in%d input\n' % (a))
+                args.append('%s in%d' % (_type, a))
+            elif kind == 1:
+                f.write(' * @param[in] array%d input array\n' % (a))
+                args.append('%s array%d[%d]' % (_type, a, self.array_num))
+            else:
+                f.write(' * @param[out] out%d output\n' % (a))
+                args.append('%s *out%d' % (_type, a))
+        f.write(' */\nint Synthetic%d_Function%d(%s);\n\n' % (h, n, ', '.join(args)))
+
+    def genStruct(self, f, h, n):
+        f.write('/**\n * @brief synthetic struct %d of header %d\n * ReadWrite@OpenROBO\n */\n' % (n, h))
+        f.write('struct Synthetic%d_Struct%d {\n' % (h, n))
+        for e in xrange(max(1, self.args)):
+            _type = self.arg_types[(n + e) % len(self.arg_types)]
+            if e % 2:
+                f.write('\t%s element%d[%d];\n' % (_type, e, self.array_num))
+            else:
+                f.write('\t%s element%d;\n' % (_type, e))
+        f.write('};\n\n')
+
+    def genMarker(self, f, h, n, marker, prototype):
+        f.write('/**\n * @brief synthetic %s %d of header %d\n * %s@OpenROBO\n */\n' % (marker, n, h, marker))
+        f.write(prototype % (h, marker, n))
+
+    def genHeader(self, h):
+        f = io.BytesIO()
+        f.write('#ifndef SYNTHETIC%d_H\n#define SYNTHETIC%d_H\n\n' % (h, h))
+        for n in xrange(self.functions):
+            self.genFunction(f, h, n)
+        for n in xrange(self.structs):
+            self.genStruct(f, h, n)
+        for n in xrange(self.subthreads):
+            self.genMarker(f, h, n, 'Subthread', 'void *Synthetic%d_%s%d(void *arg);\n\n')
+        for n in xrange(self.inits):
+            self.genMarker(f, h, n, 'init', 'int Synthetic%d_%s%d(void);\n\n')
+        for n in xrange(self.terms):
+            self.genMarker(f, h, n, 'term', 'void Synthetic%d_%s%d(void);\n\n')
+        f.write('#endif\n')
+        return f.getvalue()
+
+    def write(self, directory):
+        paths = []
+        for h in xrange(self.headers):
+            path = os.path.join(directory, "Synthetic%04d.h" % (h))
+            f = open(path, 'w')
+            f.write(self.genHeader(h))
+            f.close()
+            paths.append(path)
+        return paths
+
+
+class BenchmarkSuite:
+    """
+    Times header parsing, source generation and a loopback sync on a
+    SyntheticHeaderCorpus. run() returns the results as a dict which is
+    stored as JSON to compare versions.
+    """
+
+    def __init__(self, corpus, clients=4, repeat=3, send_size=32, features=SYNC_FEATURES, multicast=None, multicast_rate=DEFAULT_SYNC_MULTICAST_RATE):
+        self.corpus = corpus
+        self.clients = clients
+        self.repeat = repeat
+        self.features = features
+        self.send_size = send_size
+        # GROUP:PORT the TP multicasts to on the loopback interface
+        self.multicast = multicast
+        self.multicast_rate = multicast_rate
+        self.server_sent = 0
+        self.multicast_repairs = 0
+        self.server_sends = 0
+        self.work_dir = None
+        self.headers = []
+
+    def measure(self, func):
+        best_time = None
+        for _ in xrange(self.repeat):
+            start = time.time()
+            func()
+            elapsed = time.time() - start
+            if best_time is None or elapsed < best_time:
+                best_time = elapsed
+        return best_time
+
+    def benchParse(self, results):
+        results['parse'] = self.measure(lambda: CHeaderScanner().parseFiles(self.headers))
+
+        cache_path = os.path.join(self.work_dir, 'parse_cache')
+        scanner = CHeaderScanner(HeaderParseCache(cache_path))
+        scanner.parseFiles(self.headers)
+        scanner.cache.save()
+        results['parse_warm_cache'] = self.measure(lambda: CHeaderScanner(HeaderParseCache(cache_path)).parseFiles(self.headers))
+
+    def genClientSources(self, name, out_dir):
+        scanner = CHeaderScanner()
+        scanner.parseFiles(self.headers)
+        gen_args = argparse.Namespace(name=name, out_src_dir=out_dir, out_header_dir=out_dir, quiet=True)
+        gen_sources(gen_args, scanner, [], [])
+
+    def benchGenerate(self, results):
+        scanner = CHeaderScanner()
+        scanner.parseFiles(self.headers)
+        out_dir = os.path.join(self.work_dir, 'generate')
+        os.mkdir(out_dir)
+        gen_args = argparse.Namespace(name='BENCH', out_src_dir=out_dir, out_header_dir=out_dir, quiet=True)
+
+        def generate():
+            for p in os.listdir(out_dir):
+                os.remove(os.path.join(out_dir, p))
+            gen_sources(gen_args, scanner, [], [])
+        results['generate'] = self.measure(generate)
+        results['generate_bytes'] = sum(os.path.getsize(os.path.join(out_dir, p)) for p in os.listdir(out_dir))
+
+    def setupSyncDirs(self):
+        names = ['S%02d' % (n) for n in xrange(self.clients)]
+        sync_dir = os.path.join(self.work_dir, 'sync')
+        source_dir = os.path.join(sync_dir, 'source')
+        os.makedirs(source_dir)
+        for name in names:
+            self.genClientSources(name, source_dir)
+        dirs = {}
+        for name in ['TP'] + names:
+            d = os.path.join(sync_dir, name)
+            os.mkdir(d)
+            dirs[name] = d
+        return names, source_dir, dirs
+
+    def resetSyncDirs(self, names, source_dir, dirs):
+        for d in dirs.values():
+            for p in os.listdir(d):
+                os.remove(os.path.join(d, p))
+        for name in names:
+            for peer in names:
+                for ext in ['cpp', 'h']:
+                    p = os.path.join(dirs[name], '%s_Command.%s' % (peer, ext))
+                    if peer == name:
+                        shutil.copy(os.path.join(source_dir, '%s_Command.%s' % (peer, ext)), p)
+                    else:
+                        # a stale copy makes the client request the peer
+                        open(p, 'w').close()
+
+    def digestCachePath(self, name):
+        return os.path.join(self.work_dir, 'sync', 'digests_%s' % (name))
+
+    def runSync(self, names, dirs, port):
+        """ returns the bytes the TP sent and received """
+        features = SYNC_FEATURES
+        if self.multicast:
+            features += ('multicast=%s' % (self.multicast),)
+        server = SourceCodeSync('TP', dirs['TP'], dirs['TP'], features=features, digest_cache=SyncDigestCache(self.digestCachePath('TP')))
+        server.multicast_if = '127.0.0.1'
+        server.multicast_rate = self.multicast_rate
+        serversock = server.listen(port)
+        server_thread = threading.Thread(target=server.server, args=(port, len(names), serversock))
+        server_thread.start()
+        self.runClients(names, dirs, port)
+        server_thread.join()
+        self.server_sends = server.sends
+        self.server_sent = server.bytes_sent + server.multicast_sent
+        self.multicast_repairs = server.multicast_repairs
+        return server.bytes_sent + server.bytes_received
+
+    def runClients(self, names, dirs, port):
+        def run_client(client):
+            client.client('127.0.0.1', port)
+        client_threads = []
+        for name in names:
+            client = SourceCodeSync(name, dirs[name], dirs[name], features=self.features + (('multicast',) if self.multicast else ()), digest_cache=SyncDigestCache(self.digestCachePath(name)))
+            client.multicast_if = '127.0.0.1'
+            t = threading.Thread(target=run_client, args=(client,))
+            t.start()
+            client_threads.append(t)
+        for t in client_threads:
+            t.join()
+
+    def benchSync(self, results):
+        names, source_dir, dirs = self.setupSyncDirs()
+        port = find_free_port()
+        sync_time = None
+        unchanged_time = None
+        stdout = sys.stdout
+        for _ in xrange(self.repeat):
+            self.resetSyncDirs(names, source_dir, dirs)
+            sys.stdout = open(os.devnull, 'w')
+            try:
+                start = time.time()
+                cpu = cpu_time()
+                wire_bytes = self.runSync(names, dirs, port)
+                elapsed = time.time() - start
+                cpu = cpu_time() - cpu
+                server_sends = self.server_sends
+                server_sent = self.server_sent
+                multicast_repairs = self.multicast_repairs
+                # every file is already up to date in a second sync
+                start = time.time()
+                unchanged_wire_bytes = self.runSync(names, dirs, port)
+                unchanged_elapsed = time.time() - start
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            if sync_time is None or elapsed < sync_time:
+                sync_time = elapsed
+                sync_cpu = cpu
+                sync_server_sends = server_sends
+                sync_server_sent = server_sent
+                sync_multicast_repairs = multicast_repairs
+            if unchanged_time is None or unchanged_elapsed < unchanged_time:
+                unchanged_time = unchanged_elapsed
+        self.verifySync(names, source_dir, dirs)
+        results['sync'] = sync_time
+        # every Command pair is uploaded once and downloaded by each peer
+        results['sync_bytes'] = sum(os.path.getsize(os.path.join(source_dir, '%s_Command.%s' % (name, ext))) for name in names for ext in ['cpp', 'h']) * len(names)
+        results['sync_wire_bytes'] = wire_bytes
+        results['sync_cpu'] = sync_cpu
+        results['sync_tp_sends'] = sync_server_sends
+        results['sync_tp_sent_bytes'] = sync_server_sent
+        if self.multicast:
+            results['sync_multicast_repairs'] = sync_multicast_repairs
+        results['sync_unchanged'] = unchanged_time
+        results['sync_unchanged_wire_bytes'] = unchanged_wire_bytes
+
+    def sendOverLoopback(self, path, send, recv=None):
+        """ sends the file at path with send(stream, f, size) to a thread reading it with recv(stream, size) """
+        serversock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        serversock.bind(('127.0.0.1', 0))
+        serversock.listen(1)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sender.connect(serversock.getsockname())
+        receiver, _ = serversock.accept()
+        serversock.close()
+        size = os.path.getsize(path)
+        received = []
+
+        def receive():
+            stream = SyncStream(receiver)
+            if recv is not None:
+                recv(stream, size)
+                received.append(size)
+            else:
+                received.append(sum(len(chunk) for chunk in stream.readChunks(size)))
+        t = threading.Thread(target=receive)
+        t.start()
+        f = open(path, 'rb')
+        try:
+            send(SyncStream(sender), f, size)
+        finally:
+            f.close()
+            t.join()
+            sender.close()
+            receiver.close()
+        if received != [size]:
+            raise Exception('loopback send: %s bytes of %d received' % (received, size))
+
+    def benchSend(self, results):
+        path = os.path.join(self.work_dir, 'send.bin')
+        f = open(path, 'wb')
+        block = os.urandom(1024 * 1024)
+        for _ in xrange(self.send_size):
+            f.write(block)
+        f.close()
+        del block
+        results['send_bytes'] = self.send_size * 1024 * 1024
+
+        def read_all(stream, f, size):
+            # what sendFile did before SyncStream.sendFrom()
+            stream.sendall(f.read(size))
+        # peak RSS only grows, so the paths run in order of expected memory use
+        modes = [('send_buffer', lambda: self.sendOverLoopback(path, SyncStream.sendFromBuffer)),
+                 ('recv_file', lambda: self.recvOverLoopback(path, 0)),
+                 ('recv_file_zlib', lambda: self.recvOverLoopback(path, 6)),
+                 ('send_read_all', lambda: self.sendOverLoopback(path, read_all))]
+        if kernel_sendfile is not None:
+            modes.insert(0, ('send_sendfile', lambda: self.sendOverLoopback(path, SyncStream.sendFromKernel)))
+        for name, func in modes:
+            rss = peak_rss()
+            results[name] = self.measure(func)
+            results['%s_rss_kb' % (name)] = peak_rss() - rss
+        if file_digest(os.path.join(self.work_dir, 'recv', os.path.basename(path))) != file_digest(path):
+            raise Exception('loopback receive: %s differs' % (path))
+
+    def recvOverLoopback(self, path, level):
+        """ sends the file at path with SourceCodeSync.sendFile to recvFile, with a sha1 trailer """
+        recv_dir = os.path.join(self.work_dir, 'recv')
+        if not os.path.isdir(recv_dir):
+            os.mkdir(recv_dir)
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        sender = SourceCodeSync('TP')
+        receiver = SourceCodeSync('S00', recv_dir, recv_dir)
+
+        def send(stream, f, size):
+            stream.compress_level = level
+            stream.checksum = True
+            sender.sendFile(stream, path)
+
+        def recv(stream, size):
+            stream.compress_level = level
+            stream.checksum = True
+            receiver.recvToFile(stream, recv_dir)
+        try:
+            self.sendOverLoopback(path, send, recv)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    def verifySync(self, names, source_dir, dirs):
+        for name in names:
+            for peer in names:
+                for ext in ['cpp', 'h']:
+                    base = '%s_Command.%s' % (peer, ext)
+                    if open(os.path.join(dirs[name], base)).read() != open(os.path.join(source_dir, base)).read():
+                        raise Exception('loopback sync: %s of %s differs' % (base, name))
+
+    def benchDaemon(self, results):
+        """
+        Starts a TP daemon, syncs every subsystem once and then times one
+        subsystem resyncing alone, unchanged and after a change of its files.
+        """
+        names, source_dir, dirs = self.setupSyncDirs()
+        self.resetSyncDirs(names, source_dir, dirs)
+        port = find_free_port()
+        server = SourceCodeSync('TP', dirs['TP'], dirs['TP'], digest_cache=SyncDigestCache(self.digestCachePath('TP')))
+        serversock = server.listen(port)
+        stop = threading.Event()
+        store = SyncStore(os.path.join(self.work_dir, 'sync', 'store'))
+        server_thread = threading.Thread(target=server.daemon, args=(port, store, names, 10.0, serversock, stop))
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            server_thread.start()
+            start = time.time()
+            self.runClients(names, dirs, port)
+            results['daemon_first_sync'] = time.time() - start
+            self.verifySync(names, source_dir, dirs)
+            results['daemon_resync_one'] = self.measure(lambda: self.runClients(names[:1], dirs, port))
+
+            def push_change():
+                for ext in ['cpp', 'h']:
+                    for d in [source_dir, dirs[names[0]]]:
+                        f = open(os.path.join(d, '%s_Command.%s' % (names[0], ext)), 'a')
+                        f.write('// changed\n')
+                        f.close()
+                self.runClients(names[:1], dirs, port)
+            results['daemon_push_one'] = self.measure(push_change)
+            results['daemon_pull_one'] = self.measure(lambda: self.runClients(names[1:2], dirs, port))
+            self.verifySync(names[:2], source_dir, dirs)
+            results['daemon_version'] = store.version(names[0])
+        finally:
+            stop.set()
+            server_thread.join()
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    def run(self, phases=('parse', 'generate', 'sync', 'send')):
+        self.work_dir = tempfile.mkdtemp(prefix='OpenROBO_bench_')
+        results = OrderedDict()
+        try:
+            header_dir = os.path.join(self.work_dir, 'header')
+            os.mkdir(header_dir)
+            self.headers = self.corpus.write(header_dir)
+            results['headers'] = len(self.headers)
+            results['header_bytes'] = sum(os.path.getsize(h) for h in self.headers)
+            if 'parse' in phases:
+                self.benchParse(results)
+            if 'generate' in phases:
+                self.benchGenerate(results)
+            if 'sync' in phases:
+                self.benchSync(results)
+            if 'send' in phases:
+                self.benchSend(results)
+            if 'daemon' in phases:
+                self.benchDaemon(results)
+        finally:
+            shutil.rmtree(self.work_dir)
+            self.work_dir = None
+        return results
+
+
+def find_free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def bench_parse_main(args):
+    headers = args.header
+    if not headers:
+        headers = glob.glob(args.header_dir + "/*.h")
+
+    three_pass_time = None
+    for _ in xrange(args.repeat):
+        start = time.time()
+        c = CPrototypeParser()
+        s = CStructParser()
+        subthreadinitterm = CsubthreadinittermTermParser()
+        for h in headers:
+            c.parseFromFile(h)
+        for h in headers:
+            s.parseFromFile(h)
+        for h in headers:
+            subthreadinitterm.parseFromFile(h)
+        elapsed = time.time() - start
+        if three_pass_time is None or elapsed < three_pass_time:
+            three_pass_time = elapsed
+
+    single_pass_time = None
+    for _ in xrange(args.repeat):
+        start = time.time()
+        scanner = CHeaderScanner()
+        for h in headers:
+            scanner.parseFromFile(h)
+        elapsed = time.time() - start
+        if single_pass_time is None or elapsed < single_pass_time:
+            single_pass_time = elapsed
+
+    if repr(c.infos) != repr(scanner.prototype_parser.infos) or repr(s.infos) != repr(scanner.struct_parser.infos) or repr(subthreadinitterm) != repr(scanner.subthreadinitterm_parser):
+        print("error: single-pass result differs from three-pass result")
+        exit(1)
+
+    print("headers: %d" % (len(headers)))
+    print("three-pass : %.6f sec" % (three_pass_time))
+    print("single-pass: %.6f sec" % (single_pass_time))
+    print("speedup    : %.2fx" % (three_pass_time / max(single_pass_time, 1e-9)))
+
+
+def bench_jobs_main(args):
+    corpus_dir = tempfile.mkdtemp(prefix='OpenROBO_bench_')
+    try:
+        corpus = SyntheticHeaderCorpus(headers=args.headers, functions=args.functions)
+        headers = corpus.write(corpus_dir)
+        print("headers: %d, functions: %d" % (len(headers), len(headers) * args.functions))
+
+        serial_result = None
+        serial_time = None
+        for jobs in args.jobs:
+            best_time = None
+            for _ in xrange(args.repeat):
+                start = time.time()
+                scanner = CHeaderScanner()
+                scanner.parseFiles(headers, jobs)
+                elapsed = time.time() - start
+                if best_time is None or elapsed < best_time:
+                    best_time = elapsed
+            result = repr((scanner.prototype_parser.infos, scanner.struct_parser.infos, scanner.subthreadinitterm_parser))
+            if serial_result is None:
+                serial_result = result
+                serial_time = best_time
+            elif result != serial_result:
+                print("error: result with %d jobs differs" % (jobs))
+                exit(1)
+            print("jobs %2d: %.6f sec (%.2fx)" % (jobs, best_time, serial_time / max(best_time, 1e-9)))
+    finally:
+        shutil.rmtree(corpus_dir)
+
+
+def bench_render_main(args):
+    corpus = SyntheticHeaderCorpus(headers=1, functions=args.functions, args=args.args, structs=args.structs)
+    scanner = CHeaderScanner()
+    scanner.parseText(corpus.genHeader(0))
+    out_dir = tempfile.mkdtemp(prefix='OpenROBO_bench_')
+    try:
+        gen_args = argparse.Namespace(name='BENCH', out_src_dir=out_dir, out_header_dir=out_dir, quiet=True)
+        best_time = None
+        for _ in xrange(args.repeat):
+            for p in os.listdir(out_dir):
+                os.remove(os.path.join(out_dir, p))
+            start = time.time()
+            gen_sources(gen_args, scanner, [], [])
+            elapsed = time.time() - start
+            if best_time is None or elapsed < best_time:
+                best_time = elapsed
+        size = sum(os.path.getsize(os.path.join(out_dir, p)) for p in os.listdir(out_dir))
+    finally:
+        shutil.rmtree(out_dir)
+    print("functions: %d, structs: %d, output: %d bytes" % (args.functions, args.structs, size))
+    print("render+write: %.6f sec, %.0f functions/sec" % (best_time, args.functions / max(best_time, 1e-9)))
+
+
+def bench_suite_main(args):
+    corpus = SyntheticHeaderCorpus(headers=args.headers, functions=args.functions, args=args.args, array_num=args.array_num, structs=args.structs, subthreads=args.subthreads, inits=args.inits, terms=args.terms)
+    suite = BenchmarkSuite(corpus, clients=args.clients, repeat=args.repeat, send_size=args.send_size)
+    report = OrderedDict()
+    report['version'] = VERSION
+    report['python'] = platform.python_version()
+    report['time'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    report['params'] = OrderedDict((k, getattr(args, k)) for k in ['headers', 'functions', 'args', 'array_num', 'structs', 'subthreads', 'inits', 'terms', 'clients', 'send_size', 'repeat'])
+    report['results'] = suite.run(args.phases)
+
+    for k, v in report['results'].items():
+        if isinstance(v, float) and k.startswith(('send_', 'recv_')):
+            print("%-20s %.6f sec (%.1f MB/s)" % (k, v, report['results']['send_bytes'] / max(v, 1e-9) / 1e6))
+        elif isinstance(v, float):
+            print("%-20s %.6f sec" % (k, v))
+        else:
+            print("%-20s %d" % (k, v))
+
+    if args.compare:
+        f = open(args.compare, 'r')
+        baseline = json.load(f)
+        f.close()
+        print("\ncompared with %s (ver.%s)" % (args.compare, baseline.get('version')))
+        for k, v in report['results'].items():
+            old = baseline.get('results', {}).get(k)
+            if not isinstance(v, float) or not old:
+                continue
+            print("%-20s %.6f -> %.6f sec (%.2fx)" % (k, old, v, old / max(v, 1e-9)))
+
+    if args.output:
+        f = open(args.output, 'w')
+        json.dump(report, f, indent=2)
+        f.write('\n')
+        f.close()
+
+
+def bench_daemon_main(args):
+    corpus = SyntheticHeaderCorpus(headers=args.headers, functions=args.functions)
+    suite = BenchmarkSuite(corpus, clients=args.clients, repeat=args.repeat)
+    results = suite.run(['daemon'])
+    print("clients: %d" % (args.clients))
+    print("first sync of all     : %.6f sec" % (results['daemon_first_sync']))
+    print("one resync, unchanged : %.6f sec" % (results['daemon_resync_one']))
+    print("one push of a change  : %.6f sec (version %d)" % (results['daemon_push_one'], results['daemon_version']))
+    print("one pull of the change: %.6f sec" % (results['daemon_pull_one']))
+
+
+def bench_multicast_main(args):
+    corpus = SyntheticHeaderCorpus(headers=args.headers, functions=args.functions)
+    rate = int(args.rate * 1000 * 1000)
+    print("TP bytes sent: unicast over TCP vs multicast on the loopback (%s, %d Mbit/s) plus TCP" % (args.group, args.rate))
+    print("%8s %14s %10s %14s %10s %9s" % ("clients", "unicast bytes", "sec", "multicast bytes", "sec", "repaired"))
+    for clients in args.clients:
+        unicast = BenchmarkSuite(corpus, clients=clients, repeat=args.repeat).run(['sync'])
+        multicast = BenchmarkSuite(corpus, clients=clients, repeat=args.repeat, multicast=args.group, multicast_rate=rate).run(['sync'])
+        print("%8d %14d %10.3f %14d %10.3f %9d" % (clients, unicast['sync_tp_sent_bytes'], unicast['sync'], multicast['sync_tp_sent_bytes'], multicast['sync'], multicast['sync_multicast_repairs']))
+
+
+def bench_sync_main(args):
+    corpus = SyntheticHeaderCorpus(headers=args.headers, functions=args.functions)
+    args.name = None
+    features = sync_features(args)
+    suite = BenchmarkSuite(corpus, clients=args.clients, repeat=args.repeat, features=features)
+    results = suite.run(['sync'])
+    print("clients: %d, protocol: %s" % (args.clients, " ".join(features) or "original"))
+    print("sync   : %.6f sec, %d bytes of files, %d bytes on the wire" % (results['sync'], results['sync_bytes'], results['sync_wire_bytes']))
+    print("resync : %.6f sec, %d bytes on the wire (nothing changed)" % (results['sync_unchanged'], results['sync_unchanged_wire_bytes']))
+    print("cpu    : %.6f sec for the TP and all subsystems, wire/file bytes: %.3f" % (results['sync_cpu'], float(results['sync_wire_bytes']) / max(results['sync_bytes'], 1)))
+    print("sends  : %d by the TP" % (results['sync_tp_sends']))
+
+
+def main():
+    config = ConfigParser.SafeConfigParser(default_config)
+    config.read(CONFIG_FILE_PATH)
+
+    parser = argparse.ArgumentParser(description="benchmark OpenROBO_utils itself")
+    subparsers = parser.add_subparsers()
+
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ver.' + VERSION)
+
+    parser_parse = subparsers.add_parser('parse', help="compare single-pass header scanning with three-pass parsing")
+    group = parser_parse.add_mutually_exclusive_group()
+    group.add_argument('--header-dir', type=str, help="directory includes headers(*.h)", default=config.get('DEFAULT', 'header_dir'))
+    group.add_argument('--header', nargs='+', help="headers(*.h)")
+    parser_parse.add_argument('-r', '--repeat', type=int, help="number of repetitions; the best time is reported", default=5)
+    parser_parse.set_defaults(func=bench_parse_main)
+
+    parser_jobs = subparsers.add_parser('jobs', help="measure parallel header parsing on a synthetic corpus")
+    parser_jobs.add_argument('-j', '--jobs', type=int, nargs='+', help="numbers of processes to compare; the first one is the reference", default=[1, 2, 4, 8])
+    parser_jobs.add_argument('--headers', type=int, help="number of synthetic headers", default=200)
+    parser_jobs.add_argument('--functions', type=int, help="number of MessageFunctions per header", default=50)
+    parser_jobs.add_argument('-r', '--repeat', type=int, help="number of repetitions; the best time is reported", default=3)
+    parser_jobs.set_defaults(func=bench_jobs_main)
+
+    parser_render = subparsers.add_parser('render', help="measure source code generation throughput on a synthetic interface")
+    parser_render.add_argument('--functions', type=int, help="number of MessageFunctions", default=1000)
+    parser_render.add_argument('--args', type=int, help="number of arguments per MessageFunction", default=6)
+    parser_render.add_argument('--structs', type=int, help="number of ReadWrite structs", default=50)
+    parser_render.add_argument('-r', '--repeat', type=int, help="number of repetitions; the best time is reported", default=5)
+    parser_render.set_defaults(func=bench_render_main)
+
+    parser_suite = subparsers.add_parser('suite', help="time parsing, generation and a loopback sync on a synthetic corpus")
+    parser_suite.add_argument('--headers', type=int, help="number of synthetic headers", default=50)
+    parser_suite.add_argument('--functions', type=int, help="number of MessageFunctions per header", default=20)
+    parser_suite.add_argument('--args', type=int, help="number of arguments per MessageFunction", default=4)
+    parser_suite.add_argument('--array-num', type=int, help="number of elements of array arguments", default=8)
+    parser_suite.add_argument('--structs', type=int, help="number of ReadWrite structs per header", default=2)
+    parser_suite.add_argument('--subthreads', type=int, help="number of Subthread markers per header", default=1)
+    parser_suite.add_argument('--inits', type=int, help="number of init markers per header", default=1)
+    parser_suite.add_argument('--terms', type=int, help="number of term markers per header", default=1)
+    parser_suite.add_argument('--clients', type=int, help="number of subsystems in the loopback sync", default=4)
+    parser_suite.add_argument('--send-size', type=int, metavar='MB', help="size of the file sent over loopback in the send phase", default=32)
+    parser_suite.add_argument('--phases', nargs='+', choices=['parse', 'generate', 'sync', 'send'], help="phases to run", default=['parse', 'generate', 'sync', 'send'])
+    parser_suite.add_argument('-r', '--repeat', type=int, help="number of repetitions; the best time is reported", default=3)
+    parser_suite.add_argument('-o', '--output', help="write the results to this JSON file")
+    parser_suite.add_argument('--compare', help="JSON file of a previous run to compare with")
+    parser_suite.set_defaults(func=bench_suite_main)
+
+    parser_multicast = subparsers.add_parser('multicast', help="compare the bytes a TP sends by unicast and by multicast on the loopback as the subsystems grow")
+    parser_multicast.add_argument('--clients', type=int, nargs='+', help="numbers of simulated subsystems", default=[5, 10, 20, 40])
+    parser_multicast.add_argument('--group', help="GROUP:PORT to multicast to", default="239.255.42.99:49998")
+    parser_multicast.add_argument('--rate', type=float, metavar='MBIT', help="multicast rate in Mbit/s", default=DEFAULT_SYNC_MULTICAST_RATE / 1000000)
+    parser_multicast.add_argument('--headers', type=int, help="number of synthetic headers per subsystem", default=1)
+    parser_multicast.add_argument('--functions', type=int, help="number of MessageFunctions per header", default=20)
+    parser_multicast.add_argument('-r', '--repeat', type=int, help="number of repetitions; the best time is reported", default=1)
+    parser_multicast.set_defaults(func=bench_multicast_main)
+    parser_sync = subparsers.add_parser('sync', help="time a loopback sync between a TP and many simulated subsystems")
+    parser_sync.add_argument('--clients', type=int, help="number of simulated subsystems", default=20)
+    parser_sync.add_argument('--legacy', action='store_true', help="run the clients with the original protocol")
+    parser_sync.add_argument('--disable', action='append', choices=[f for f in SYNC_FEATURES if f != 'manifest'], metavar='FEATURE', help="do not negotiate FEATURE (zlib, pipeline, sha1, resume, bundle)", default=[])
+    parser_sync.add_argument('--compress', type=int, choices=range(10), metavar='LEVEL', help="zlib level the clients ask for (1-9)", default=0)
+    parser_sync.add_argument('--headers', type=int, help="number of synthetic headers per subsystem", default=5)
+    parser_sync.add_argument('--functions', type=int, help="number of MessageFunctions per header", default=20)
+    parser_sync.add_argument('-r', '--repeat', type=int, help="number of repetitions; the best time is reported", default=3)
+    parser_sync.set_defaults(func=bench_sync_main)
+
+    parser_daemon = subparsers.add_parser('daemon', help="time single subsystems resyncing with a TP daemon")
+    parser_daemon.add_argument('--clients', type=int, help="number of simulated subsystems", default=20)
+    parser_daemon.add_argument('--headers', type=int, help="number of synthetic headers per subsystem", default=5)
+    parser_daemon.add_argument('--functions', type=int, help="number of MessageFunctions per header", default=20)
+    parser_daemon.add_argument('-r', '--repeat', type=int, help="number of repetitions; the best time is reported", default=3)
+    parser_daemon.set_defaults(func=bench_daemon_main)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
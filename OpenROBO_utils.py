@@ -22,24 +22,714 @@ import socket
 import urllib
 import copy
 import shutil
+import errno
+import io
+import time
+import hashlib
+import zlib
+import struct
+import bisect
+import cPickle
+import multiprocessing
+import threading
+import contextlib
+import json
+import cProfile
+import random
 import ConfigParser
+try:
+    import resource
+except ImportError:
+    resource = None
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
 
 CONFIG_FILE_PATH = 'config_OpenROBO_utils.txt'
+VERSION = '1.0.0'
 DEFAULT_SYNC_PORT = 49999
 DEFAULT_SOURCE_DIR = "./source"
 DEFAULT_HEADER_DIR = "./header"
+SYNC_BUFFER_SIZE = 64 * 1024
+SYNC_MAX_STRING_SIZE = 1024 * 1024
+SYNC_SENDFILE_CHUNK_SIZE = 1024 * 1024
+SYNC_PROTOCOL_MAGIC = "OpenROBO-sync"
+SYNC_PROTOCOL_VERSION = 2
+SYNC_FEATURES = ('manifest', 'zlib', 'pipeline', 'sha1', 'resume', 'bundle')
+SYNC_COMPRESS_CACHE_SIZE = 32 * 1024 * 1024
+SYNC_LISTEN_BACKLOG = 128
+DEFAULT_SYNC_MEMBER_TIMEOUT = 10.0
+# how long a one-shot TP waits for a subsystem whose connection failed
+SYNC_RECONNECT_TIMEOUT = 20.0
+DEFAULT_SYNC_RETRIES = 5
+SYNC_RETRY_BACKOFF = 0.5
+SYNC_RETRY_MAX_BACKOFF = 8.0
+# payload of a multicast datagram, small enough for an Ethernet MTU
+SYNC_MULTICAST_CHUNK_SIZE = 1400
+# datagram header: token of the multicast and sequence number of the chunk
+SYNC_MULTICAST_HEADER = struct.Struct("!8sI")
+# bits per second the TP multicasts at, so that receivers keep up
+DEFAULT_SYNC_MULTICAST_RATE = 100 * 1000 * 1000
+# a subsystem stops waiting for datagrams after this many seconds without one
+SYNC_MULTICAST_IDLE = 0.2
+SYNC_MULTICAST_RCVBUF = 4 * 1024 * 1024
 
 BUILD_DIR = './build/'
 
+DOXYGEN_START_PROG = re.compile(r"/[*][*!]")
+DOXYGEN_END_PROG = re.compile(r"[*]/")
+OPENROBO_TAG_PROG = re.compile(r"@OpenROBO", re.IGNORECASE)
+
+# bump whenever the header parsers change their results
+PARSE_CACHE_VERSION = 1
+DEFAULT_PARSE_CACHE_PATH = os.path.join(BUILD_DIR, 'gen_parse_cache')
+DEFAULT_PARSE_CACHE_SIZE = 4096
+SYNC_DIGEST_CACHE_VERSION = 1
+DEFAULT_SYNC_DIGEST_CACHE_PATH = os.path.join(BUILD_DIR, 'sync_digests')
+SYNC_STORE_VERSION = 1
+DEFAULT_SYNC_STORE_PATH = os.path.join(BUILD_DIR, 'sync_store')
+
+GEN_OUTPUTS = ('Command', 'Message', 'Main')
+GEN_CODECS = ('text', 'binary')
+GEN_DISPATCH_MAX_SEED = 1 << 16
+
 default_config = {
     'name': None,
     'source_dir': DEFAULT_SOURCE_DIR,
     'header_dir': DEFAULT_HEADER_DIR,
     'sync_TP_addr': None,
-    'sync_TP_port': None
+    'sync_TP_port': None,
+    'sync_members': None,
+    'sync_member_timeout': None
 }
 
 
+def cpu_time():
+    if resource is not None:
+        r = resource.getrusage(resource.RUSAGE_SELF)
+        return r.ru_utime + r.ru_stime
+    t = os.times()
+    return t[0] + t[1]
+
+
+def peak_rss():
+    """ returns the peak resident set size of the process in KiB, or 0 if unknown """
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # bytes on macOS, KiB elsewhere
+        rss //= 1024
+    return rss
+
+
+def find_sendfile():
+    """
+    returns a function sendfile(out_fd, in_fd, offset, count) which copies
+    file data to a socket inside the kernel, or None if there is none.
+    Python 2 has no os.sendfile, so sendfile(2) of libc is called through
+    ctypes on Linux.
+    """
+    if hasattr(os, 'sendfile'):
+        return os.sendfile
+    if ctypes is None or not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc_sendfile = libc.sendfile64
+    except (OSError, AttributeError):
+        return None
+    libc_sendfile.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int64), ctypes.c_size_t]
+    libc_sendfile.restype = ctypes.c_ssize_t
+
+    def sendfile(out_fd, in_fd, offset, count):
+        off = ctypes.c_int64(offset)
+        sent = libc_sendfile(out_fd, in_fd, ctypes.byref(off), count)
+        if sent < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        return sent
+    return sendfile
+
+
+kernel_sendfile = find_sendfile()
+
+
+class PhaseTimings(object):
+    """
+    Wall and CPU time per phase for --timings.
+    While disabled, phase() returns a shared no-op context manager.
+    CPU time is for the whole process, so it includes other threads.
+    """
+
+    class Phase(object):
+
+        def __init__(self, timings, name):
+            self.timings = timings
+            self.name = name
+
+        def __enter__(self):
+            self.wall = time.time()
+            self.cpu = cpu_time()
+            return self
+
+        def __exit__(self, *exc_info):
+            self.timings.add(self.name, time.time() - self.wall, cpu_time() - self.cpu)
+            return False
+
+    class NullPhase(object):
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+    def __init__(self):
+        self.enabled = False
+        self.records = []
+        self.lock = threading.Lock()
+        self.null_phase = self.NullPhase()
+
+    def phase(self, name):
+        if not self.enabled:
+            return self.null_phase
+        return self.Phase(self, name)
+
+    def add(self, name, wall, cpu):
+        with self.lock:
+            self.records.append((name, wall, cpu))
+
+    def report(self, f):
+        width = max([len(name) for name, _, _ in self.records] + [5])
+        f.write("%-*s %12s %12s\n" % (width, "phase", "wall[ms]", "cpu[ms]"))
+        for name, wall, cpu in self.records:
+            f.write("%-*s %12.3f %12.3f\n" % (width, name, wall * 1000, cpu * 1000))
+
+
+phase_timings = PhaseTimings()
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    f = open(path, 'rb')
+    try:
+        while True:
+            buf = f.read(SYNC_BUFFER_SIZE)
+            if not buf:
+                break
+            h.update(buf)
+    finally:
+        f.close()
+    return h.hexdigest()
+
+
+def write_if_changed(path, data):
+    """
+    Replace path with data atomically, but only when its content differs,
+    so that make does not rebuild outputs which have not changed.
+    Returns True if path was (re)written.
+    """
+    if os.path.exists(path):
+        f = open(path, 'r')
+        old_data = f.read()
+        f.close()
+        if old_data == data:
+            return False
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    f = open(tmp_path, 'w')
+    try:
+        f.write(data)
+    finally:
+        f.close()
+    replace_file(tmp_path, path)
+    return True
+
+
+def replace_file(tmp_path, path):
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # os.rename does not replace an existing file on Windows
+        os.remove(path)
+        os.rename(tmp_path, path)
+
+
+class SyncStream:
+    """
+    Framed reader/writer of the sync protocol over a socket.
+
+    A frame is an 8 digit hex size followed by that many bytes. Receives go
+    through one reusable buffer with recv_into(), so reads are exact however
+    the peer's data is fragmented, and large payloads are handed out as
+    memoryview chunks of that buffer instead of being copied into strings.
+    """
+
+    def __init__(self, sock, buffer_size=SYNC_BUFFER_SIZE):
+        self.sock = sock
+        self.buf = bytearray(buffer_size)
+        self.view = memoryview(self.buf)
+        self.start = 0
+        self.end = 0
+        self.sent = 0
+        self.received = 0
+        # send calls, as a measure of system calls
+        self.sends = 0
+        # name of the other side, for metrics
+        self.peer = None
+        # zlib level of file payloads, 0 while they are sent as they are
+        self.compress_level = 0
+        # whether every file payload is followed by its sha1
+        self.checksum = False
+        # whether every file payload is preceded by its sha1 and the offset it starts from
+        self.resume = False
+        # whether the answer to a pipelined request is one bundle instead of framed files
+        self.bundle = False
+
+    def fill(self):
+        n = self.sock.recv_into(self.buf)
+        if n == 0:
+            raise socket.error("connection closed by peer")
+        self.start = 0
+        self.end = n
+        self.received += n
+
+    def readExact(self, size):
+        if self.end - self.start >= size:
+            data = self.view[self.start:self.start + size].tobytes()
+            self.start += size
+            return data
+        return ''.join(chunk.tobytes() for chunk in self.readChunks(size))
+
+    def readChunks(self, size):
+        """ yields size bytes as memoryviews which are valid until the next read """
+        while size > 0:
+            if self.start == self.end:
+                self.fill()
+            n = min(size, self.end - self.start)
+            chunk = self.view[self.start:self.start + n]
+            self.start += n
+            size -= n
+            yield chunk
+
+    def readSize(self):
+        return int(self.readExact(8), 16)
+
+    def sendall(self, data):
+        self.sock.sendall(data)
+        self.sent += len(data)
+        self.sends += 1
+
+    def sendFrom(self, f, size):
+        """
+        sends size bytes of the file f from its current position.
+        The data is copied to the socket by sendfile() where available,
+        otherwise through one fixed-size buffer, so memory use does not
+        depend on the file size.
+        """
+        global kernel_sendfile
+        if kernel_sendfile is not None and isinstance(self.sock, socket.socket):
+            try:
+                self.sendFromKernel(f, size)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+                    raise
+                # sendfile() does not support this file; nothing has been sent
+                kernel_sendfile = None
+        self.sendFromBuffer(f, size)
+
+    def sendFromKernel(self, f, size):
+        out_fd = self.sock.fileno()
+        in_fd = f.fileno()
+        start = offset = f.tell()
+        end = start + size
+        while offset < end:
+            try:
+                sent = kernel_sendfile(out_fd, in_fd, offset, min(end - offset, SYNC_SENDFILE_CHUNK_SIZE))
+            except OSError as e:
+                if e.errno in (errno.EINTR, errno.EAGAIN):
+                    continue
+                if offset > start:
+                    # part of the file is already sent, so it is too late to fall back
+                    raise socket.error(e.errno, e.strerror)
+                raise
+            if sent == 0:
+                raise IOError("%s: file was truncated while sending" % (f.name))
+            offset += sent
+            self.sent += sent
+            self.sends += 1
+        f.seek(offset)
+
+    def sendFromBuffer(self, f, size):
+        buf = bytearray(min(size, len(self.buf)) or 1)
+        view = memoryview(buf)
+        while size > 0:
+            n = f.readinto(view[:min(size, len(buf))])
+            if n == 0:
+                raise IOError("%s: file was truncated while sending" % (f.name))
+            self.sendall(view[:n])
+            size -= n
+
+    def close(self):
+        self.sock.close()
+
+
+class SyncBundleWriter:
+    """
+    Gathers the small writes of a bundle, the header frame of every file
+    and the payloads of small files, into sends of about SYNC_BUFFER_SIZE
+    bytes. Large payloads still go out by SyncStream.sendFrom().
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.frames = []
+        self.size = 0
+
+    def write(self, data):
+        self.frames.append(data)
+        self.size += len(data)
+        if self.size >= SYNC_BUFFER_SIZE:
+            self.flush()
+
+    def writeFrom(self, f, size):
+        """ writes size bytes of the file f from its current position """
+        if self.size + size > SYNC_BUFFER_SIZE:
+            self.flush()
+            self.stream.sendFrom(f, size)
+            return
+        data = f.read(size)
+        if len(data) != size:
+            raise IOError("%s: file was truncated while sending" % (f.name))
+        self.write(data)
+
+    def flush(self):
+        if self.frames:
+            self.stream.sendall("".join(self.frames))
+        self.frames = []
+        self.size = 0
+
+
+class SyncMetrics(object):
+    """
+    Structured metrics of syncs for --metrics. Every transfer, connection,
+    retry and error is written to f as a JSON line and added to the totals
+    of its peer, which report() summarizes at the end of a sync.
+    """
+
+    def __init__(self, f=None):
+        self.f = f
+        self.lock = threading.Lock()
+        self.peers = OrderedDict()
+
+    def totals(self, peer):
+        totals = self.peers.get(peer)
+        if totals is None:
+            totals = OrderedDict([('sent_files', 0), ('sent_bytes', 0), ('send_sec', 0.0),
+                                  ('received_files', 0), ('received_bytes', 0), ('recv_sec', 0.0),
+                                  ('latency_ms', None), ('retries', 0), ('errors', 0)])
+            self.peers[peer] = totals
+        return totals
+
+    def record(self, event, peer, **fields):
+        """ peer is the name of the other side, or None for an event of no single peer """
+        record = OrderedDict([('event', event), ('time', round(time.time(), 6)), ('peer', peer)])
+        record.update(sorted(fields.items()))
+        with self.lock:
+            if peer is not None:
+                totals = self.totals(peer)
+                if event == 'send':
+                    totals['sent_files'] += fields.get('files', 1)
+                    totals['sent_bytes'] += fields['bytes']
+                    totals['send_sec'] += fields['sec']
+                elif event in ('recv', 'multicast'):
+                    totals['received_files'] += fields.get('files', 1)
+                    totals['received_bytes'] += fields['bytes']
+                    totals['recv_sec'] += fields['sec']
+                elif event in ('connect', 'accept'):
+                    totals['latency_ms'] = fields['latency_ms']
+                elif event == 'retry':
+                    totals['retries'] += 1
+                elif event == 'error':
+                    totals['errors'] += 1
+            if self.f is not None:
+                self.f.write(json.dumps(record) + "\n")
+                self.f.flush()
+
+    def summary(self):
+        """ the totals of every peer with the throughput of its transfers in MB/s """
+        with self.lock:
+            peers = OrderedDict()
+            for peer, totals in self.peers.items():
+                totals = OrderedDict(totals)
+                sec = totals['send_sec'] + totals['recv_sec']
+                totals['mb_per_sec'] = round((totals['sent_bytes'] + totals['received_bytes']) / sec / 1e6, 3) if sec else None
+                peers[peer] = totals
+            return peers
+
+    def report(self, f):
+        """ writes the summary as a JSON line and as a table to f, the slowest peer first """
+        peers = self.summary()
+        if self.f is not None:
+            with self.lock:
+                self.f.write(json.dumps(OrderedDict([('event', 'summary'), ('time', round(time.time(), 6)), ('peers', peers)])) + "\n")
+                self.f.flush()
+        width = max([len(peer) for peer in peers] + [4])
+        f.write("%-*s %6s %12s %9s %9s %11s %7s %6s\n" % (width, "peer", "files", "bytes", "sec", "MB/s", "latency[ms]", "retries", "errors"))
+        order = sorted(peers, key=lambda peer: peers[peer]['mb_per_sec'] if peers[peer]['mb_per_sec'] is not None else float('inf'))
+        for peer in order:
+            t = peers[peer]
+            f.write("%-*s %6d %12d %9.3f %9s %11s %7d %6d\n" % (
+                width, peer, t['sent_files'] + t['received_files'], t['sent_bytes'] + t['received_bytes'],
+                t['send_sec'] + t['recv_sec'], "%.3f" % (t['mb_per_sec']) if t['mb_per_sec'] is not None else "-",
+                "%.3f" % (t['latency_ms']) if t['latency_ms'] is not None else "-", t['retries'], t['errors']))
+
+
+def parse_multicast_addr(addr):
+    """ returns (group, port) of "GROUP:PORT" """
+    group, _, port = addr.rpartition(":")
+    try:
+        first = ord(socket.inet_aton(group)[0])
+        port = int(port)
+    except (socket.error, ValueError):
+        raise ValueError("invalid multicast address: %s" % (addr))
+    if not 224 <= first <= 239:
+        raise ValueError("not a multicast group: %s" % (group))
+    return group, port
+
+
+def seq_ranges(seqs):
+    """ "3-7 9 12-13" for the sorted sequence numbers 3,4,5,6,7,9,12,13 """
+    ranges = []
+    for seq in seqs:
+        if ranges and ranges[-1][1] == seq - 1:
+            ranges[-1][1] = seq
+        else:
+            ranges.append([seq, seq])
+    return " ".join("%d" % (a) if a == b else "%d-%d" % (a, b) for a, b in ranges)
+
+
+def parse_seq_ranges(ranges):
+    seqs = []
+    for r in ranges.split():
+        a, _, b = r.partition("-")
+        seqs.extend(xrange(int(a), int(b or a) + 1))
+    return seqs
+
+
+def multicast_chunk_count(size):
+    return (size + SYNC_MULTICAST_CHUNK_SIZE - 1) // SYNC_MULTICAST_CHUNK_SIZE
+
+
+class SyncMulticastReceiver:
+    """
+    Joins a multicast group and keeps the datagrams of the TP by
+    (token, sequence number) from a thread, so that none is lost while
+    the subsystem talks to the TP over TCP.
+    """
+
+    def __init__(self, group, port, interface="0.0.0.0"):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SYNC_MULTICAST_RCVBUF)
+            except socket.error:
+                pass
+            self.sock.bind(('', port))
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, socket.inet_aton(group) + socket.inet_aton(interface))
+        except socket.error:
+            self.sock.close()
+            raise
+        self.sock.settimeout(0.05)
+        self.chunks = {}
+        self.lock = threading.Lock()
+        self.last = time.time()
+        self.running = True
+        self.thread = threading.Thread(target=self.receive)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def receive(self):
+        while self.running:
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                continue
+            except socket.error:
+                break
+            if len(data) < SYNC_MULTICAST_HEADER.size:
+                continue
+            token, seq = SYNC_MULTICAST_HEADER.unpack_from(data)
+            with self.lock:
+                self.chunks[(token, seq)] = data[SYNC_MULTICAST_HEADER.size:]
+                self.last = time.time()
+
+    def collect(self, token, seqs):
+        """
+        returns {seq: data} of the chunks of the multicast token,
+        waiting until all of seqs are here or no datagram came for a while
+        """
+        while True:
+            with self.lock:
+                missing = [seq for seq in seqs if (token, seq) not in self.chunks]
+                idle = time.time() - self.last
+            if not missing or idle > SYNC_MULTICAST_IDLE:
+                break
+            time.sleep(0.01)
+        with self.lock:
+            return dict((seq, data) for (t, seq), data in self.chunks.items() if t == token)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+
+class SyncDigestCache:
+    """
+    SHA-1 of synced files, valid while their (mtime, size) are unchanged,
+    so that manifests of files which did not change are built without
+    reading them. Kept only in memory if path is None.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.digests = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            f = open(self.path, 'rb')
+            try:
+                data = cPickle.load(f)
+            finally:
+                f.close()
+        except Exception:
+            self.dirty = True
+            return
+        if not isinstance(data, dict) or data.get('version') != SYNC_DIGEST_CACHE_VERSION:
+            self.dirty = True
+            return
+        self.digests = data['digests']
+
+    def save(self):
+        if self.path is None or not self.dirty:
+            return
+        with self.lock:
+            digests = dict((p, d) for p, d in self.digests.items() if os.path.exists(p))
+            self.dirty = False
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        tmp_path = self.path + '.tmp'
+        try:
+            f = open(tmp_path, 'wb')
+            try:
+                cPickle.dump({'version': SYNC_DIGEST_CACHE_VERSION, 'digests': digests}, f, cPickle.HIGHEST_PROTOCOL)
+            finally:
+                f.close()
+            replace_file(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(self, path):
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        with self.lock:
+            d = self.digests.get(key)
+            if d is not None and d[0] == st.st_mtime and d[1] == st.st_size:
+                return d[2]
+        digest = file_digest(path)
+        self.set(path, digest, st)
+        return digest
+
+    def set(self, path, digest, st=None):
+        if st is None:
+            st = os.stat(path)
+        with self.lock:
+            self.digests[os.path.abspath(path)] = (st.st_mtime, st.st_size, digest)
+            self.dirty = True
+
+
+class SyncStore:
+    """
+    Versions of the Command files each subsystem has pushed to a TP daemon.
+    The files themselves are kept in the TP's source and header directories;
+    the versions and manifests are persisted to path after every push so a
+    restarted daemon serves the stored files at once.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        # name: (version, time of the push, manifest)
+        self.members = {}
+        self.load()
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            f = open(self.path, 'rb')
+            try:
+                data = cPickle.load(f)
+            finally:
+                f.close()
+        except Exception:
+            return
+        if isinstance(data, dict) and data.get('version') == SYNC_STORE_VERSION:
+            self.members = data['members']
+
+    def save(self):
+        if self.path is None:
+            return
+        # pushes of several subsystems save at the same time
+        with self.save_lock:
+            with self.lock:
+                members = dict(self.members)
+            store_dir = os.path.dirname(self.path)
+            if store_dir and not os.path.isdir(store_dir):
+                os.makedirs(store_dir)
+            tmp_path = self.path + '.tmp'
+            try:
+                f = open(tmp_path, 'wb')
+                try:
+                    cPickle.dump({'version': SYNC_STORE_VERSION, 'members': members}, f, cPickle.HIGHEST_PROTOCOL)
+                finally:
+                    f.close()
+                replace_file(tmp_path, self.path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def adopt(self, name, manifest):
+        """ registers files of name found on disk, e.g. from a one-shot sync """
+        with self.lock:
+            if name not in self.members:
+                self.members[name] = (0, time.time(), manifest)
+
+    def push(self, name, manifest):
+        with self.lock:
+            version = self.members.get(name, (0,))[0] + 1
+            self.members[name] = (version, time.time(), manifest)
+        self.save()
+        return version
+
+    def version(self, name):
+        with self.lock:
+            return self.members.get(name, (None,))[0]
+
+
 class SourceCodeSync:
 
     class ClientInfo:
@@ -47,169 +737,1167 @@ class SourceCodeSync:
         def __init__(self, sock, addr):
             self.sock = sock
             self.addr = addr
-
-    def __init__(self, name, src_dir="./", header_dir="./"):
+            self.name = None
+            self.stream = SyncStream(sock)
+            self.accepted = time.time()
+
+    class SyncSession:
+        """
+        State shared by the threads serving the subsystems of one sync.
+        A peer's Command files are served only after the peer has uploaded
+        them, or once it is known that the peer is not part of this sync.
+        """
+
+        def __init__(self, num, reconnect_timeout=SYNC_RECONNECT_TIMEOUT):
+            self.num = num
+            self.reconnect_timeout = reconnect_timeout
+            self.cond = threading.Condition()
+            self.handshaking = 0
+            self.names = set()
+            self.uploaded = set()
+            self.finished = set()
+            # name: time its last connection failed
+            self.failed = {}
+            # subsystems receiving by multicast, their requests and the multicast once sent
+            self.multicast_members = set()
+            self.multicast_requests = {}
+            self.multicast_sending = False
+            self.multicast = None
+            self.reading = {}
+            self.writing = set()
+
+        @contextlib.contextmanager
+        def readFiles(self, name):
+            """ held while sending the Command files of name, which are then not replaced """
+            with self.cond:
+                while name in self.writing:
+                    self.cond.wait(1.0)
+                self.reading[name] = self.reading.get(name, 0) + 1
+            try:
+                yield
+            finally:
+                with self.cond:
+                    self.reading[name] -= 1
+                    self.cond.notify_all()
+
+        @contextlib.contextmanager
+        def writeFiles(self, name):
+            """ held while receiving the Command files of name, so that peers get both files of one version """
+            with self.cond:
+                while name in self.writing:
+                    self.cond.wait(1.0)
+                # new readers wait from here, so a stream of them cannot starve the writer
+                self.writing.add(name)
+                while self.reading.get(name):
+                    self.cond.wait(1.0)
+            try:
+                yield
+            finally:
+                with self.cond:
+                    self.writing.discard(name)
+                    self.cond.notify_all()
+
+        def accept(self):
+            with self.cond:
+                self.handshaking += 1
+
+        def identify(self, name):
+            with self.cond:
+                self.handshaking -= 1
+                if name is not None:
+                    self.names.add(name)
+                self.cond.notify_all()
+
+        def isEveryoneIdentified(self):
+            # distinct names, as a subsystem which reconnects is accepted again
+            return len(self.names) >= self.num
+
+        def upload(self, name, manifest=None):
+            with self.cond:
+                self.uploaded.add(name)
+                self.cond.notify_all()
+
+        def finish(self, name, ok=True):
+            with self.cond:
+                if ok:
+                    self.finished.add(name)
+                    self.failed.pop(name, None)
+                elif name not in self.finished:
+                    self.failed[name] = time.time()
+                self.cond.notify_all()
+
+        def isPeerReady(self, name):
+            if name in self.uploaded or name in self.finished:
+                return True
+            if name in self.failed:
+                # the subsystem may reconnect and resume its upload
+                return time.time() - self.failed[name] > self.reconnect_timeout
+            # every subsystem of this sync has told its name and name is not one of them
+            return self.isEveryoneIdentified() and self.handshaking == 0 and name not in self.names
+
+        def joinMulticast(self, name):
+            with self.cond:
+                self.multicast_members.add(name)
+
+        def waitForMulticast(self, name, request, send):
+            """
+            Registers the multicast request of name and returns the multicast
+            once sent. The thread which finds that every member has asked and
+            every peer has uploaded calls send(requests), whose result is
+            the multicast.
+            """
+            with self.cond:
+                self.multicast_requests[name] = request
+                self.cond.notify_all()
+                while self.multicast is None:
+                    if not self.multicast_sending and self.isMulticastReady():
+                        self.multicast_sending = True
+                        requests = list(self.multicast_requests.values())
+                        break
+                    self.cond.wait(1.0)
+                if self.multicast is not None:
+                    return self.multicast
+            multicast = (None, [])
+            try:
+                multicast = send(requests)
+            finally:
+                with self.cond:
+                    self.multicast = multicast
+                    self.cond.notify_all()
+            return multicast
+
+        def isMulticastReady(self):
+            if not self.isEveryoneIdentified() or self.handshaking > 0:
+                return False
+            if not all(self.isPeerReady(name) for name in self.names):
+                return False
+            return all(m in self.multicast_requests or m in self.finished or m in self.failed for m in self.multicast_members)
+
+        def isWaitingForReconnect(self):
+            with self.cond:
+                now = time.time()
+                return any(now - t <= self.reconnect_timeout for t in self.failed.values())
+
+        def waitForPeer(self, name):
+            with self.cond:
+                while not self.isPeerReady(name):
+                    # a timeout keeps Ctrl-C working in Python 2
+                    self.cond.wait(1.0)
+
+        def waitForAnyPeer(self, names):
+            """ returns one of names whose files can be served """
+            with self.cond:
+                while True:
+                    for name in names:
+                        if self.isPeerReady(name):
+                            return name
+                    self.cond.wait(1.0)
+
+    class SyncDaemonSession(SyncSession):
+        """
+        Session of a TP daemon, which never ends. Subsystems push and pull
+        whenever they like. A peer is served as soon as it is in the store,
+        or right away if it is not an expected member. Requests for an
+        expected member which has never pushed wait for at most timeout
+        seconds.
+        """
+
+        def __init__(self, store, members=(), timeout=DEFAULT_SYNC_MEMBER_TIMEOUT):
+            SourceCodeSync.SyncSession.__init__(self, 0)
+            self.store = store
+            self.members = set(members)
+            self.timeout = timeout
+
+        def upload(self, name, manifest=None):
+            if manifest is not None:
+                self.store.push(name, manifest)
+            with self.cond:
+                self.cond.notify_all()
+
+        def isPeerReady(self, name):
+            return name not in self.members or self.store.version(name) is not None
+
+        def waitForPeer(self, name):
+            self.waitForAnyPeer([name])
+
+        def waitForAnyPeer(self, names):
+            deadline = time.time() + self.timeout
+            with self.cond:
+                while True:
+                    for name in names:
+                        if self.isPeerReady(name):
+                            return name
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        # served as not found
+                        return names[0]
+                    self.cond.wait(min(remaining, 1.0))
+
+    def __init__(self, name, src_dir="./", header_dir="./", features=SYNC_FEATURES, digest_cache=None):
         self.name = name
         self.src_dir = src_dir
         self.header_dir = header_dir
+        self.features = features
+        self.digest_cache = digest_cache or SyncDigestCache()
+        # compressed payloads by (sha1, level), as the TP sends each file to every peer
+        self.compressed = OrderedDict()
+        self.compressed_size = 0
+        self.compressed_lock = threading.Lock()
+        self.socket_wrapper = None
+        self.log_lock = threading.Lock()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.sends = 0
+        self.reconnects = 0
+        self.reconnect_timeout = SYNC_RECONNECT_TIMEOUT
+        # local address of the interface to multicast on
+        self.multicast_if = "0.0.0.0"
+        self.multicast_rate = DEFAULT_SYNC_MULTICAST_RATE
+        self.multicast_sent = 0
+        self.multicast_repairs = 0
+        self.metrics = SyncMetrics()
+
+    def log(self, message):
+        with self.log_lock:
+            sys.stdout.write(message + "\n")
+            sys.stdout.flush()
 
-    def recvString(self, sock):
-        size = int(sock.recv(8), 16)
+    def countTraffic(self, stream):
+        with self.log_lock:
+            self.bytes_sent += stream.sent
+            self.bytes_received += stream.received
+            self.sends += stream.sends
+
+    def helloString(self, features):
+        """ features are names, or name=value such as zlib=6 """
+        return "%s %d %s" % (SYNC_PROTOCOL_MAGIC, SYNC_PROTOCOL_VERSION, " ".join(features))
+
+    def parseHello(self, hello):
+        """
+        returns an OrderedDict of the features of a hello string which are
+        also supported here, mapped to the value given by the peer or else
+        by us, or None if the peer speaks the original protocol without a hello
+        """
+        if hello is None or not self.features:
+            return None
+        words = hello.split()
+        if len(words) < 2 or words[0] != SYNC_PROTOCOL_MAGIC:
+            return None
+        theirs = dict(w.partition("=")[::2] for w in words[2:])
+        features = OrderedDict()
+        for f in self.features:
+            name, value = f.partition("=")[::2]
+            if name in theirs:
+                features[name] = theirs[name] or value
+        return features
+
+    def featureValue(self, name):
+        """ value of one of our features, such as the level of zlib=6 """
+        for f in self.features:
+            n, _, value = f.partition("=")
+            if n == name:
+                return value
+        return None
+
+    def applyFeatures(self, stream, features):
+        stream.checksum = 'sha1' in features
+        stream.resume = 'resume' in features
+        # only a pipelined request has a single answer to bundle
+        stream.bundle = 'bundle' in features and 'pipeline' in features
+        if features.get('zlib'):
+            level = int(features['zlib'])
+            if not 1 <= level <= 9:
+                raise ValueError("invalid zlib level: %d" % (level))
+            stream.compress_level = level
+
+    def destDir(self, name):
+        if name.endswith(".h"):
+            return self.header_dir
+        return self.src_dir
+
+    def commandPaths(self, prefix):
+        return [os.path.join(self.src_dir, "%s_Command.cpp" % (prefix)), os.path.join(self.header_dir, "%s_Command.h" % (prefix))]
+
+    def manifest(self, paths, partials=False):
+        """
+        "<name> <size> <sha1>" line of each existing file, and with partials
+        a "<name> <offset> <sha1> partial" line of each partially received one
+        """
+        lines = []
+        for path in paths:
+            if os.path.exists(path):
+                lines.append("%s %d %s" % (os.path.basename(path), os.path.getsize(path), self.digest_cache.get(path)))
+            if partials:
+                for part_path, digest in self.partials(path):
+                    lines.append("%s %d %s partial" % (os.path.basename(path), os.path.getsize(part_path), digest))
+        return "\n".join(lines)
+
+    def parseManifest(self, manifest):
+        entries = OrderedDict()
+        for line in manifest.splitlines():
+            words = line.split()
+            if len(words) == 3:
+                entries[os.path.basename(words[0])] = (int(words[1]), words[2])
+        return entries
+
+    def parsePartials(self, manifest):
+        """ returns {name: (offset, sha1)} of the partial lines of a manifest """
+        partials = {}
+        for line in manifest.splitlines():
+            words = line.split()
+            if len(words) == 4 and words[3] == "partial":
+                partials[os.path.basename(words[0])] = (int(words[1]), words[2])
+        return partials
+
+    def partPath(self, path, digest):
+        """ where the received part of the version digest of path is kept for resuming """
+        return "%s.%s.part" % (path, digest)
+
+    def partials(self, path):
+        """ (part path, sha1) of each partially received version of path """
+        parts = []
+        for part_path in glob.glob(path + ".*.part"):
+            digest = part_path[len(path) + 1:-len(".part")]
+            if re.match(r"^[0-9a-f]{40}$", digest):
+                parts.append((part_path, digest))
+        return parts
+
+    def removePartials(self, path):
+        for part_path, _ in self.partials(path):
+            os.remove(part_path)
+
+    def isUpToDate(self, path, entry):
+        """ whether the peer's manifest entry matches the file at path """
+        if entry is None or not os.path.exists(path):
+            return False
+        return entry[0] == os.path.getsize(path) and entry[1] == self.digest_cache.get(path)
+
+    def recvString(self, stream):
+        size = stream.readSize()
         if size == 0:
             return None, 0
-        buf = sock.recv(size)
+        if size > SYNC_MAX_STRING_SIZE:
+            raise ValueError("too long string frame: %d bytes" % (size))
+        buf = stream.readExact(size)
         return buf, size
 
-    def recvToFile(self, sock, path):
-        name, _ = self.recvString(sock)
+    def recvToFile(self, stream, path):
+        name, _ = self.recvString(stream)
         if name is None:
             return False
-        size = int(sock.recv(8), 16)
-        receivedSize = 0
-        f = open(os.path.join(path, name), "w")
-        while receivedSize != size:
-            buf = sock.recv(size - receivedSize)
-            f.write(buf)
-            receivedSize += len(buf)
-        f.close()
-        print("received: %s" % (name))
+        self.recvFile(stream, name, path)
         return True
 
-    def sendFile(self, sock, path):
-        self.sendString(sock, os.path.basename(path))
-        size = os.path.getsize(path)
-        sock.sendall("%08x" % (size))
-        f = open(path, "r")
-        sock.sendall(f.read(size))
-        f.close()
-
-    def sendString(self, sock, string):
+    def recvFile(self, stream, name, path):
+        """ receives the size and payload of the file name into the directory path """
+        start = time.time()
+        offset = 0
+        digest = None
+        if stream.resume:
+            header, _ = self.recvString(stream)
+            digest, offset = header.split()
+            offset = int(offset)
+        size = stream.readSize()
+        trailer = (lambda: self.recvString(stream)[0]) if stream.checksum else None
+        self.storeFile(name, path, self.recvPayload(stream, size - offset), size, offset, digest, stream.resume, trailer)
+        self.recordTransfer('recv', stream, name, size, offset, start)
+
+    def recordTransfer(self, event, stream, name, size, offset, start, **fields):
+        """ records the transfer of the file name from offset on to or from the peer of stream """
+        sec = time.time() - start
+        self.metrics.record(event, stream.peer, file=os.path.basename(name), size=size, offset=offset, bytes=size - offset, sec=round(sec, 6),
+                            mb_per_sec=round((size - offset) / sec / 1e6, 3) if sec > 0 else None, **fields)
+
+    def storeFile(self, name, path, chunks, size, offset=0, digest=None, resume=False, trailer=None):
+        """
+        writes the file name of size bytes, whose data from offset on are
+        chunks, into the directory path. The data go to a temporary file
+        which replaces the destination only after its length, and its sha1
+        if known from digest or trailer(), are verified, so an interrupted
+        sync never leaves a truncated file behind.
+        With resume, the temporary file is kept as a part of the version
+        digest when the connection fails, and a later sync continues it
+        from the offset the sender is told in the manifest.
+        """
+        dest = os.path.join(path, os.path.basename(name))
+        with phase_timings.phase("recv %s" % (name)):
+            expected = digest
+            if resume:
+                tmp_path = self.partPath(dest, digest)
+            else:
+                tmp_path = "%s.%d.%d.tmp" % (dest, os.getpid(), threading.current_thread().ident)
+            h = hashlib.sha1()
+            received = offset
+            try:
+                if offset and (not os.path.exists(tmp_path) or os.path.getsize(tmp_path) < offset):
+                    raise ValueError("%s: no part of %d bytes to resume" % (name, offset))
+                f = io.open(tmp_path, "r+b" if offset else "wb")
+                try:
+                    if offset:
+                        self.hashPrefix(f, offset, h)
+                        f.truncate()
+                    for chunk in chunks:
+                        f.write(chunk)
+                        h.update(chunk)
+                        received += len(chunk)
+                    f.flush()
+                    # the rename must not reach the disk before the data
+                    os.fsync(f.fileno())
+                finally:
+                    f.close()
+                if received != size:
+                    raise ValueError("%s: received %d bytes, expected %d" % (name, received, size))
+                digest = h.hexdigest()
+                if trailer is not None:
+                    expected = trailer()
+                if expected is not None and expected != digest:
+                    raise ValueError("%s: sha1 %s, expected %s" % (name, digest, expected))
+                replace_file(tmp_path, dest)
+            except (ValueError, zlib.error):
+                # the data is wrong, so it must not be resumed
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            except BaseException:
+                if not resume and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            if resume:
+                self.removePartials(dest)
+        self.digest_cache.set(dest, digest)
+        if offset:
+            self.log("received: %s (resumed from %d bytes)" % (name, offset))
+        else:
+            self.log("received: %s" % (name))
+
+    def hashPrefix(self, f, size, h):
+        """ hashes the first size bytes of f and leaves f at size """
+        buf = bytearray(min(size, SYNC_BUFFER_SIZE))
+        view = memoryview(buf)
+        while size > 0:
+            n = f.readinto(view[:min(size, len(buf))])
+            if n == 0:
+                raise ValueError("%s: part is shorter than expected" % (f.name))
+            h.update(view[:n])
+            size -= n
+
+    def recvPayload(self, stream, size):
+        """ yields the size bytes of a file payload in pieces of bounded size """
+        if not stream.compress_level:
+            for chunk in stream.readChunks(size):
+                yield chunk
+            return
+        z = zlib.decompressobj()
+        received = 0
+        while True:
+            n = stream.readSize()
+            if n == 0:
+                break
+            for chunk in stream.readChunks(n):
+                data = chunk.tobytes()
+                while data:
+                    # max_length bounds the output of a small but highly compressed chunk
+                    out = z.decompress(data, SYNC_BUFFER_SIZE)
+                    received += len(out)
+                    if received > size:
+                        raise ValueError("compressed payload is longer than %d bytes" % (size))
+                    yield out
+                    data = z.unconsumed_tail
+        out = z.flush()
+        received += len(out)
+        if out:
+            yield out
+        if received != size:
+            raise ValueError("compressed payload is %d bytes, expected %d" % (received, size))
+
+    def recvFiles(self, stream):
+        """ receives files into src_dir or header_dir until an empty name """
+        while True:
+            name, _ = self.recvString(stream)
+            if name is None:
+                break
+            self.recvFile(stream, name, self.destDir(name))
+
+    def recvBundle(self, stream, names):
+        """
+        receives a bundle, a "<name> <size> <sha1> <offset>" frame and the
+        payload of every file up to an empty frame, into src_dir or
+        header_dir as it arrives. Only the files in names are accepted.
+        """
+        while True:
+            header, _ = self.recvString(stream)
+            if header is None:
+                break
+            name, size, digest, offset = header.split()
+            if name not in names:
+                raise ValueError("unexpected file in bundle: %s" % (name))
+            size = int(size)
+            offset = int(offset)
+            start = time.time()
+            self.storeFile(name, self.destDir(name), self.recvPayload(stream, size - offset), size, offset, digest, stream.resume)
+            self.recordTransfer('recv', stream, name, size, offset, start, bundle=True)
+
+    def bundleFile(self, writer, stream, path, offset=0):
+        """ writes path to a bundle; with resume, only the data from offset on """
+        start = time.time()
+        with phase_timings.phase("send %s" % (os.path.basename(path))):
+            f = open(path, "rb")
+            try:
+                size = os.fstat(f.fileno()).st_size
+                offset = min(offset, size)
+                header = "%s %d %s %d" % (os.path.basename(path), size, self.digest_cache.get(path), offset)
+                writer.write("%08x%s" % (len(header), header))
+                f.seek(offset)
+                if not stream.compress_level:
+                    writer.writeFrom(f, size - offset)
+                elif offset or size > SYNC_COMPRESS_CACHE_SIZE // 8:
+                    self.compress(f, size - offset, stream.compress_level, writer.write)
+                else:
+                    writer.write(self.compressedPayload(path, f, size, stream.compress_level))
+            finally:
+                f.close()
+        # the time to hand the file to the bundle, which sends it in larger pieces
+        self.recordTransfer('send', stream, path, size, offset, start, bundle=True)
+
+    def sendFile(self, stream, path, offset=0):
+        """ sends path; with resume, only the data from offset on """
+        start = time.time()
+        sent = stream.sent
+        with phase_timings.phase("send %s" % (os.path.basename(path))):
+            self.sendString(stream, os.path.basename(path))
+            f = open(path, "rb")
+            try:
+                size = os.fstat(f.fileno()).st_size
+                offset = min(offset, size)
+                if stream.resume:
+                    self.sendString(stream, "%s %d" % (self.digest_cache.get(path), offset))
+                stream.sendall("%08x" % (size))
+                f.seek(offset)
+                if not stream.compress_level:
+                    stream.sendFrom(f, size - offset)
+                elif offset or size > SYNC_COMPRESS_CACHE_SIZE // 8:
+                    self.compress(f, size - offset, stream.compress_level, stream.sendall)
+                else:
+                    stream.sendall(self.compressedPayload(path, f, size, stream.compress_level))
+                if stream.checksum:
+                    self.sendString(stream, self.digest_cache.get(path))
+            finally:
+                f.close()
+        self.recordTransfer('send', stream, path, size, offset, start, wire_bytes=stream.sent - sent)
+
+    def compress(self, f, size, level, write):
+        """ writes size bytes of f as zlib data in frames, ended by an empty frame """
+        z = zlib.compressobj(level)
+        while size > 0:
+            buf = f.read(min(size, SYNC_BUFFER_SIZE))
+            if not buf:
+                raise IOError("%s: file was truncated while sending" % (f.name))
+            size -= len(buf)
+            data = z.compress(buf)
+            if data:
+                write("%08x%s" % (len(data), data))
+        data = z.flush()
+        if data:
+            write("%08x%s" % (len(data), data))
+        write("%08x" % (0))
+
+    def compressedPayload(self, path, f, size, level):
+        key = (self.digest_cache.get(path), level)
+        with self.compressed_lock:
+            payload = self.compressed.pop(key, None)
+            if payload is not None:
+                self.compressed[key] = payload
+                return payload
+        frames = []
+        self.compress(f, size, level, frames.append)
+        payload = "".join(frames)
+        with self.compressed_lock:
+            if key not in self.compressed:
+                self.compressed[key] = payload
+                self.compressed_size += len(payload)
+            while self.compressed_size > SYNC_COMPRESS_CACHE_SIZE:
+                _, old = self.compressed.popitem(last=False)
+                self.compressed_size -= len(old)
+        return payload
+
+    def sendString(self, stream, string):
         size = len(string)
-        sock.sendall("%08x%s" % (size, string))
+        stream.sendall("%08x%s" % (size, string))
 
-    def sendNone(slef, sock):
+    def sendNone(slef, stream):
         size = 0
-        sock.sendall("%08x" % (size))
-
-    def client(self, host, port):
-        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client.connect((host, port))
-        self.sendString(client, self.name)
-        self.recvString(client)
-        commandCpp = os.path.join(self.src_dir, "%s_Command.cpp" % (self.name))
-        commandH = os.path.join(self.header_dir, "%s_Command.h" % (self.name))
-        self.sendFile(client, commandCpp)
-        print("sent to TP: %s" % (commandCpp))
-        self.sendFile(client, commandH)
-        print("sent to TP: %s" % (commandH))
-
+        stream.sendall("%08x" % (size))
+
+    def connect(self, host, port):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.connect((host, port))
+        if self.socket_wrapper is not None:
+            sock = self.socket_wrapper(sock)
+        return SyncStream(sock)
+
+    def peerPrefixes(self):
+        """ prefixes of the peers whose Command files are in src_dir """
+        prefixes = []
         prefix_prog = re.compile(r".*/(.+)_Command.cpp")
         for p in glob.glob(self.src_dir + "/*_Command.cpp"):
             m = prefix_prog.match(p)
             prefix = m.group(1)
             if prefix == self.name:
                 continue
-            self.sendString(client, prefix)
-            self.recvToFile(client, self.src_dir)
-            self.recvToFile(client, self.header_dir)
-
-        self.sendNone(client)
-        client.close()
-
-    def acceptOnSever(self, port):
-        client_dict = {}
+            prefixes.append(prefix)
+        return prefixes
+
+    def client(self, host, port, push=True, pull=True):
+        start = time.time()
+        client = self.connect(host, port)
+        client.peer = "TP"
+        self.metrics.record('connect', client.peer, host=host, port=port, latency_ms=round((time.time() - start) * 1000, 3))
+        receiver = None
+        try:
+            self.sendString(client, self.name)
+            hello, _ = self.recvString(client)
+            features = self.parseHello(hello)
+            if features is None:
+                if not push or not pull:
+                    self.log("error: the TP does not support push or pull alone")
+                    return
+                # the TP does not negotiate, so it speaks the original protocol
+                for path in self.commandPaths(self.name):
+                    self.sendFile(client, path)
+                    self.log("sent to TP: %s" % (path))
+                for prefix in self.peerPrefixes():
+                    self.sendString(client, prefix)
+                    self.recvToFile(client, self.src_dir)
+                    self.recvToFile(client, self.header_dir)
+            else:
+                if features.get('multicast') and pull:
+                    # joined before answering, so no datagram of the TP is missed
+                    try:
+                        receiver = SyncMulticastReceiver(*parse_multicast_addr(features['multicast']), interface=self.multicast_if)
+                    except (socket.error, ValueError) as e:
+                        self.log("error: multicast: %s; receiving by TCP" % (e))
+                if receiver is None:
+                    features.pop('multicast', None)
+                self.sendString(client, self.helloString(["%s=%s" % (n, v) if v else n for n, v in features.items()]))
+                self.applyFeatures(client, features)
+                self.uploadChanged(client, push)
+                if receiver is not None:
+                    self.recvMulticast(client, receiver)
+                if pull:
+                    if 'pipeline' in features:
+                        # one request for every peer, answered by one stream of files
+                        wants = self.wants(client)
+                        if wants:
+                            self.sendString(client, "\n".join(wants))
+                            if client.bundle:
+                                names = set(os.path.basename(path) for prefix in self.peerPrefixes() for path in self.commandPaths(prefix))
+                                self.recvBundle(client, names)
+                            else:
+                                self.recvFiles(client)
+                    else:
+                        for prefix in self.peerPrefixes():
+                            self.sendString(client, "%s\n%s" % (prefix, self.manifest(self.commandPaths(prefix), client.resume)))
+                            self.recvFiles(client)
+
+            self.sendNone(client)
+        finally:
+            if receiver is not None:
+                receiver.close()
+            self.countTraffic(client)
+            client.close()
+            self.digest_cache.save()
+
+    def wants(self, stream):
+        """ the "want <prefix>" line and the manifest of every peer, as in a pipelined request """
+        return ["want %s\n%s" % (prefix, self.manifest(self.commandPaths(prefix), stream.resume)) for prefix in self.peerPrefixes()]
+
+    def recvMulticast(self, stream, receiver):
+        """
+        asks the TP to multicast the peer files which differ from our
+        manifest and stores those which arrive. Chunks which did not
+        arrive are asked for again over TCP; a file which still fails
+        is left to the request which follows.
+        """
+        start = time.time()
+        self.sendString(stream, "\n".join(["multicast"] + self.wants(stream)))
+        index, _ = self.recvString(stream)
+        if index is None:
+            return
+        lines = index.splitlines()
+        token = lines[0].decode("hex")
+        names = set(os.path.basename(path) for prefix in self.peerPrefixes() for path in self.commandPaths(prefix))
+        files = []
+        for line in lines[1:]:
+            first, name, size, digest = line.split()
+            if name not in names:
+                raise ValueError("unexpected file in multicast: %s" % (name))
+            files.append((int(first), name, int(size), digest))
+        seqs = [seq for first, _, size, _ in files for seq in xrange(first, first + multicast_chunk_count(size))]
+        chunks = receiver.collect(token, seqs)
+        missing = [seq for seq in seqs if seq not in chunks]
+        self.sendString(stream, seq_ranges(missing))
+        for seq in missing:
+            chunks[seq], _ = self.recvString(stream)
+        self.log("received %d chunks by multicast, %d by TCP" % (len(seqs) - len(missing), len(missing)))
+        stored = 0
+        for first, name, size, digest in files:
+            data = (chunks[seq] for seq in xrange(first, first + multicast_chunk_count(size)))
+            try:
+                self.storeFile(name, self.destDir(name), data, size, 0, digest)
+                stored += size
+            except ValueError as e:
+                self.log("error: multicast: %s" % (e))
+        self.metrics.record('multicast', stream.peer, files=len(files), bytes=stored, sec=round(time.time() - start, 6),
+                            chunks=len(seqs), tcp_chunks=len(missing))
+
+    def clientWithRetry(self, host, port, push=True, pull=True, retries=DEFAULT_SYNC_RETRIES, backoff=SYNC_RETRY_BACKOFF):
+        """
+        client() which reconnects up to retries times after a failure,
+        waiting exponentially longer each time. Files already received
+        stay in place and, with resume, partially received ones continue.
+        """
+        start = time.time()
+        for attempt in xrange(retries + 1):
+            try:
+                self.client(host, port, push, pull)
+                self.metrics.record('sync', "TP", ok=True, retries=attempt, sec=round(time.time() - start, 6))
+                return
+            except (socket.error, IOError, OSError, ValueError, zlib.error) as e:
+                self.metrics.record('error', "TP", error=str(e))
+                if attempt == retries:
+                    self.metrics.record('sync', "TP", ok=False, retries=attempt, sec=round(time.time() - start, 6))
+                    raise
+                # jitter keeps subsystems which failed together from reconnecting together
+                delay = min(backoff * (2 ** attempt), SYNC_RETRY_MAX_BACKOFF) * random.uniform(0.5, 1.0)
+                self.reconnects += 1
+                self.metrics.record('retry', "TP", attempt=attempt + 1, delay=round(delay, 3))
+                self.log("error: %s; reconnecting in %.2f sec" % (e, delay))
+                time.sleep(delay)
+
+    def uploadChanged(self, stream, push=True):
+        """ sends the manifest of our Command files and then the files the TP asks for """
+        paths = OrderedDict((os.path.basename(p), p) for p in self.commandPaths(self.name))
+        if push:
+            self.sendString(stream, self.manifest(paths.values()))
+        else:
+            # an empty manifest uploads nothing
+            self.sendNone(stream)
+        wanted, _ = self.recvString(stream)
+        if wanted is None:
+            if push:
+                self.log("TP is up to date")
+            return
+        for token in wanted.split():
+            # with resume, "<name>:<offset>" for a file the TP has received a part of
+            name, _, offset = token.partition(":")
+            self.sendFile(stream, paths[name], int(offset or 0))
+            self.log("sent to TP: %s" % (paths[name]))
+
+    def recvChanged(self, stream):
+        """
+        receives the manifest of a subsystem's Command files and then the
+        files which differ. Returns the manifest if anything was received.
+        """
+        entries = self.parseManifest(self.recvString(stream)[0] or "")
+        wanted = [name for name, entry in entries.items() if not self.isUpToDate(os.path.join(self.destDir(name), name), entry)]
+        if not wanted:
+            self.sendNone(stream)
+            return None
+        tokens = []
+        for name in wanted:
+            part_path = self.partPath(os.path.join(self.destDir(name), name), entries[name][1])
+            if stream.resume and os.path.exists(part_path):
+                tokens.append("%s:%d" % (name, os.path.getsize(part_path)))
+            else:
+                tokens.append(name)
+        self.sendString(stream, " ".join(tokens))
+        for expected in wanted:
+            name, _ = self.recvString(stream)
+            if name != expected:
+                raise ValueError("unexpected upload: %s" % (name))
+            self.recvFile(stream, name, self.destDir(name))
+        return entries
+
+    def listen(self, port):
         serversock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         serversock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         serversock.bind(('', port))
-        serversock.listen(10)
-
-        sys.stdout.write("How many subsystems? : ")
-        sys.stdout.flush()
-        num = int(raw_input())
-        for _ in xrange(num):
-            sys.stdout.write("wait to accept... ")
+        serversock.listen(SYNC_LISTEN_BACKLOG)
+        return serversock
+
+    def acceptOnSever(self, port, num=None, serversock=None):
+        """
+        Accepts num subsystems and starts a thread serving each of them,
+        so that a slow subsystem does not stall the others. Subsystems
+        whose connection failed are accepted again for a while.
+        Returns the serving threads.
+        """
+        if serversock is None:
+            serversock = self.listen(port)
+
+        if num is None:
+            sys.stdout.write("How many subsystems? : ")
             sys.stdout.flush()
-            clientsock, client_address = serversock.accept()
-            clientname, _ = self.recvString(clientsock)
-            client_dict[clientname] = self.ClientInfo(clientsock, client_address)
-            sys.stdout.write("accepted %s\n" % (clientname))
-        serversock.close()
-
-        return client_dict
-
-    def server(self, port):
-        client_dict = self.acceptOnSever(port)
-        for c in client_dict.values():
-            self.sendNone(c.sock)
-            self.recvToFile(c.sock, self.src_dir)
-            self.recvToFile(c.sock, self.header_dir)
-        for name, c in client_dict.items():
+            num = int(raw_input())
+        session = self.SyncSession(num, self.reconnect_timeout)
+        threads = []
+        # a timeout keeps Ctrl-C working in Python 2 and notices when the last thread ends
+        serversock.settimeout(0.1)
+        try:
+            # subsystems whose connection failed may reconnect until every subsystem is served
+            while not session.isEveryoneIdentified() or any(t.is_alive() for t in threads) or session.isWaitingForReconnect():
+                try:
+                    clientsock, client_address = serversock.accept()
+                except socket.timeout:
+                    continue
+                clientsock.settimeout(None)
+                if self.socket_wrapper is not None:
+                    clientsock = self.socket_wrapper(clientsock)
+                session.accept()
+                t = threading.Thread(target=self.serveClient, args=(session, self.ClientInfo(clientsock, client_address)))
+                t.daemon = True
+                t.start()
+                threads.append(t)
+        finally:
+            serversock.close()
+
+        return threads
+
+    def serveClient(self, session, c):
+        identified = False
+        ok = False
+        try:
+            c.name, _ = self.recvString(c.stream)
+            session.identify(c.name)
+            identified = True
+            c.stream.peer = c.name
+            self.metrics.record('accept', c.name, addr=c.addr[0], latency_ms=round((time.time() - c.accepted) * 1000, 3))
+            self.log("accepted %s" % (c.name))
+            if self.features:
+                # clients of the original protocol ignore the content of the go-ahead
+                self.sendString(c.stream, self.helloString(self.features))
+            else:
+                self.sendNone(c.stream)
+            hello, _ = self.recvString(c.stream)
+            features = self.parseHello(hello)
+            if features is not None and 'multicast' in features:
+                session.joinMulticast(c.name)
+            with session.writeFiles(c.name):
+                if features is None:
+                    # no hello, so this is the name of the first upload
+                    self.recvFile(c.stream, hello, self.src_dir)
+                    self.recvToFile(c.stream, self.header_dir)
+                    manifest = self.manifest(self.commandPaths(c.name))
+                else:
+                    self.applyFeatures(c.stream, features)
+                    manifest = None
+                    if self.recvChanged(c.stream) is not None:
+                        manifest = self.manifest(self.commandPaths(c.name))
+            session.upload(c.name, manifest)
             while True:
-                prefix, _ = self.recvString(c.sock)
-                if prefix is None:
+                request, _ = self.recvString(c.stream)
+                if request is None:
                     break
-                commandCpp = os.path.join(self.src_dir, "%s_Command.cpp" % (prefix))
-                commandH = os.path.join(self.header_dir, "%s_Command.h" % (prefix))
-                self.sendFile(c.sock, commandCpp)
-                print("sent to %s: %s" % (name, commandCpp))
-                self.sendFile(c.sock, commandH)
-                print("sent to %s: %s" % (name, commandCpp))
-            c.sock.close()
+                if features is None:
+                    self.servePrefix(session, c, request)
+                elif 'multicast' in features and request.split("\n", 1)[0] == "multicast":
+                    self.serveMulticast(session, c, request)
+                elif 'pipeline' in features:
+                    self.serveWants(session, c, request)
+                else:
+                    prefix, _, manifest = request.partition("\n")
+                    session.waitForPeer(prefix)
+                    with session.readFiles(prefix):
+                        self.serveChanged(c, prefix, manifest)
+                    self.sendNone(c.stream)
+            ok = True
+        except (socket.error, IOError, OSError, ValueError, zlib.error) as e:
+            self.metrics.record('error', c.name or c.addr[0], error=str(e))
+            self.log("error: %s: %s" % (c.name or c.addr[0], e))
+        finally:
+            if not identified:
+                session.identify(None)
+            session.finish(c.name, ok)
+            self.countTraffic(c.stream)
+            c.stream.close()
+
+    def servePrefix(self, session, c, prefix):
+        session.waitForPeer(prefix)
+        commandCpp, commandH = self.commandPaths(prefix)
+        with session.readFiles(prefix):
+            for path in [commandCpp, commandH]:
+                if not os.path.exists(path):
+                    # an empty name makes the client skip this file
+                    self.sendNone(c.stream)
+                    self.log("not found for %s: %s" % (c.name, path))
+                    continue
+                self.sendFile(c.stream, path)
+                self.log("sent to %s: %s" % (c.name, path))
+
+    def serveWants(self, session, c, request):
+        """
+        serves a pipelined request, a "want <prefix>" line followed by the
+        client's manifest for every peer, in the order the peers get ready
+        """
+        wants = self.parseWants(request)
+        if c.stream.bundle:
+            # the files of every peer in one stream with one frame of metadata each
+            writer = SyncBundleWriter(c.stream)
+        while wants:
+            prefix = session.waitForAnyPeer(wants.keys())
+            with session.readFiles(prefix):
+                if c.stream.bundle:
+                    self.bundleChanged(c, writer, prefix, wants.pop(prefix))
+                    # the client unpacks these while the next peer gets ready
+                    writer.flush()
+                else:
+                    self.serveChanged(c, prefix, wants.pop(prefix))
+        if c.stream.bundle:
+            writer.write("%08x" % (0))
+            writer.flush()
+        else:
+            self.sendNone(c.stream)
+
+    def parseWants(self, request):
+        """ returns {prefix: manifest} of the "want <prefix>" lines of a request and the manifest lines after each """
+        wants = OrderedDict()
+        prefix = None
+        for line in request.splitlines():
+            words = line.split()
+            if len(words) == 2 and words[0] == "want":
+                prefix = words[1]
+                wants[prefix] = []
+            elif prefix is not None:
+                wants[prefix].append(line)
+        return OrderedDict((prefix, "\n".join(lines)) for prefix, lines in wants.items())
+
+    def serveMulticast(self, session, c, request):
+        """
+        serves a multicast request, which lists the peers wanted as a
+        pipelined request does. Once every subsystem receiving by multicast
+        has asked, the files any of them wants are multicast once. Each then
+        gets the index of the files it wants and the chunks it missed.
+        """
+        wants = self.parseWants(request)
+        token, files = session.waitForMulticast(c.name, wants, lambda requests: self.multicastFiles(session, requests))
+        if token is None:
+            self.sendNone(c.stream)
+            return
+        wanted = set(os.path.basename(path) for prefix, manifest in wants.items() for path in self.wantedPaths(prefix, manifest))
+        files = [f for f in files if os.path.basename(f[1]) in wanted]
+        index = ["%d %s %d %s" % (first, os.path.basename(path), size, digest) for first, path, size, digest in files]
+        self.sendString(c.stream, "\n".join([token.encode("hex")] + index))
+        missing, _ = self.recvString(c.stream)
+        seqs = parse_seq_ranges(missing or "")
+        self.sendChunks(c.stream, files, seqs)
+        self.log("multicast to %s: %d files, %d chunks again by TCP" % (c.name, len(files), len(seqs)))
+
+    def wantedPaths(self, prefix, manifest):
+        """ the Command files of a prefix which differ from a manifest """
+        entries = self.parseManifest(manifest)
+        return [path for path in self.commandPaths(prefix) if os.path.exists(path) and not self.isUpToDate(path, entries.get(os.path.basename(path)))]
+
+    def multicastFiles(self, session, requests):
+        """
+        multicasts every file which one of requests wants once, paced to
+        multicast_rate. Returns (token, [(first seq, path, size, sha1)])
+        """
+        token = os.urandom(8)
+        files = []
+        prefixes = set(prefix for wants in requests for prefix in wants)
+        if not prefixes:
+            return token, files
+        addr = parse_multicast_addr(self.featureValue('multicast'))
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sent = 0
+        start = time.time()
+        try:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.multicast_if))
+            seq = 0
+            for prefix in sorted(prefixes):
+                with session.readFiles(prefix):
+                    paths = set(path for wants in requests if prefix in wants for path in self.wantedPaths(prefix, wants[prefix]))
+                    for path in sorted(paths):
+                        f = open(path, "rb")
+                        try:
+                            size = os.fstat(f.fileno()).st_size
+                            files.append((seq, path, size, self.digest_cache.get(path)))
+                            for _ in xrange(multicast_chunk_count(size)):
+                                datagram = SYNC_MULTICAST_HEADER.pack(token, seq) + f.read(SYNC_MULTICAST_CHUNK_SIZE)
+                                sock.sendto(datagram, addr)
+                                sent += len(datagram)
+                                seq += 1
+                                # ahead of the rate, so that the receivers keep up
+                                ahead = sent * 8.0 / self.multicast_rate - (time.time() - start)
+                                if ahead > 0.001:
+                                    time.sleep(ahead)
+                        finally:
+                            f.close()
+        except socket.error as e:
+            # what did not go out is sent by TCP
+            self.log("error: multicast: %s" % (e))
+        finally:
+            sock.close()
+            self.multicast_sent += sent
+        self.log("multicast: %d files, %d bytes to %d subsystems in %.3f sec" % (len(files), sent, len(requests), time.time() - start))
+        self.metrics.record('multicast', None, files=len(files), bytes=sent, sec=round(time.time() - start, 6), subsystems=len(requests))
+        return token, files
+
+    def sendChunks(self, stream, files, seqs):
+        """ sends the chunks seqs of the multicast files as frames """
+        starts = [first for first, _, _, _ in files]
+        opened = {}
+        try:
+            for seq in seqs:
+                i = bisect.bisect_right(starts, seq) - 1
+                if i < 0 or seq >= starts[i] + multicast_chunk_count(files[i][2]):
+                    raise ValueError("no chunk %d in the multicast" % (seq))
+                path = files[i][1]
+                if path not in opened:
+                    opened[path] = open(path, "rb")
+                f = opened[path]
+                f.seek((seq - starts[i]) * SYNC_MULTICAST_CHUNK_SIZE)
+                self.sendString(stream, f.read(SYNC_MULTICAST_CHUNK_SIZE))
+        finally:
+            for f in opened.values():
+                f.close()
+        with self.log_lock:
+            self.multicast_repairs += len(seqs)
+
+    def serveChanged(self, c, prefix, manifest):
+        """ sends the Command files of a prefix which differ from the client's manifest """
+        for path, offset in self.changedFiles(c, prefix, manifest):
+            self.sendFile(c.stream, path, offset)
+            self.log("sent to %s: %s" % (c.name, path))
+
+    def bundleChanged(self, c, writer, prefix, manifest):
+        """ writes the Command files of a prefix which differ from the client's manifest to a bundle """
+        for path, offset in self.changedFiles(c, prefix, manifest):
+            self.bundleFile(writer, c.stream, path, offset)
+            self.log("bundled for %s: %s" % (c.name, path))
+
+    def changedFiles(self, c, prefix, manifest):
+        """ yields (path, offset) of the Command files of a prefix which differ from the client's manifest """
+        entries = self.parseManifest(manifest)
+        partials = self.parsePartials(manifest)
+        for path in self.commandPaths(prefix):
+            name = os.path.basename(path)
+            if not os.path.exists(path):
+                self.log("not found for %s: %s" % (c.name, path))
+            elif self.isUpToDate(path, entries.get(name)):
+                self.log("up to date on %s: %s" % (c.name, path))
+            else:
+                offset = 0
+                part = partials.get(name)
+                if c.stream.resume and part is not None and part[1] == self.digest_cache.get(path):
+                    # the client has a part of this very version
+                    offset = part[0]
+                yield path, offset
+
+    def daemon(self, port, store, members=(), timeout=DEFAULT_SYNC_MEMBER_TIMEOUT, serversock=None, stop=None):
+        """
+        Serves subsystems from a SyncStore until Ctrl-C or until the
+        threading.Event stop is set. Command files already in the TP's
+        directories are served from the start.
+        """
+        if serversock is None:
+            serversock = self.listen(port)
+        for prefix in self.peerPrefixes() + [self.name]:
+            if os.path.exists(self.commandPaths(prefix)[0]):
+                store.adopt(prefix, self.manifest(self.commandPaths(prefix)))
+        session = self.SyncDaemonSession(store, members, timeout)
+        self.log("serving on port %d, expected subsystems: %s" % (port, ", ".join(sorted(members)) or "none"))
+        # a timeout keeps Ctrl-C working in Python 2 and lets stop be checked
+        serversock.settimeout(1.0)
+        try:
+            while stop is None or not stop.is_set():
+                try:
+                    clientsock, client_address = serversock.accept()
+                except socket.timeout:
+                    continue
+                clientsock.settimeout(None)
+                if self.socket_wrapper is not None:
+                    clientsock = self.socket_wrapper(clientsock)
+                session.accept()
+                t = threading.Thread(target=self.serveClient, args=(session, self.ClientInfo(clientsock, client_address)))
+                t.daemon = True
+                t.start()
+        except KeyboardInterrupt:
+            self.log("stopped")
+        finally:
+            serversock.close()
+            self.digest_cache.save()
+
+    def server(self, port, num=None, serversock=None):
+        for t in self.acceptOnSever(port, num, serversock):
+            while t.is_alive():
+                # join() without a timeout cannot be interrupted by Ctrl-C in Python 2
+                t.join(1.0)
+        self.digest_cache.save()
 
 
 class CsubthreadinittermTermParser:
 
+    # $1:returnType $2:funcName $3:args
+    func_prog = re.compile(r"\s*(\S+)\s+([^\s(]+)\s*\(([^)]*)\s*\)")
+    subthread_prog = re.compile(r"[*]\s*Subthread@OpenROBO", re.IGNORECASE)
+    init_prog = re.compile(r"[*]\s*init@OpenROBO", re.IGNORECASE)
+    term_prog = re.compile(r"[*]\s*term@OpenROBO", re.IGNORECASE)
+
     def __init__(self):
         self.subthread_infos = []
         self.init_infos = []
         self.term_infos = []
+        self.targets = [{'prog': self.subthread_prog, 'infos': self.subthread_infos}, {'prog': self.init_prog, 'infos': self.init_infos}, {'prog': self.term_prog, 'infos': self.term_infos}]
+        self.startParse()
 
     def __repr__(self):
         return "Subthread %s / init %s / term %s" % (repr(self.subthread_infos), repr(self.init_infos), repr(self.term_infos))
 
     def parseFunctionPrototype(self, line):
-        # $1:returnType $2:funcName $3:args
-        func_prog = re.compile(r"\s*(\S+)\s+([^\s(]+)\s*\(([^)]*)\s*\)")
-        m = func_prog.match(line)
+        m = self.func_prog.match(line)
         if not m:
             return None
 
         return m.group(2)
 
+    def startParse(self):
+        self.doxygen_flag = False
+        self.parsing_flag = False
+        self.target_infos = None
+        self.ret = False
+
+    def parseLine(self, line, doxygen_start, doxygen_end):
+        if not self.doxygen_flag:
+            if self.parsing_flag:
+                name = self.parseFunctionPrototype(line)
+                if name is not None:
+                    self.target_infos.append(name)
+                    self.parsing_flag = False
+                    self.ret = True
+            elif doxygen_start:
+                self.doxygen_flag = True
+            return
+        if doxygen_end:
+            self.doxygen_flag = False
+            return
+        if not self.parsing_flag:
+            for t in self.targets:
+                if t['prog'].search(line):
+                    self.target_infos = t['infos']
+                    self.parsing_flag = True
+                    break
+
     def parseFromFile(self, path):
-        doxgen_start_prog = re.compile(r"/[*][*!]")
-        doxgen_end_prog = re.compile(r"[*]/")
-        targets = [{'prog': re.compile(r"[*]\s*Subthread@OpenROBO", re.IGNORECASE), 'infos': self.subthread_infos}, {'prog': re.compile(r"[*]\s*init@OpenROBO", re.IGNORECASE), 'infos': self.init_infos}, {'prog': re.compile(r"[*]\s*term@OpenROBO", re.IGNORECASE), 'infos': self.term_infos}]
+        self.startParse()
         f = open(path, 'r')
-        doxygen_flag = False
-        parsing_flag = False
-        ret = False
-        infos = None
         for line in f:
-            if not doxygen_flag:
-                if parsing_flag:
-                    name = self.parseFunctionPrototype(line)
-                    if name is not None:
-                        infos.append(name)
-                        parsing_flag = False
-                        ret = True
-                elif doxgen_start_prog.search(line):
-                    doxygen_flag = True
-                continue
-            if doxgen_end_prog.search(line):
-                doxygen_flag = False
-                continue
-            if not parsing_flag:
-                for t in targets:
-                    if t['prog'].search(line):
-                        infos = t['infos']
-                        parsing_flag = True
-                        break
-                continue
-
+            self.parseLine(line, DOXYGEN_START_PROG.search(line), DOXYGEN_END_PROG.search(line))
         f.close()
 
-        return ret
+        return self.ret
 
 
 class CStructParser:
@@ -234,8 +1922,11 @@ class CStructParser:
             def __repr__(self):
                 return """<full_type: "%s", type: "%s", is_array: %s, array_num: %d>""" % (self.full_type, self.type, self.is_array, self.array_num)
 
+    readwrite_prog = re.compile(r"[*]\s*ReadWrite@OpenROBO", re.IGNORECASE)
+
     def __init__(self):
         self.infos = []
+        self.startParse()
 
     def parseArrayIndex(self, name):
         n = 1
@@ -298,43 +1989,44 @@ class CStructParser:
 
         return False
 
+    def startParse(self):
+        self.doxygen_flag = False
+        self.parsing_flag = False
+        self.struct_flag = False
+        self.info = None
+        self.ret = False
+
+    def parseLine(self, line, doxygen_start, doxygen_end):
+        if not self.doxygen_flag:
+            if self.parsing_flag:
+                if self.struct_flag:
+                    if self.parseStruct(line, self.info):
+                        self.infos.append(self.info)
+                        self.parsing_flag = False
+                        self.struct_flag = False
+                        self.ret = True
+                else:
+                    self.struct_flag, self.info.name = self.parseStructName(line)
+                return
+            if doxygen_start:
+                self.doxygen_flag = True
+            return
+        if doxygen_end:
+            self.doxygen_flag = False
+            return
+        if not self.parsing_flag:
+            if self.readwrite_prog.search(line):
+                self.info = self.StructInfo()
+                self.parsing_flag = True
+
     def parseFromFile(self, path):
-        doxygen_start_prog = re.compile(r"/[*][*!]")
-        doxygen_end_prog = re.compile(r"[*]/")
-        readwrite_prog = re.compile(r"[*]\s*ReadWrite@OpenROBO", re.IGNORECASE)
+        self.startParse()
         f = open(path, 'r')
-        doxygen_flag = False
-        parsing_flag = False
-        struct_flag = False
-        info = None
-        ret = False
         for line in f:
-            if not doxygen_flag:
-                if parsing_flag:
-                    if struct_flag:
-                        if self.parseStruct(line, info):
-                            self.infos.append(info)
-                            parsing_flag = False
-                            struct_flag = False
-                            ret = True
-                    else:
-                        struct_flag, info.name = self.parseStructName(line)
-                    continue
-                if doxygen_start_prog.search(line):
-                    doxygen_flag = True
-                continue
-            if doxygen_end_prog.search(line):
-                doxygen_flag = False
-                continue
-            if not parsing_flag:
-                if readwrite_prog.search(line):
-                    info = self.StructInfo()
-                    parsing_flag = True
-                continue
-
+            self.parseLine(line, DOXYGEN_START_PROG.search(line), DOXYGEN_END_PROG.search(line))
         f.close()
 
-        return ret
+        return self.ret
 
 
 class CPrototypeParser:
@@ -363,8 +2055,11 @@ class CPrototypeParser:
         def __repr__(self):
             return "%s %s(%s)" % (self.return_type, self.name, repr(self.arg_dict))
 
+    msgfunc_prog = re.compile(r"[*]\s*MessageFunction@OpenROBO", re.IGNORECASE)
+
     def __init__(self):
         self.infos = []
+        self.startParse()
 
     def parseArrayIndex(self, name):
         n = 1
@@ -445,44 +2140,933 @@ class CPrototypeParser:
         info.arg_dict[m.group(2)] = arg
         return True
 
+    def startParse(self):
+        self.start_flag = False
+        self.parsing_flag = False
+        self.info = None
+        self.ret = False
+
+    def parseLine(self, line, doxygen_start, doxygen_end):
+        if not self.start_flag:
+            if self.parsing_flag:
+                if self.parseFunctionPrototype(line, self.info):
+                    self.infos.append(self.info)
+                    self.parsing_flag = False
+                    self.ret = True
+            elif doxygen_start:
+                self.start_flag = True
+            return
+        if doxygen_end:
+            self.start_flag = False
+            return
+        if not self.parsing_flag:
+            if self.msgfunc_prog.search(line):
+                self.info = self.FunctionInfo()
+                self.parsing_flag = True
+            return
+        self.parseDoxgen(line, self.info)
+
     def parseFromFile(self, path):
-        doxgen_start_prog = re.compile(r"/[*][*!]")
-        doxgen_end_prog = re.compile(r"[*]/")
-        msgfunc_prog = re.compile(r"[*]\s*MessageFunction@OpenROBO", re.IGNORECASE)
+        self.startParse()
         f = open(path, 'r')
-        start_flag = False
-        parsing_flag = False
-        info = None
-        ret = False
         for line in f:
-            if not start_flag:
-                if parsing_flag:
-                    if self.parseFunctionPrototype(line, info):
-                        self.infos.append(info)
-                        parsing_flag = False
-                        ret = True
-                elif doxgen_start_prog.search(line):
-                    start_flag = True
-                continue
-            if doxgen_end_prog.search(line):
-                start_flag = False
-                continue
-            if not parsing_flag:
-                if msgfunc_prog.search(line):
-                    info = self.FunctionInfo()
-                    parsing_flag = True
-                continue
-            self.parseDoxgen(line, info)
+            self.parseLine(line, DOXYGEN_START_PROG.search(line), DOXYGEN_END_PROG.search(line))
+        f.close()
+
+        return self.ret
+
+
+class CHeaderScanner:
+    """
+    Single-pass header scanner.
+
+    Reads each header once and feeds every line to the MessageFunction,
+    ReadWrite and Subthread/init/term parsers, so the doxygen start/end
+    detection runs once per line instead of once per parser.
+    Headers without any "@OpenROBO" tag are skipped without line scanning.
+    """
+
+    def __init__(self, cache=None):
+        self.prototype_parser = CPrototypeParser()
+        self.struct_parser = CStructParser()
+        self.subthreadinitterm_parser = CsubthreadinittermTermParser()
+        self.parsers = [self.prototype_parser, self.struct_parser, self.subthreadinitterm_parser]
+        self.cache = cache
+
+    def parseText(self, text):
+        if not OPENROBO_TAG_PROG.search(text):
+            return False, False, False
+        parsers = self.parsers
+        for p in parsers:
+            p.startParse()
+        for line in io.BytesIO(text):
+            doxygen_start = DOXYGEN_START_PROG.search(line)
+            doxygen_end = DOXYGEN_END_PROG.search(line)
+            for p in parsers:
+                p.parseLine(line, doxygen_start, doxygen_end)
+        return tuple(p.ret for p in parsers)
+
+    def parseFromFile(self, path):
+        if self.cache is None:
+            f = open(path, 'r')
+            text = f.read()
+            f.close()
+            return self.parseText(text)
 
+        st = os.stat(path)
+        record = self.cache.lookupStat(path, st)
+        if record is not None:
+            return self.loadRecord(record)
+
+        f = open(path, 'r')
+        text = f.read()
         f.close()
+        digest = self.cache.digest(text)
+        record = self.cache.get(digest)
+        if record is not None:
+            self.cache.setStat(path, st, digest)
+            return self.loadRecord(record)
+
+        marks = self.markInfos()
+        ret = self.parseText(text)
+        self.cache.put(digest, self.makeRecord(marks, ret))
+        self.cache.setStat(path, st, digest)
+        return ret
 
+    def parseFiles(self, paths, jobs=1):
+        """
+        Parse paths with up to jobs worker processes.
+        Results are merged in the order of paths, so the infos are the same
+        as parsing them one by one. Returns parseFromFile's result per path.
+        """
+        if jobs <= 1 or len(paths) <= 1:
+            return [self.parseFromFile(p) for p in paths]
+
+        records = [None] * len(paths)
+        stats = [None] * len(paths)
+        pending = []
+        for n, p in enumerate(paths):
+            if self.cache is not None:
+                stats[n] = os.stat(p)
+                records[n] = self.cache.lookupStat(p, stats[n])
+            if records[n] is None:
+                pending.append(n)
+
+        if pending:
+            jobs = min(jobs, len(pending))
+            pool = multiprocessing.Pool(jobs)
+            try:
+                # map_async().get() with a timeout keeps Ctrl-C working in Python 2
+                results = pool.map_async(parse_header_record, [paths[n] for n in pending], max(1, len(pending) // (jobs * 4))).get(0xffff)
+            finally:
+                pool.terminate()
+                pool.join()
+            for n, (digest, record) in zip(pending, results):
+                records[n] = record
+                if self.cache is not None:
+                    self.cache.put(digest, record)
+                    self.cache.setStat(paths[n], stats[n], digest)
+
+        return [self.loadRecord(r) for r in records]
+
+    def markInfos(self):
+        return (len(self.prototype_parser.infos), len(self.struct_parser.infos), len(self.subthreadinitterm_parser.subthread_infos), len(self.subthreadinitterm_parser.init_infos), len(self.subthreadinitterm_parser.term_infos))
+
+    def makeRecord(self, marks, ret):
+        func_records = []
+        for i in self.prototype_parser.infos[marks[0]:]:
+            arg_records = [(name, a.full_type, a.type, a.is_array, a.array_num, a.is_pointer, a.is_in, a.is_out) for name, a in i.arg_dict.items()]
+            func_records.append((i.name, i.return_type, arg_records))
+        struct_records = []
+        for i in self.struct_parser.infos[marks[1]:]:
+            ele_records = [(name, e.full_type, e.type, e.is_array, e.array_num) for name, e in i.ele_dict.items()]
+            struct_records.append((i.name, ele_records))
+        subthreadinitterm = self.subthreadinitterm_parser
+        return (ret, func_records, struct_records, subthreadinitterm.subthread_infos[marks[2]:], subthreadinitterm.init_infos[marks[3]:], subthreadinitterm.term_infos[marks[4]:])
+
+    def loadRecord(self, record):
+        ret, func_records, struct_records, subthread_infos, init_infos, term_infos = record
+        for name, return_type, arg_records in func_records:
+            info = CPrototypeParser.FunctionInfo()
+            info.name = name
+            info.return_type = return_type
+            for arg_name, full_type, _type, is_array, array_num, is_pointer, is_in, is_out in arg_records:
+                a = CPrototypeParser.FunctionInfo.ArgmentInfo()
+                a.full_type = full_type
+                a.type = _type
+                a.is_array = is_array
+                a.array_num = array_num
+                a.is_pointer = is_pointer
+                a.is_in = is_in
+                a.is_out = is_out
+                info.arg_dict[arg_name] = a
+            self.prototype_parser.infos.append(info)
+        for name, ele_records in struct_records:
+            info = CStructParser.StructInfo()
+            info.name = name
+            for ele_name, full_type, _type, is_array, array_num in ele_records:
+                e = CStructParser.StructInfo.ElementInfo()
+                e.full_type = full_type
+                e.type = _type
+                e.is_array = is_array
+                e.array_num = array_num
+                info.ele_dict[ele_name] = e
+            self.struct_parser.infos.append(info)
+        self.subthreadinitterm_parser.subthread_infos.extend(subthread_infos)
+        self.subthreadinitterm_parser.init_infos.extend(init_infos)
+        self.subthreadinitterm_parser.term_infos.extend(term_infos)
         return ret
 
 
-class SourceCodeGenerator:
+def parse_header_record(path):
+    """ worker of CHeaderScanner.parseFiles; returns (content digest, record) """
+    f = open(path, 'r')
+    text = f.read()
+    f.close()
+    scanner = CHeaderScanner()
+    ret = scanner.parseText(text)
+    return hashlib.sha1(text).hexdigest(), scanner.makeRecord((0, 0, 0, 0, 0), ret)
+
+
+class HeaderParseCache:
+    """
+    On-disk cache of CHeaderScanner results per header.
+
+    Records are keyed by the SHA-1 of the header content. A (mtime, size)
+    index per header path lets unchanged headers hit without being read.
+    The least recently used records are evicted beyond max_entries, and the
+    whole cache is dropped when PARSE_CACHE_VERSION changes.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_PARSE_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self.records = OrderedDict()
+        self.stats = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            f = open(self.path, 'rb')
+            try:
+                data = cPickle.load(f)
+            finally:
+                f.close()
+        except Exception:
+            self.dirty = True
+            return
+        if not isinstance(data, dict) or data.get('version') != PARSE_CACHE_VERSION:
+            self.dirty = True
+            return
+        self.records = data['records']
+        self.stats = data['stats']
+
+    def save(self):
+        self.evict()
+        if not self.dirty:
+            return
+        for path, (_, _, digest) in self.stats.items():
+            if digest not in self.records:
+                del self.stats[path]
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        tmp_path = self.path + '.tmp'
+        try:
+            f = open(tmp_path, 'wb')
+            try:
+                cPickle.dump({'version': PARSE_CACHE_VERSION, 'records': self.records, 'stats': self.stats}, f, cPickle.HIGHEST_PROTOCOL)
+            finally:
+                f.close()
+            replace_file(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.dirty = False
+
+    def digest(self, text):
+        return hashlib.sha1(text).hexdigest()
+
+    def lookupStat(self, path, st):
+        s = self.stats.get(os.path.abspath(path))
+        if s is None or s[0] != st.st_mtime or s[1] != st.st_size:
+            return None
+        return self.get(s[2])
+
+    def setStat(self, path, st, digest):
+        key = os.path.abspath(path)
+        s = (st.st_mtime, st.st_size, digest)
+        if self.stats.get(key) != s:
+            self.stats[key] = s
+            self.dirty = True
+
+    def get(self, digest):
+        record = self.records.pop(digest, None)
+        if record is not None:
+            # LRU order; only persisted together with the next real change
+            self.records[digest] = record
+        return record
+
+    def put(self, digest, record):
+        self.records[digest] = record
+        self.dirty = True
+        self.evict()
+
+    def evict(self):
+        while len(self.records) > self.max_entries:
+            self.records.popitem(last=False)
+            self.dirty = True
+
+
+def message_function_hash(name, seed):
+    """FNV-1a of name from the basis xored with seed, as the generated XX_HashMessageFunctionName."""
+    h = 2166136261 ^ seed
+    for c in name:
+        h = ((h ^ ord(c)) * 16777619) & 0xffffffff
+    # the low bits of FNV-1a do not depend on the high bits of the seed
+    return h ^ (h >> 16)
+
+
+def dispatch_table(names):
+    """
+    Builds a collision-free table for names by hash and displace. The table
+    has the next power of two slots from len(names), so it is not minimal
+    but a slot is found with a mask instead of a modulo. Names are split
+    into buckets by their seed-0 hash and each bucket gets a seed which
+    puts all its names into free slots; a bucket with a single name
+    stores -(slot + 1) instead. Returns (mask, seeds, slots) where
+    slots[i] is the index into names of slot i or None.
+    """
+    size = 1
+    while size < len(names):
+        size *= 2
+    mask = size - 1
+    buckets = [[] for _ in xrange(size)]
+    for n, name in enumerate(names):
+        buckets[message_function_hash(name, 0) & mask].append(n)
+    seeds = [0] * size
+    slots = [None] * size
+    order = sorted(xrange(size), key=lambda b: -len(buckets[b]))
+    for b in order:
+        bucket = buckets[b]
+        if len(bucket) <= 1:
+            break
+        for seed in xrange(1, GEN_DISPATCH_MAX_SEED):
+            taken = set()
+            for n in bucket:
+                i = message_function_hash(names[n], seed) & mask
+                if slots[i] is not None or i in taken:
+                    break
+                taken.add(i)
+            else:
+                break
+        else:
+            raise Exception('no collision-free dispatch table for MessageFunctions : %s' % ", ".join(names[n] for n in bucket))
+        for n in bucket:
+            slots[message_function_hash(names[n], seed) & mask] = n
+        seeds[b] = seed
+    free = (i for i in xrange(size) if slots[i] is None)
+    for b in order:
+        if len(buckets[b]) != 1:
+            continue
+        i = next(free)
+        slots[i] = buckets[b][0]
+        seeds[b] = -(i + 1)
+    return mask, seeds, slots
 
-    def __init__(self, name, func_infos, struct_infos, subthread_infos, init_infos, term_infos, include_headers, include_main_headers):
+
+class SourceCodeGenerator:
+    """
+    Renders XX_Command.[cpp|h], XX_Message.[cpp|h] and XX_Main.[cpp|h].
+
+    Every output is built from the precompiled *_template strings below into
+    an in-memory list of chunks and written with a single write.
+
+    With codec "binary" the parameters of each function are packed with
+    memcpy at fixed offsets into one buffer on the stack, headed by a byte
+    order marker and a hash of the layout, instead of one string-keyed
+    SetParam/GetParam per parameter.
+
+    With a read cache max age, XX_Read_<struct> keeps the last value it read
+    and serves it again without a round trip while it is younger than that,
+    returning OpenROBO_Return_Success as for a newer value; an acknowledged
+    XX_Write_<struct> drops the cached value.
+
+    With subscribe, the TP can subscribe to a ReadWrite struct once, through
+    an operation and a wait like any Start/Wait pair; the subsystem then
+    pushes each XX_Publish_<struct> as an unsolicited return message tagged
+    "_push". Pushes can interleave with the replies of calls in flight, so
+    every Command call receives through XX_ReceiveMessage, which sets the
+    pushes aside for XX_Receive_<struct>; XX_Receive_<struct> in turn queues
+    the replies it meets while it waits for a push.
+
+    With batch, XX_Read_<struct>/XX_Write_<struct> are split into a request
+    and a receive half, so XX_ReadBatch/XX_WriteBatch can send the requests
+    for any subset of the structs back to back before collecting the
+    replies. The split XX_Read_<struct>/XX_Write_<struct> then also return
+    the error of a failed send instead of waiting for a reply.
+
+    With dispatch table, XX_Main.cpp carries a collision-free hash table of
+    the MessageFunctions, which XX_FindMessageFunction looks names up in.
+    main hands XX_FindMessageFunction to OpenROBO_MainWithLookup instead of
+    an entry table to OpenROBO_Main, so each operation message is dispatched
+    with one hash and one strcmp; the runtime must provide that entry point.
+    """
+
+    message_c_header_template = '#include "OpenROBO.h"\n\n'
+    message_c_declaration_template = 'void Message_%s(const char* message)\n{\n\tint res;\n\tchar *returnMessage;\n\n'
+    message_c_string_variable_template = '\tconst char* _%s;\n'
+    message_c_array_variable_template = '\t%s _%s[%d];\n'
+    message_c_variable_template = '\t%s _%s;\n'
+    message_c_get_param_array_template = '\tOpenROBO_Message_GetParam_%sArray(message, "%s", _%s, %d);\n'
+    message_c_get_param_template = '\tOpenROBO_Message_GetParam_%s(message, "%s", &_%s);\n'
+    message_c_call_template = '\tres = %s(%s);\n'
+    message_c_set_param_start_template = '\tOpenROBO_Message_GetBuffer(&returnMessage);\n\tOpenROBO_Message_MakeReturnMessage(returnMessage, "%s");\n\n'
+    message_c_set_param_array_template = '\tOpenROBO_Message_SetParam_%sArray(returnMessage, "%s", _%s, %d);\n'
+    message_c_set_param_template = '\tOpenROBO_Message_SetParam_%s(returnMessage, "%s", &_%s);\n'
+    message_c_set_param_end_template = '\tOpenROBO_Message_SetReturnValue(returnMessage, res);\n'
+    message_c_send_template = '\n\tOpenROBO_Socket_SendReturnMessage(returnMessage);\n\n'
+    message_c_free_template = '\tOpenROBO_Message_Free(%s);\n'
+    message_h_template = 'void Message_%s(const char* message);\n'
+    message_h_subscribe_template = (
+        'void Message_Subscribe_%(struct)s(const char* message);\n'
+        'struct %(struct)s;\n'
+        'int %(prefix)s_Publish_%(struct)s(const struct %(struct)s *_%(struct)s);\n')
+    message_c_subscribe_template = (
+        'static double %(prefix)s_%(struct)s_push_period = -1.0;\n'
+        'static double %(prefix)s_%(struct)s_push_time = 0.0;\n\n'
+        'void Message_Subscribe_%(struct)s(const char* message)\n{\n'
+        '\tdouble rate;\n'
+        '\tchar *returnMessage;\n\n'
+        '\tOpenROBO_Message_GetParam_double(message, "rate", &rate);\n'
+        '\t%(prefix)s_%(struct)s_push_period = rate > 0.0 ? 1.0 / rate : rate;\n'
+        '\t%(prefix)s_%(struct)s_push_time = 0.0;\n\n'
+        '\tOpenROBO_Message_GetBuffer(&returnMessage);\n'
+        '\tOpenROBO_Message_MakeReturnMessage(returnMessage, "Subscribe_%(struct)s");\n'
+        '\tOpenROBO_Message_SetReturnValue(returnMessage, OpenROBO_Return_Success);\n'
+        '\tOpenROBO_Socket_SendReturnMessage(returnMessage);\n'
+        '}\n\n'
+        '/*\n'
+        ' * An unsolicited return message tagged "_push"; it may reach the TP between\n'
+        ' * a request and its reply, where %(prefix)s_ReceiveMessage sets it aside.\n'
+        ' */\n'
+        'int %(prefix)s_Publish_%(struct)s(const struct %(struct)s *_%(struct)s)\n{\n'
+        '\tconst int push = %(index)d;\n'
+        '\tchar *message;\n'
+        '\tdouble now;\n\n'
+        '\tif (%(prefix)s_%(struct)s_push_period < 0.0) {\n'
+        '\t\treturn OpenROBO_Return_NotUpdated;\n'
+        '\t}\n'
+        '\tnow = %(prefix)s_Clock();\n'
+        '\tif (now - %(prefix)s_%(struct)s_push_time < %(prefix)s_%(struct)s_push_period) {\n'
+        '\t\treturn OpenROBO_Return_NotUpdated;\n'
+        '\t}\n'
+        '\t%(prefix)s_%(struct)s_push_time = now;\n\n'
+        '\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeReturnMessage(message, "Push_%(struct)s");\n'
+        '\tOpenROBO_Message_SetParam_int(message, "_push", &push);\n')
+    message_c_publish_end_template = '\n\treturn OpenROBO_Socket_SendReturnMessage(message);\n}\n\n'
+    message_h_find_template = (
+        '\ntypedef void (*%(prefix)s_MessageFunction_t)(const char* message);\n'
+        '%(prefix)s_MessageFunction_t %(prefix)s_FindMessageFunction(const char* name);\n')
+
+    binary_c_header_template = (
+        '#include <string.h>\n\n'
+        '#ifndef OPENROBO_LAYOUT_HEADER_SIZE\n'
+        '#define OPENROBO_LAYOUT_HEADER_SIZE (2 * sizeof(unsigned int))\n'
+        '#define OPENROBO_LAYOUT_BYTE_ORDER 0x01020304u\n'
+        '#define OPENROBO_BINARY_LAYOUT_MISMATCH (-1000)\n'
+        '#endif\n\n')
+    binary_c_names_template = '#define %s_%s_LAYOUT_NAMES 0x%su\n'
+    binary_c_fold_template = '#define %s_%s_LAYOUT_%s_%s ((%s * 16777619u ^ (unsigned int)(%s)) * 16777619u ^ (unsigned int)(%s))\n'
+    binary_c_layout_template = '#define %s_%s_LAYOUT %s\n'
+    binary_c_offset_first_template = '#define %s_%s_%s_%s OPENROBO_LAYOUT_HEADER_SIZE\n'
+    binary_c_offset_template = '#define %s_%s_%s_%s (%s_%s_%s_%s + %s)\n'
+    binary_c_size_empty_template = '#define %s_%s_%s_SIZE OPENROBO_LAYOUT_HEADER_SIZE\n'
+    binary_c_size_template = '#define %s_%s_%s_SIZE (%s_%s_%s_%s + %s)\n'
+    binary_c_declaration_template = (
+        '\tchar buffer[%(prefix)s_%(func)s_%(dir)s_SIZE];\n'
+        '\tconst unsigned int layout[2] = {OPENROBO_LAYOUT_BYTE_ORDER, %(prefix)s_%(func)s_LAYOUT};\n')
+    binary_c_check_template = (
+        '\tconst char *received;\n'
+        '\tint size;\n')
+    binary_c_pack_start_template = '\tmemcpy(buffer, layout, OPENROBO_LAYOUT_HEADER_SIZE);\n'
+    binary_c_pack_template = '\tmemcpy(buffer + %s_%s_%s_%s, %s_%s, %s);\n'
+    binary_c_pack_end_template = '\tOpenROBO_Message_SetBinary(%s, buffer, %s_%s_%s_SIZE);\n'
+    binary_c_unpack_template = '\tmemcpy(%s, received + %s_%s_%s_%s, %s);\n'
+    message_c_binary_get_param_template = (
+        '\tif (OpenROBO_Message_GetBinary(message, &received, &size) != OpenROBO_Return_Success\n'
+        '\t\t|| size != %(prefix)s_%(func)s_IN_SIZE\n'
+        '\t\t|| memcmp(received, layout, OPENROBO_LAYOUT_HEADER_SIZE) != 0) {\n'
+        '\t\tOpenROBO_Message_GetBuffer(&returnMessage);\n'
+        '\t\tOpenROBO_Message_MakeReturnMessage(returnMessage, "%(func)s");\n'
+        '\t\tOpenROBO_Message_SetReturnValue(returnMessage, OPENROBO_BINARY_LAYOUT_MISMATCH);\n'
+        '\t\tOpenROBO_Socket_SendReturnMessage(returnMessage);\n'
+        '\t\treturn;\n'
+        '\t}\n')
+    command_c_binary_get_param_template = (
+        '\tif (OpenROBO_Message_GetBinary(message, &received, &size) != OpenROBO_Return_Success\n'
+        '\t\t|| size != %(prefix)s_%(func)s_OUT_SIZE\n'
+        '\t\t|| memcmp(received, layout, OPENROBO_LAYOUT_HEADER_SIZE) != 0) {\n'
+        '\t\treturn OPENROBO_BINARY_LAYOUT_MISMATCH;\n'
+        '\t}\n')
+
+    command_c_header_template = '#include "OpenROBO.h"\n\n#include "%s_Command.h"\n\n'
+    command_c_static_array_template = 'static %s *%s_%s;\n'
+    command_c_static_template = 'static %s %s_%s;\n'
+    command_c_batch_read_request_template = (
+        'static int %(prefix)s_RequestRead_%(struct)s()\n{\n'
+        '\tchar *message;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeReadMessage(message, "%(struct)s");\n'
+        '\treturn OpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n'
+        '}\n\n')
+    command_c_read_signature_template = 'int %(prefix)s_Read_%(struct)s(struct %(prefix)s_%(struct)s *_%(struct)s)\n{\n'
+    command_c_batch_read_declaration_template = '\tint res;\n'
+    command_c_batch_read_call_template = (
+        '\n\tres = %(prefix)s_RequestRead_%(struct)s();\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\treturn %(prefix)s_ReceiveRead_%(struct)s(_%(struct)s);\n'
+        '}\n\n')
+    command_c_batch_read_receive_template = (
+        'static int %(prefix)s_ReceiveRead_%(struct)s(struct %(prefix)s_%(struct)s *_%(struct)s)\n{\n'
+        '\tstatic double last_time = 0.0;\n'
+        '\tdouble time;\n'
+        '\tchar *message;\n'
+        '\tint res;\n'
+        '\n\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetTime(message, &time);\n')
+    command_c_read_declaration_template = (
+        '\tstatic double last_time = 0.0;\n'
+        '\tdouble time;\n'
+        '\tchar *message;\n'
+        '\tint res;\n')
+    command_c_read_start_template = (
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeReadMessage(message, "%(struct)s");\n'
+        '\tOpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n\n'
+        '\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetTime(message, &time);\n')
+    command_c_read_end_template = (
+        '\n\tif (time > last_time) {\n'
+        '\t\tres = OpenROBO_Return_Success;\n'
+        '\t\tlast_time = time;\n'
+        '\t} else {\n'
+        '\t\tres = OpenROBO_Return_NotUpdated;\n'
+        '\t}\n\n'
+        '\treturn res;\n'
+        '}\n\n')
+    clock_c_template = (
+        '#include <time.h>\n\n'
+        'static double %(prefix)s_Clock(void)\n{\n'
+        '\tstruct timespec ts;\n'
+        '\tclock_gettime(CLOCK_MONOTONIC, &ts);\n'
+        '\treturn ts.tv_sec + ts.tv_nsec * 1e-9;\n'
+        '}\n\n')
+    command_c_read_cache_template = (
+        'static struct %(prefix)s_%(struct)s %(prefix)s_%(struct)s_cache;\n'
+        'static double %(prefix)s_%(struct)s_cache_time = -1.0;\n'
+        'static double %(prefix)s_%(struct)s_cache_max_age = %(max_age)r;\n'
+        'static unsigned long %(prefix)s_%(struct)s_cache_hits = 0;\n'
+        'static unsigned long %(prefix)s_%(struct)s_cache_misses = 0;\n\n'
+        'void %(prefix)s_SetReadCacheMaxAge_%(struct)s(double max_age)\n{\n'
+        '\t%(prefix)s_%(struct)s_cache_max_age = max_age;\n'
+        '}\n\n'
+        'void %(prefix)s_GetReadCacheCount_%(struct)s(unsigned long *hits, unsigned long *misses)\n{\n'
+        '\t*hits = %(prefix)s_%(struct)s_cache_hits;\n'
+        '\t*misses = %(prefix)s_%(struct)s_cache_misses;\n'
+        '}\n\n')
+    command_c_read_cache_declaration_template = '\tdouble now;\n'
+    command_c_read_cache_check_template = (
+        '\n\tnow = %(prefix)s_Clock();\n'
+        '\tif (%(prefix)s_%(struct)s_cache_time >= 0.0 && now - %(prefix)s_%(struct)s_cache_time < %(prefix)s_%(struct)s_cache_max_age) {\n'
+        '\t\t*_%(struct)s = %(prefix)s_%(struct)s_cache;\n'
+        '\t\t%(prefix)s_%(struct)s_cache_hits++;\n'
+        '\t\treturn OpenROBO_Return_Success;\n'
+        '\t}\n'
+        '\t%(prefix)s_%(struct)s_cache_misses++;\n')
+    command_c_read_cache_store_template = (
+        '\n\t%(prefix)s_%(struct)s_cache = *_%(struct)s;\n'
+        '\t%(prefix)s_%(struct)s_cache_time = %(prefix)s_Clock();\n')
+    command_c_write_cache_invalidate_template = (
+        '\tif (res == OpenROBO_Return_Success) {\n'
+        '\t\t%(prefix)s_%(struct)s_cache_time = -1.0;\n'
+        '\t}\n\n')
+    command_c_push_static_template = (
+        'static struct %(prefix)s_%(struct)s %(prefix)s_%(struct)s_pushed;\n'
+        'static int %(prefix)s_%(struct)s_pushed_new = 0;\n')
+    command_c_push_store_start_template = (
+        '\nstatic void %(prefix)s_StorePush(const char* message, int push)\n{\n'
+        '\tswitch (push) {\n')
+    command_c_push_store_case_template = '\tcase %(index)d:\n'
+    command_c_push_get_param_array_template = '\t\tOpenROBO_Message_GetParam_%sArray(message, "%s", %s_%s_pushed.%s, %d);\n'
+    command_c_push_get_param_template = '\t\tOpenROBO_Message_GetParam_%s(message, "%s", &%s_%s_pushed.%s);\n'
+    command_c_push_store_case_end_template = '\t\t%(prefix)s_%(struct)s_pushed_new = 1;\n\t\tbreak;\n'
+    command_c_push_store_end_template = (
+        '\t}\n'
+        '}\n\n'
+        '#ifndef OPENROBO_PENDING_REPLY_MAX\n'
+        '#define OPENROBO_PENDING_REPLY_MAX 16\n'
+        '#define OPENROBO_PENDING_REPLY_OVERFLOW (-1001)\n'
+        '#endif\n\n'
+        'static char *%(prefix)s_pending_reply[OPENROBO_PENDING_REPLY_MAX];\n'
+        'static int %(prefix)s_pending_reply_count = 0;\n\n'
+        '/*\n'
+        ' * Pushes are return messages the subsystem sends on its own, so they\n'
+        ' * interleave with the replies of the calls in flight. Every call below\n'
+        ' * receives its reply here with wait_push -1: pushes are set aside for\n'
+        ' * %(prefix)s_Receive_<struct>, which waits with the index of its struct and\n'
+        ' * queues the replies it meets, in order, for the calls they belong to.\n'
+        ' */\n'
+        'static int %(prefix)s_ReceiveMessage(const char* prefix, char **message, int wait_push)\n{\n'
+        '\tint res;\n'
+        '\tint push;\n'
+        '\tint i;\n\n'
+        '\tif (wait_push < 0 && %(prefix)s_pending_reply_count > 0) {\n'
+        '\t\t*message = %(prefix)s_pending_reply[0];\n'
+        '\t\t%(prefix)s_pending_reply_count--;\n'
+        '\t\tfor (i = 0; i < %(prefix)s_pending_reply_count; i++) {\n'
+        '\t\t\t%(prefix)s_pending_reply[i] = %(prefix)s_pending_reply[i + 1];\n'
+        '\t\t}\n'
+        '\t\treturn OpenROBO_Return_Success;\n'
+        '\t}\n'
+        '\tfor (;;) {\n'
+        '\t\tres = OpenROBO_Socket_ReceiveReturnMessage(prefix, message);\n'
+        '\t\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\t\treturn res;\n'
+        '\t\t}\n'
+        '\t\tif (OpenROBO_Message_GetParam_int(*message, "_push", &push) != OpenROBO_Return_Success) {\n'
+        '\t\t\tif (wait_push < 0) {\n'
+        '\t\t\t\treturn res;\n'
+        '\t\t\t}\n'
+        '\t\t\tif (%(prefix)s_pending_reply_count == OPENROBO_PENDING_REPLY_MAX) {\n'
+        '\t\t\t\treturn OPENROBO_PENDING_REPLY_OVERFLOW;\n'
+        '\t\t\t}\n'
+        '\t\t\t%(prefix)s_pending_reply[%(prefix)s_pending_reply_count++] = *message;\n'
+        '\t\t\tcontinue;\n'
+        '\t\t}\n'
+        '\t\t%(prefix)s_StorePush(*message, push);\n'
+        '\t\tif (push == wait_push) {\n'
+        '\t\t\treturn res;\n'
+        '\t\t}\n'
+        '\t}\n'
+        '}\n\n')
+    command_c_subscribe_template = (
+        'int %(prefix)s_Subscribe_%(struct)s(double rate)\n{\n'
+        '\tchar *message;\n'
+        '\tint res;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeOperationMessage(message, "Subscribe_%(struct)s");\n'
+        '\tOpenROBO_Message_SetParam_double(message, "rate", &rate);\n\n'
+        '\tres = OpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeWaitMessage(message, "Subscribe_%(struct)s");\n'
+        '\tOpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n\n'
+        '\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n\n'
+        '\treturn res;\n'
+        '}\n\n'
+        'int %(prefix)s_Unsubscribe_%(struct)s()\n{\n'
+        '\treturn %(prefix)s_Subscribe_%(struct)s(-1.0);\n'
+        '}\n\n'
+        'int %(prefix)s_Receive_%(struct)s(struct %(prefix)s_%(struct)s *_%(struct)s)\n{\n'
+        '\tchar *message;\n'
+        '\tint res;\n\n'
+        '\tif (!%(prefix)s_%(struct)s_pushed_new) {\n'
+        '\t\tres = %(prefix)s_ReceiveMessage("%(prefix)s", &message, %(index)d);\n'
+        '\t\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\t\treturn res;\n'
+        '\t\t}\n'
+        '\t}\n'
+        '\t*_%(struct)s = %(prefix)s_%(struct)s_pushed;\n'
+        '\t%(prefix)s_%(struct)s_pushed_new = 0;\n\n'
+        '\treturn OpenROBO_Return_Success;\n'
+        '}\n\n')
+    command_c_batch_write_start_template = (
+        'static int %(prefix)s_RequestWrite_%(struct)s(const struct %(prefix)s_%(struct)s *_%(struct)s)\n{\n'
+        '\tchar *message;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeWriteMessage(message, "%(struct)s");\n')
+    command_c_batch_write_end_template = (
+        '\n\treturn OpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n'
+        '}\n\n'
+        'static int %(prefix)s_ReceiveWrite_%(struct)s()\n{\n'
+        '\tchar *message;\n'
+        '\tint res;\n'
+        '\n\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n\n')
+    command_c_batch_write_call_template = (
+        'int %(prefix)s_Write_%(struct)s(const struct %(prefix)s_%(struct)s *_%(struct)s)\n{\n'
+        '\tint res;\n'
+        '\n\tres = %(prefix)s_RequestWrite_%(struct)s(_%(struct)s);\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\treturn %(prefix)s_ReceiveWrite_%(struct)s();\n'
+        '}\n\n')
+    command_c_write_start_template = (
+        'int %(prefix)s_Write_%(struct)s(const struct %(prefix)s_%(struct)s *_%(struct)s)\n{\n'
+        '\tchar *message;\n'
+        '\tint res;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeWriteMessage(message, "%(struct)s");\n')
+    command_c_write_end_template = (
+        '\n\tOpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n\n'
+        '\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n\n')
+    command_c_write_return_template = '\treturn res;\n}\n\n'
+    command_c_batch_header_template = '#include <stddef.h>\n\n'
+    command_c_batch_start_template = (
+        'int %(prefix)s_%(op)sBatch(%(args)s)\n{\n'
+        '\tint res;\n'
+        '\tint error = OpenROBO_Return_Success;\n'
+        '\tint updated = 0;\n\n')
+    command_c_batch_request_template = (
+        '\tif (_%(struct)s != NULL && (res = %(prefix)s_Request%(op)s_%(struct)s(%(arg)s)) != OpenROBO_Return_Success) {\n'
+        '\t\terror = res;\n'
+        '\t\t_%(struct)s = NULL;\n'
+        '\t}\n')
+    command_c_batch_receive_template = (
+        '\tif (_%(struct)s != NULL) {\n'
+        '\t\tres = %(prefix)s_Receive%(op)s_%(struct)s(%(arg)s);\n'
+        '\t\tif (res == OpenROBO_Return_Success) {\n'
+        '\t\t\tupdated = 1;\n'
+        '\t\t} else if (res != OpenROBO_Return_NotUpdated && error == OpenROBO_Return_Success) {\n'
+        '\t\t\terror = res;\n'
+        '\t\t}\n'
+        '\t}\n')
+    command_c_batch_end_template = (
+        '\n\tif (error != OpenROBO_Return_Success) {\n'
+        '\t\treturn error;\n'
+        '\t}\n'
+        '\treturn updated ? OpenROBO_Return_Success : OpenROBO_Return_NotUpdated;\n'
+        '}\n\n')
+    command_h_batch_template = (
+        'int %(prefix)s_ReadBatch(%(read_args)s);\n'
+        'int %(prefix)s_WriteBatch(%(write_args)s);\n'
+        '\n')
+    command_batch_read_argment_template = 'struct %s_%s *_%s'
+    command_batch_write_argment_template = 'const struct %s_%s *_%s'
+    command_c_call_template = (
+        'int %(prefix)s_%(func)s(%(args)s)\n{\n'
+        '\tint res;\n'
+        '\tres = %(prefix)s_Start_%(func)s(%(call_args)s);\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tres = %(prefix)s_Wait_%(func)s();\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\treturn OpenROBO_Return_Success;\n}\n\n')
+    command_c_start_start_template = (
+        'int %(prefix)s_Start_%(func)s(%(args)s)\n{\n'
+        '\tint res;\n'
+        '\tchar *message;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeOperationMessage(message, "%(func)s");\n\n')
+    command_c_start_send_template = (
+        '\n\tres = OpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n')
+    command_c_start_store_template = '\t%s_%s = _%s;\n'
+    command_c_start_end_template = '\n\treturn res;\n}\n\n'
+    command_c_set_param_array_template = '\tOpenROBO_Message_SetParam_%sArray(message, "%s", _%s, %d);\n'
+    command_c_set_param_template = '\tOpenROBO_Message_SetParam_%s(message, "%s", &_%s);\n'
+    command_c_get_param_array_template = '\tOpenROBO_Message_GetParam_%sArray(message, "%s", %s_%s, %d);\n'
+    command_c_get_param_template = '\tOpenROBO_Message_GetParam_%s(message, "%s", %s_%s);\n'
+    command_c_struct_set_param_array_template = '\tOpenROBO_Message_SetParam_%sArray(message, "%s", _%s->%s, %d);\n'
+    command_c_struct_set_param_template = '\tOpenROBO_Message_SetParam_%s(message, "%s", &_%s->%s);\n'
+    command_c_struct_get_param_array_template = '\tOpenROBO_Message_GetParam_%sArray(message, "%s", _%s->%s, %d);\n'
+    command_c_struct_get_param_template = '\tOpenROBO_Message_GetParam_%s(message, "%s", &_%s->%s);\n'
+    command_c_stop_template = (
+        'int %(prefix)s_Stop_%(func)s()\n{\n'
+        '\tchar *message;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeStopMessage(message, "%(func)s");\n'
+        '\tOpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n\n'
+        '\treturn %(prefix)s_Wait_%(func)s();\n}\n\n')
+    command_c_wait_start_template = (
+        'int %(prefix)s_Wait_%(func)s()\n{\n'
+        '\tchar *message;\n'
+        '\tint res;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeWaitMessage(message, "%(func)s");\n'
+        '\tOpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n\n'
+        '\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n\n')
+    command_c_wait_end_template = '\n\treturn res;\n}\n\n'
+    command_c_binary_start_start_template = (
+        'int %(prefix)s_Start_%(func)s(%(args)s)\n{\n'
+        '\tchar buffer[%(prefix)s_%(func)s_IN_SIZE];\n'
+        '\tconst unsigned int layout[2] = {OPENROBO_LAYOUT_BYTE_ORDER, %(prefix)s_%(func)s_LAYOUT};\n'
+        '\tint res;\n'
+        '\tchar *message;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeOperationMessage(message, "%(func)s");\n\n')
+    command_c_binary_wait_start_template = (
+        'int %(prefix)s_Wait_%(func)s()\n{\n'
+        '\tconst unsigned int layout[2] = {OPENROBO_LAYOUT_BYTE_ORDER, %(prefix)s_%(func)s_LAYOUT};\n'
+        '\tconst char *received;\n'
+        '\tint size;\n'
+        '\tchar *message;\n'
+        '\tint res;\n'
+        '\n\tOpenROBO_Message_GetBuffer(&message);\n'
+        '\tOpenROBO_Message_MakeWaitMessage(message, "%(func)s");\n'
+        '\tOpenROBO_Socket_SendCommandMessage("%(prefix)s", message);\n\n'
+        '\tres = %(receive)s;\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\treturn res;\n'
+        '\t}\n\n'
+        '\tOpenROBO_Message_GetReturnValue(message, &res);\n\n')
+    command_array_argment_template = '%s _%s[%d]'
+    command_argment_template = '%s _%s'
+    command_h_template = (
+        'int %(prefix)s_%(func)s(%(args)s);\n'
+        'int %(prefix)s_Start_%(func)s(%(args)s);\n'
+        'int %(prefix)s_Stop_%(func)s();\n'
+        'int %(prefix)s_Wait_%(func)s();\n'
+        '\n')
+    command_h_struct_start_template = 'struct %s_%s {\n'
+    command_h_struct_array_element_template = '\t%s %s[%d];\n'
+    command_h_struct_element_template = '\t%s %s;\n'
+    command_h_struct_end_template = (
+        '};\n'
+        'int %(prefix)s_Read_%(struct)s(struct %(prefix)s_%(struct)s *_%(struct)s);\n'
+        'int %(prefix)s_Write_%(struct)s(const struct %(prefix)s_%(struct)s *_%(struct)s);\n'
+        '\n')
+    command_h_subscribe_template = (
+        'int %(prefix)s_Subscribe_%(struct)s(double rate);\n'
+        'int %(prefix)s_Unsubscribe_%(struct)s();\n'
+        'int %(prefix)s_Receive_%(struct)s(struct %(prefix)s_%(struct)s *_%(struct)s);\n'
+        '\n')
+    command_h_read_cache_template = (
+        'void %(prefix)s_SetReadCacheMaxAge_%(struct)s(double max_age);\n'
+        'void %(prefix)s_GetReadCacheCount_%(struct)s(unsigned long *hits, unsigned long *misses);\n'
+        '\n')
+
+    main_h_address_template = '#define TASKPLANNER_ADDRESS "192.168.0.200"\n'
+    main_h_port_template = '#define TASKPLANNER_PORT 50001\n'
+    main_h_subsystem_list_template = '\nstatic const char* const subsystemList[] = {\n\t"HRI",\n\t"AC",\n\t"TC",\n\t"VC",\n\t"VS",\n\t"CG",\n\tNULL\n};\n'
+    main_c_header_template = '#include <stdio.h>\n#include "%(prefix)s_Main.h"\n#include "OpenROBO.h"\n#include "%(prefix)s_Message.h"\n\n'
+    main_c_include_template = '#include "%s"\n'
+    main_c_startup_template = (
+        '\n'
+        'int main(int argc, char *argv[])\n{\n'
+        '\tint res;\n'
+        '\tres = OpenROBO_StartupMainThread("%s");\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\tfprintf(stderr, "error: startup\\n");\n'
+        '\t\treturn res;\n'
+        '\t}\n')
+    main_c_accept_template = '\tres = OpenROBO_Socket_AcceptConnection(TASKPLANNER_PORT, subsystemList);\n'
+    main_c_connect_template = '\tres = OpenROBO_Socket_MakeConnection(TASKPLANNER_ADDRESS, TASKPLANNER_PORT);\n'
+    main_c_connection_check_template = (
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\tfprintf(stderr, "error: make connection\\n");\n'
+        '\t\treturn res;\n'
+        '\t}\n\n')
+    main_c_subthread_template = (
+        '\tres = OpenROBO_Thread_CreateSubthread(%(subthread)s, "%(subthread)s", argc, argv);\n'
+        '\tif (res != OpenROBO_Return_Success) {\n'
+        '\t\tfprintf(stderr, "error: create subthread \\"%(subthread)s\\"\\n");\n'
+        '\t\treturn res;\n'
+        '\t}\n')
+    main_c_dispatch_start_template = (
+        '\n#include <string.h>\n\n'
+        '#define %(prefix)s_MESSAGE_FUNCTION_MASK %(mask)du\n\n'
+        'static const int messageFunctionSeed[] = {')
+    main_c_dispatch_names_template = '\n};\n\nstatic const char* const messageFunctionName[] = {\n'
+    main_c_dispatch_name_template = '\t"%s",\n'
+    main_c_dispatch_functions_template = '};\n\nstatic const %s_MessageFunction_t messageFunction[] = {\n'
+    main_c_dispatch_function_template = '\tMessage_%s,\n'
+    main_c_dispatch_empty_template = '\tNULL,\n'
+    main_c_dispatch_end_template = (
+        '};\n\n'
+        'static unsigned int %(prefix)s_HashMessageFunctionName(const char* name, unsigned int seed)\n{\n'
+        '\tunsigned int h = 2166136261u ^ seed;\n'
+        '\twhile (*name) {\n'
+        '\t\th = (h ^ (unsigned char)*name++) * 16777619u;\n'
+        '\t}\n'
+        '\treturn (h ^ (h >> 16)) & %(prefix)s_MESSAGE_FUNCTION_MASK;\n'
+        '}\n\n'
+        '%(prefix)s_MessageFunction_t %(prefix)s_FindMessageFunction(const char* name)\n{\n'
+        '\tint seed = messageFunctionSeed[%(prefix)s_HashMessageFunctionName(name, 0)];\n'
+        '\tunsigned int i = seed < 0 ? (unsigned int)(-seed - 1) : %(prefix)s_HashMessageFunctionName(name, seed);\n\n'
+        '\tif (messageFunctionName[i] == NULL || strcmp(messageFunctionName[i], name) != 0) {\n'
+        '\t\treturn NULL;\n'
+        '\t}\n'
+        '\treturn messageFunction[i];\n'
+        '}\n')
+    main_c_entry_start_template = '\n\tOpenROBO_MessageFunctionEntry_t messageFunctionEntry[] = {\n'
+    main_c_entry_template = '\t\t{Message_%s, "%s"},\n'
+    main_c_entry_end_template = '\t\tOPENROBO_END_OF_MESSAGE_FUNCTION_ENTRY\n\t};\n\n\tres = OpenROBO_Main(messageFunctionEntry);\n\n'
+    main_c_lookup_template = '\n\tres = OpenROBO_MainWithLookup(%s_FindMessageFunction);\n\n'
+    main_c_term_template = '\t%s();\n'
+    main_c_end_template = '\n\treturn res;\n}'
+
+    def __init__(self, name, func_infos, struct_infos, subthread_infos, init_infos, term_infos, include_headers, include_main_headers, codec='text', read_cache=None, subscribe=False, dispatch_table=False, batch=False):
+        if codec not in GEN_CODECS:
+            raise Exception('unknown codec : "%s"' % codec)
         self.name = name
+        self.codec = codec
+        self.read_cache = read_cache
+        self.subscribe = subscribe
+        if subscribe:
+            # pushes may arrive first; receive the replies through XX_ReceiveMessage
+            self.receive_call = '%s_ReceiveMessage("%s", &message, -1)' % (name, name)
+        else:
+            self.receive_call = 'OpenROBO_Socket_ReceiveReturnMessage("%s", &message)' % (name)
+        self.dispatch_table = dispatch_table
+        self.batch = batch
         self.func_infos = func_infos
         self.subthread_infos = subthread_infos
         self.init_infos = init_infos
@@ -490,355 +3074,615 @@ class SourceCodeGenerator:
         self.struct_infos = struct_infos
         self.headers = include_headers
         self.main_headers = include_main_headers
+        self.updated_paths = []
+        self.dict_items = {}
+        self.command_argments = {}
+        self.binary_layouts = {}
+
+    def writeOutput(self, path, f):
+        if write_if_changed(path, ''.join(f)):
+            self.updated_paths.append(path)
+
+    def dictItems(self, d):
+        # OrderedDict.items() runs in Python; list each dict only once
+        items = self.dict_items.get(id(d))
+        if items is None:
+            items = self.dict_items[id(d)] = d.items()
+        return items
+
+    def messageFunctionNames(self):
+        names = [i.name for i in self.func_infos]
+        if self.subscribe:
+            names.extend("Subscribe_" + i.name for i in self.struct_infos)
+        return names
+
+    def binaryLayout(self, i):
+        """
+        Returns (hash, declarations, in fields, out fields) of function i;
+        a field is (name, argment, size expression). The hash covers the
+        name, type, element count and direction of every argment; the sizes
+        and offsets the compiler gives them are folded in by genBinaryLayout.
+        """
+        layout = self.binary_layouts.get(id(i))
+        if layout is not None:
+            return layout
+        desc = [i.name]
+        declarations = []
+        in_fields = []
+        out_fields = []
+        for name, a in self.dictItems(i.arg_dict):
+            if a.type == "string":
+                raise Exception('binary codec cannot lay out string argment "%s" of %s' % (name, i.name))
+            value_type = " ".join(re.sub(r"\bconst\b|[*]", " ", a.full_type).split())
+            size = "sizeof(%s)" % (value_type)
+            if a.is_array:
+                size = "%s * %d" % (size, a.array_num)
+                declarations.append(self.message_c_array_variable_template % (value_type, name, a.array_num))
+            else:
+                declarations.append(self.message_c_variable_template % (value_type, name))
+            desc.append("%s:%s[%d]:%d%d" % (name, value_type, a.array_num, a.is_in, a.is_out))
+            if a.is_in:
+                in_fields.append((name, a, size))
+            if a.is_out:
+                out_fields.append((name, a, size))
+        layout = (hashlib.sha1(";".join(desc)).hexdigest()[:8], declarations, in_fields, out_fields)
+        self.binary_layouts[id(i)] = layout
+        return layout
+
+    def genBinaryLayout(self, f):
+        f.append(self.binary_c_header_template)
+        for i in self.func_infos:
+            digest, _, in_fields, out_fields = self.binaryLayout(i)
+            for direction, fields in (('IN', in_fields), ('OUT', out_fields)):
+                prev = None
+                for name, a, size in fields:
+                    if prev is None:
+                        f.append(self.binary_c_offset_first_template % (self.name, i.name, direction, name))
+                    else:
+                        f.append(self.binary_c_offset_template % (self.name, i.name, direction, name, self.name, i.name, direction, prev[0], prev[2]))
+                    prev = (name, a, size)
+                if prev is None:
+                    f.append(self.binary_c_size_empty_template % (self.name, i.name, direction))
+                else:
+                    f.append(self.binary_c_size_template % (self.name, i.name, direction, self.name, i.name, direction, prev[0], prev[2]))
+            # peers built with other type sizes disagree on the layout even with equal totals
+            f.append(self.binary_c_names_template % (self.name, i.name, digest))
+            layout = '%s_%s_LAYOUT_NAMES' % (self.name, i.name)
+            for direction, fields in (('IN', in_fields), ('OUT', out_fields)):
+                for name, a, size in fields:
+                    offset = '%s_%s_%s_%s' % (self.name, i.name, direction, name)
+                    f.append(self.binary_c_fold_template % (self.name, i.name, direction, name, layout, offset, size))
+                    layout = '%s_%s_LAYOUT_%s_%s' % (self.name, i.name, direction, name)
+            f.append(self.binary_c_layout_template % (self.name, i.name, layout))
+            f.append('\n')
+
+    def genBinaryPack(self, f, i, direction, fields, message, by_pointer):
+        f.append(self.binary_c_pack_start_template)
+        for name, a, size in fields:
+            ref = '' if a.is_array or (by_pointer and a.is_pointer) else '&'
+            f.append(self.binary_c_pack_template % (self.name, i.name, direction, name, ref, name, size))
+        f.append(self.binary_c_pack_end_template % (message, self.name, i.name, direction))
 
     def genMessageCVariableDeclaration(self, f, i):
-        f.write('void Message_%s(const char* message)\n{\n' % (i.name))
-        f.write('\tint res;\n')
-        f.write('\tchar *returnMessage;\n')
-        f.write('\n')
-        for name, a in i.arg_dict.items():
+        f.append(self.message_c_declaration_template % (i.name))
+        for name, a in self.dictItems(i.arg_dict):
             if a.type == "string" and a.is_pointer:
-                f.write('\tconst char* _%s;\n' % (name))
+                f.append(self.message_c_string_variable_template % (name))
             elif a.is_array:
-                f.write('\t%s _%s[%d];\n' % (a.type, name, a.array_num))
+                f.append(self.message_c_array_variable_template % (a.type, name, a.array_num))
             else:
-                f.write('\t%s _%s;\n' % (a.type, name))
+                f.append(self.message_c_variable_template % (a.type, name))
 
     def genMessageCGetParam(self, f, i):
-        for name, a in i.arg_dict.items():
+        for name, a in self.dictItems(i.arg_dict):
             if not a.is_in:
                 continue
             if a.is_array:
-                f.write('\tOpenROBO_Message_GetParam_%sArray(message, "%s", _%s, %d);\n' % (a.type, name, name, a.array_num))
+                f.append(self.message_c_get_param_array_template % (a.type, name, name, a.array_num))
             else:
-                f.write('\tOpenROBO_Message_GetParam_%s(message, "%s", &_%s);\n' % (a.type, name, name))
+                f.append(self.message_c_get_param_template % (a.type, name, name))
 
     def genMessageCCallFunction(self, f, i):
-        f.write('\tres = %s(' % (i.name))
-        comma_str = ""
-        for name, a in i.arg_dict.items():
+        call_args = []
+        for name, a in self.dictItems(i.arg_dict):
             if a.type != "string" and a.is_pointer:
-                f.write(comma_str + '&_%s' % (name))
+                call_args.append('&_' + name)
             else:
-                f.write(comma_str + "_%s" % (name))
-            comma_str = ", "
-        f.write(');\n')
+                call_args.append('_' + name)
+        f.append(self.message_c_call_template % (i.name, ", ".join(call_args)))
 
     def genMessageCSetParam(self, f, i):
-        f.write('\tOpenROBO_Message_GetBuffer(&returnMessage);\n')
-        f.write('\tOpenROBO_Message_MakeReturnMessage(returnMessage, "%s");\n\n' % (i.name))
-        for name, a in i.arg_dict.items():
+        f.append(self.message_c_set_param_start_template % (i.name))
+        for name, a in self.dictItems(i.arg_dict):
             if not a.is_out:
                 continue
             if a.is_array:
-                f.write('\tOpenROBO_Message_SetParam_%sArray(returnMessage, "%s", _%s, %d);\n' % (a.type, name, name, a.array_num))
+                f.append(self.message_c_set_param_array_template % (a.type, name, name, a.array_num))
             else:
-                f.write('\tOpenROBO_Message_SetParam_%s(returnMessage, "%s", &_%s);\n' % (a.type, name, name))
-        f.write('\tOpenROBO_Message_SetReturnValue(returnMessage, res);\n')
+                f.append(self.message_c_set_param_template % (a.type, name, name))
+        f.append(self.message_c_set_param_end_template)
+
+    def genMessageCBinary(self, f, i):
+        values = {'prefix': self.name, 'func': i.name, 'dir': 'OUT'}
+        _, declarations, in_fields, out_fields = self.binaryLayout(i)
+        f.append(self.message_c_declaration_template % (i.name))
+        f.extend(declarations)
+        f.append(self.binary_c_declaration_template % values)
+        f.append(self.binary_c_check_template)
+        f.append('\n')
+        f.append(self.message_c_binary_get_param_template % values)
+        for name, a, size in in_fields:
+            ref = '_' if a.is_array else '&_'
+            f.append(self.binary_c_unpack_template % (ref + name, self.name, i.name, 'IN', name, size))
+        f.append('\n')
+        self.genMessageCCallFunction(f, i)
+        f.append('\n')
+        f.append(self.message_c_set_param_start_template % (i.name))
+        self.genBinaryPack(f, i, 'OUT', out_fields, 'returnMessage', False)
+        f.append(self.message_c_set_param_end_template)
+        f.append(self.message_c_send_template)
+        f.append('}\n\n')
+
+    def genMessageCSubscribe(self, f):
+        if not self.subscribe or not self.struct_infos:
+            return
+        f.append(self.clock_c_template % {'prefix': self.name})
+        for index, i in enumerate(self.struct_infos):
+            f.append(self.message_c_subscribe_template % {'prefix': self.name, 'struct': i.name, 'index': index})
+            self.genCommandCStructSetParam(f, i)
+            f.append(self.message_c_publish_end_template)
 
     def genMessageC(self, path):
-        f = open(path, 'w')
-
-        f.write('#include "OpenROBO.h"\n\n')
+        f = [self.message_c_header_template]
         for h in self.headers:
-            f.write('#include "%s"\n' % (h))
-        f.write('\n')
+            f.append(self.main_c_include_template % (h))
+        f.append('\n')
+
+        self.genMessageCSubscribe(f)
+        if self.codec == 'binary':
+            self.genBinaryLayout(f)
+            for i in self.func_infos:
+                self.genMessageCBinary(f, i)
+            self.writeOutput(path, f)
+            return
 
         for i in self.func_infos:
             self.genMessageCVariableDeclaration(f, i)
-            f.write('\n')
+            f.append('\n')
             self.genMessageCGetParam(f, i)
-            f.write('\n')
+            f.append('\n')
             self.genMessageCCallFunction(f, i)
-            f.write('\n')
+            f.append('\n')
             self.genMessageCSetParam(f, i)
-            f.write('\n')
-            f.write('\tOpenROBO_Socket_SendReturnMessage(returnMessage);\n')
-            f.write('\n')
-            for name, a in i.arg_dict.items():
+            f.append(self.message_c_send_template)
+            for name, a in self.dictItems(i.arg_dict):
                 if not a.is_in:
                     continue
                 if a.type == "string":
-                    f.write('\tOpenROBO_Message_Free(%s);\n' % (name))
+                    f.append(self.message_c_free_template % (name))
 
-            f.write('}\n\n')
-        f.close()
+            f.append('}\n\n')
+        self.writeOutput(path, f)
 
     def genMessageH(self, path):
-        f = open(path, 'w')
-        for i in self.func_infos:
-            f.write("void Message_%s(const char* message);\n" % (i.name))
-        f.close()
+        f = [self.message_h_template % (i.name) for i in self.func_infos]
+        if self.subscribe:
+            for i in self.struct_infos:
+                f.append(self.message_h_subscribe_template % {'prefix': self.name, 'struct': i.name})
+        if self.dispatch_table:
+            f.append(self.message_h_find_template % {'prefix': self.name})
+        self.writeOutput(path, f)
 
     def genCommandCReadWriteFunction(self, f):
+        if self.read_cache is not None and self.struct_infos:
+            f.append(self.clock_c_template % {'prefix': self.name})
         for i in self.struct_infos:
             self.genCommandCReadFunction(f, i)
             self.genCommandCWriteFunction(f, i)
+        if self.batch and self.struct_infos:
+            f.append(self.command_c_batch_header_template)
+            self.genCommandCBatchFunction(f, 'Read')
+            self.genCommandCBatchFunction(f, 'Write')
 
     def genCommandCReadFunction(self, f, i):
-        f.write('int %s_Read_%s(struct %s_%s *_%s)\n{\n' % (self.name, i.name, self.name, i.name, i.name))
-        f.write('\tstatic double last_time = 0.0;\n')
-        f.write('\tdouble time;\n')
-        f.write('\tchar *message;\n')
-        f.write('\tint res;\n')
-
-        f.write('\n\tOpenROBO_Message_GetBuffer(&message);\n')
-        f.write('\tOpenROBO_Message_MakeReadMessage(message, "%s");\n' % (i.name))
-        f.write('\tOpenROBO_Socket_SendCommandMessage("%s", message);\n\n' % (self.name))
-
-        f.write('\tres = OpenROBO_Socket_ReceiveReturnMessage("%s", &message);\n' % (self.name))
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
-
-        f.write('\tOpenROBO_Message_GetReturnValue(message, &res);\n')
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
-
-        f.write('\tOpenROBO_Message_GetTime(message, &time);\n')
+        values = {'prefix': self.name, 'struct': i.name, 'max_age': self.read_cache, 'receive': self.receive_call}
+        if self.read_cache is not None:
+            f.append(self.command_c_read_cache_template % values)
+        if self.batch:
+            f.append(self.command_c_batch_read_request_template % values)
+            f.append(self.command_c_batch_read_receive_template % values)
+        else:
+            f.append(self.command_c_read_signature_template % values)
+            f.append(self.command_c_read_declaration_template)
+            self.genCommandCReadCacheCheck(f, values)
+            f.append(self.command_c_read_start_template % values)
         self.genCommandCStructGetParam(f, i)
+        if self.read_cache is not None:
+            f.append(self.command_c_read_cache_store_template % values)
+        f.append(self.command_c_read_end_template)
+        if self.batch:
+            f.append(self.command_c_read_signature_template % values)
+            f.append(self.command_c_batch_read_declaration_template)
+            self.genCommandCReadCacheCheck(f, values)
+            f.append(self.command_c_batch_read_call_template % values)
+
+    def genCommandCReadCacheCheck(self, f, values):
+        if self.read_cache is None:
+            return
+        f.append(self.command_c_read_cache_declaration_template)
+        f.append(self.command_c_read_cache_check_template % values)
 
-        f.write('\n\tif (time > last_time) {\n')
-        f.write('\t\tres = OpenROBO_Return_Success;\n')
-        f.write('\t\tlast_time = time;\n')
-        f.write('\t} else {\n')
-        f.write('\t\tres = OpenROBO_Return_NotUpdated;\n')
-        f.write('\t}\n\n')
-        f.write('\treturn res;\n')
-        f.write('}\n\n')
+    def getBatchArgments(self, op):
+        template = self.command_batch_read_argment_template if op == 'Read' else self.command_batch_write_argment_template
+        return ", ".join(template % (self.name, i.name, i.name) for i in self.struct_infos)
 
-    def genCommandCWriteFunction(self, f, i):
-        f.write('int %s_Write_%s(const struct %s_%s *_%s)\n{\n' % (self.name, i.name, self.name, i.name, i.name))
-        f.write('\tchar *message;\n')
-        f.write('\tint res;\n')
+    def genCommandCBatchFunction(self, f, op):
+        values = {'prefix': self.name, 'op': op, 'args': self.getBatchArgments(op)}
+        f.append(self.command_c_batch_start_template % values)
+        # Read passes the struct to its receive half, Write to its request half
+        for i in self.struct_infos:
+            values.update(struct=i.name, arg='_' + i.name if op == 'Write' else '')
+            f.append(self.command_c_batch_request_template % values)
+        for i in self.struct_infos:
+            values.update(struct=i.name, arg='_' + i.name if op == 'Read' else '')
+            f.append(self.command_c_batch_receive_template % values)
+        f.append(self.command_c_batch_end_template)
 
-        f.write('\n\tOpenROBO_Message_GetBuffer(&message);\n')
-        f.write('\tOpenROBO_Message_MakeWriteMessage(message, "%s");\n' % (i.name))
+    def genCommandCWriteFunction(self, f, i):
+        values = {'prefix': self.name, 'struct': i.name, 'receive': self.receive_call}
+        f.append((self.command_c_batch_write_start_template if self.batch else self.command_c_write_start_template) % values)
         self.genCommandCStructSetParam(f, i)
-
-        f.write('\n\tOpenROBO_Socket_SendCommandMessage("%s", message);\n\n' % (self.name))
-
-        f.write('\tres = OpenROBO_Socket_ReceiveReturnMessage("%s", &message);\n' % (self.name))
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
-
-        f.write('\tOpenROBO_Message_GetReturnValue(message, &res);\n\n')
-
-        f.write('\treturn res;\n')
-        f.write('}\n\n')
+        f.append((self.command_c_batch_write_end_template if self.batch else self.command_c_write_end_template) % values)
+        # the subsystem may still hold the old value until it acknowledges the write
+        if self.read_cache is not None:
+            f.append(self.command_c_write_cache_invalidate_template % values)
+        f.append(self.command_c_write_return_template)
+        if self.batch:
+            f.append(self.command_c_batch_write_call_template % values)
+
+    def genCommandCPush(self, f):
+        if not self.subscribe or not self.struct_infos:
+            return
+        for i in self.struct_infos:
+            f.append(self.command_c_push_static_template % {'prefix': self.name, 'struct': i.name})
+        f.append(self.command_c_push_store_start_template % {'prefix': self.name})
+        for index, i in enumerate(self.struct_infos):
+            values = {'prefix': self.name, 'struct': i.name, 'index': index}
+            f.append(self.command_c_push_store_case_template % values)
+            for name, e in self.dictItems(i.ele_dict):
+                if e.is_array:
+                    f.append(self.command_c_push_get_param_array_template % (e.type, name, self.name, i.name, name, e.array_num))
+                else:
+                    f.append(self.command_c_push_get_param_template % (e.type, name, self.name, i.name, name))
+            f.append(self.command_c_push_store_case_end_template % values)
+        f.append(self.command_c_push_store_end_template % {'prefix': self.name})
+        for index, i in enumerate(self.struct_infos):
+            f.append(self.command_c_subscribe_template % {'prefix': self.name, 'struct': i.name, 'index': index, 'receive': self.receive_call})
 
     def genCommandC(self, path):
-        f = open(path, 'w')
-        f.write('#include "OpenROBO.h"\n\n')
-        f.write('#include "%s_Command.h"\n\n' % (self.name))
+        f = [self.command_c_header_template % (self.name)]
+        self.genCommandCPush(f)
+        if self.codec == 'binary':
+            self.genBinaryLayout(f)
         for i in self.func_infos:
             is_output_static = False
-            for name, a in i.arg_dict.items():
+            for name, a in self.dictItems(i.arg_dict):
                 if not a.is_out:
                     continue
                 if a.is_array:
-                    f.write('static %s *%s_%s;\n' % (a.full_type, i.name, name))
+                    f.append(self.command_c_static_array_template % (a.full_type, i.name, name))
                 else:
-                    f.write('static %s %s_%s;\n' % (a.full_type, i.name, name))
+                    f.append(self.command_c_static_template % (a.full_type, i.name, name))
                 is_output_static = True
             if is_output_static:
-                f.write("\n")
+                f.append("\n")
             self.genCommandCStartFunction(f, i)
             self.genCommandCStopFunction(f, i)
             self.genCommandCWaitFunction(f, i)
             self.genCommandCCallFunction(f, i)
 
         self.genCommandCReadWriteFunction(f)
-        f.close()
+        self.writeOutput(path, f)
 
     def genCommandCCallFunction(self, f, i):
-        f.write('int %s_%s(%s)\n{\n' % (self.name, i.name, self.getCommandArgments(i)))
-        f.write('\tint res;\n')
-        f.write('\tres = %s_Start_%s(' % (self.name, i.name))
-        comma_str = ""
-        for name in i.arg_dict.keys():
-            f.write(comma_str + "_%s" % (name))
-            comma_str = ", "
-        f.write(');\n')
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
-        f.write('\tres = %s_Wait_%s();\n' % (self.name, i.name))
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
-        f.write('\treturn OpenROBO_Return_Success;\n}\n\n')
+        values = {'prefix': self.name, 'func': i.name, 'args': self.getCommandArgments(i), 'call_args': ", ".join('_' + name for name, _ in self.dictItems(i.arg_dict))}
+        f.append(self.command_c_call_template % values)
 
     def genCommandCStartFunction(self, f, i):
-        f.write('int %s_Start_%s(%s)\n{\n' % (self.name, i.name, self.getCommandArgments(i)))
-        f.write('\tint res;\n')
-        f.write('\tchar *message;\n')
-
-        f.write('\n\tOpenROBO_Message_GetBuffer(&message);\n')
-        f.write('\tOpenROBO_Message_MakeOperationMessage(message, "%s");\n\n' % (i.name))
-
-        for name, a in i.arg_dict.items():
-            if not a.is_in:
-                continue
-            if a.is_array:
-                f.write('\tOpenROBO_Message_SetParam_%sArray(message, "%s", _%s, %d);\n' % (a.type, name, name, a.array_num))
-            else:
-                f.write('\tOpenROBO_Message_SetParam_%s(message, "%s", &_%s);\n' % (a.type, name, name))
-
-        f.write('\n\tres = OpenROBO_Socket_SendCommandMessage("%s", message);\n' % (self.name))
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
-
-        f.write('\tres = OpenROBO_Socket_ReceiveReturnMessage("%s", &message);\n' % (self.name))
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
+        values = {'prefix': self.name, 'func': i.name, 'args': self.getCommandArgments(i), 'receive': self.receive_call}
+        if self.codec == 'binary':
+            f.append(self.command_c_binary_start_start_template % values)
+            self.genBinaryPack(f, i, 'IN', self.binaryLayout(i)[2], 'message', True)
+        else:
+            f.append(self.command_c_start_start_template % values)
+            for name, a in self.dictItems(i.arg_dict):
+                if not a.is_in:
+                    continue
+                if a.is_array:
+                    f.append(self.command_c_set_param_array_template % (a.type, name, name, a.array_num))
+                else:
+                    f.append(self.command_c_set_param_template % (a.type, name, name))
 
-        f.write('\tOpenROBO_Message_GetReturnValue(message, &res);\n')
+        f.append(self.command_c_start_send_template % values)
 
-        for name, a in i.arg_dict.items():
+        for name, a in self.dictItems(i.arg_dict):
             if not a.is_out:
                 continue
-            f.write('\t%s_%s = _%s;\n' % (i.name, name, name))
+            f.append(self.command_c_start_store_template % (i.name, name, name))
 
-        f.write('\n\treturn res;\n}\n\n')
+        f.append(self.command_c_start_end_template)
 
     def genCommandCGetParam(self, f, i):
-        for name, a in i.arg_dict.items():
+        for name, a in self.dictItems(i.arg_dict):
             if not a.is_out:
                 continue
             if a.is_array:
-                f.write('\tOpenROBO_Message_GetParam_%sArray(message, "%s", %s_%s, %d);\n' % (a.type, name, i.name, name, a.array_num))
+                f.append(self.command_c_get_param_array_template % (a.type, name, i.name, name, a.array_num))
             else:
-                f.write('\tOpenROBO_Message_GetParam_%s(message, "%s", %s_%s);\n' % (a.type, name, i.name, name))
+                f.append(self.command_c_get_param_template % (a.type, name, i.name, name))
 
     def genCommandCStructSetParam(self, f, i):
-        for name, e in i.ele_dict.items():
+        for name, e in self.dictItems(i.ele_dict):
             if e.is_array:
-                f.write('\tOpenROBO_Message_SetParam_%sArray(message, "%s", _%s->%s, %d);\n' % (e.type, name, i.name, name, e.array_num))
+                f.append(self.command_c_struct_set_param_array_template % (e.type, name, i.name, name, e.array_num))
             else:
-                f.write('\tOpenROBO_Message_SetParam_%s(message, "%s", &_%s->%s);\n' % (e.type, name, i.name, name))
+                f.append(self.command_c_struct_set_param_template % (e.type, name, i.name, name))
 
     def genCommandCStructGetParam(self, f, i):
-        for name, e in i.ele_dict.items():
+        for name, e in self.dictItems(i.ele_dict):
             if e.is_array:
-                f.write('\tOpenROBO_Message_GetParam_%sArray(message, "%s", _%s->%s, %d);\n' % (e.type, name, i.name, name, e.array_num))
+                f.append(self.command_c_struct_get_param_array_template % (e.type, name, i.name, name, e.array_num))
             else:
-                f.write('\tOpenROBO_Message_GetParam_%s(message, "%s", &_%s->%s);\n' % (e.type, name, i.name, name))
+                f.append(self.command_c_struct_get_param_template % (e.type, name, i.name, name))
 
     def genCommandCStopFunction(self, f, i):
-        f.write('int %s_Stop_%s()\n{\n' % (self.name, i.name))
-        f.write('\tchar *message;\n')
-        f.write('\n\tOpenROBO_Message_GetBuffer(&message);\n')
-        f.write('\tOpenROBO_Message_MakeStopMessage(message, "%s");\n' % (i.name))
-        f.write('\tOpenROBO_Socket_SendCommandMessage("%s", message);\n\n' % (self.name))
-        f.write('\treturn %s_Wait_%s();\n}\n\n' % (self.name, i.name))
+        f.append(self.command_c_stop_template % {'prefix': self.name, 'func': i.name})
 
     def genCommandCWaitFunction(self, f, i):
-        f.write('int %s_Wait_%s()\n{\n' % (self.name, i.name))
-        f.write('\tchar *message;\n')
-        f.write('\tint res;\n')
-        f.write('\n\tOpenROBO_Message_GetBuffer(&message);\n')
-        f.write('\tOpenROBO_Message_MakeWaitMessage(message, "%s");\n' % (i.name))
-        f.write('\tOpenROBO_Socket_SendCommandMessage("%s", message);\n\n' % (self.name))
-        f.write('\tres = OpenROBO_Socket_ReceiveReturnMessage("%s", &message);\n' % (self.name))
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
-        f.write('\tOpenROBO_Message_GetReturnValue(message, &res);\n\n')
-        self.genCommandCGetParam(f, i)
-        f.write('\n\treturn res;\n}\n\n')
+        values = {'prefix': self.name, 'func': i.name, 'receive': self.receive_call}
+        if self.codec == 'binary':
+            f.append(self.command_c_binary_wait_start_template % values)
+            f.append(self.command_c_binary_get_param_template % values)
+            for name, a, size in self.binaryLayout(i)[3]:
+                ref = '' if a.is_array or a.is_pointer else '&'
+                f.append(self.binary_c_unpack_template % (ref + i.name + '_' + name, self.name, i.name, 'OUT', name, size))
+        else:
+            f.append(self.command_c_wait_start_template % values)
+            self.genCommandCGetParam(f, i)
+        f.append(self.command_c_wait_end_template)
 
     def getCommandArgments(self, i):
-        ret_str = ""
-        comma_str = ""
-        for name, a in i.arg_dict.items():
+        ret_str = self.command_argments.get(id(i))
+        if ret_str is not None:
+            return ret_str
+        argments = []
+        for name, a in self.dictItems(i.arg_dict):
             if a.is_array:
-                ret_str += comma_str + '%s _%s[%d]' % (a.full_type, name, a.array_num)
+                argments.append(self.command_array_argment_template % (a.full_type, name, a.array_num))
             else:
-                ret_str += comma_str + '%s _%s' % (a.full_type, name)
-            comma_str = ", "
+                argments.append(self.command_argment_template % (a.full_type, name))
+        ret_str = ", ".join(argments)
+        self.command_argments[id(i)] = ret_str
         return ret_str
 
     def genCommandHReadWrite(self, f):
         for i in self.struct_infos:
-            f.write('struct %s_%s {\n' % (self.name, i.name))
-            for name, e in i.ele_dict.items():
+            f.append(self.command_h_struct_start_template % (self.name, i.name))
+            for name, e in self.dictItems(i.ele_dict):
                 if e.is_array:
-                    f.write('\t%s %s[%d];\n' % (e.full_type, name, e.array_num))
+                    f.append(self.command_h_struct_array_element_template % (e.full_type, name, e.array_num))
                 else:
-                    f.write('\t%s %s;\n' % (e.full_type, name))
-            f.write('};\n')
-            f.write('int %s_Read_%s(struct %s_%s *_%s);\n' % (self.name, i.name, self.name, i.name, i.name))
-            f.write('int %s_Write_%s(const struct %s_%s *_%s);\n' % (self.name, i.name, self.name, i.name, i.name))
-            f.write('\n')
+                    f.append(self.command_h_struct_element_template % (e.full_type, name))
+            f.append(self.command_h_struct_end_template % {'prefix': self.name, 'struct': i.name})
+            if self.subscribe:
+                f.append(self.command_h_subscribe_template % {'prefix': self.name, 'struct': i.name})
+            if self.read_cache is not None:
+                f.append(self.command_h_read_cache_template % {'prefix': self.name, 'struct': i.name})
 
     def genCommandH(self, path):
-        f = open(path, 'w')
+        f = []
         for i in self.func_infos:
-            f.write('int %s_%s(%s);\n' % (self.name, i.name, self.getCommandArgments(i)))
-            f.write('int %s_Start_%s(%s);\n' % (self.name, i.name, self.getCommandArgments(i)))
-            f.write('int %s_Stop_%s();\n' % (self.name, i.name))
-            f.write('int %s_Wait_%s();\n' % (self.name, i.name))
-            f.write('\n')
+            f.append(self.command_h_template % {'prefix': self.name, 'func': i.name, 'args': self.getCommandArgments(i)})
         self.genCommandHReadWrite(f)
-        f.close()
+        if self.batch and self.struct_infos:
+            f.append(self.command_h_batch_template % {'prefix': self.name, 'read_args': self.getBatchArgments('Read'), 'write_args': self.getBatchArgments('Write')})
+        self.writeOutput(path, f)
 
     def genMainH(self, path):
         if os.path.exists(path):
             return
-        f = open(path, 'w')
+        f = []
         if self.name != "TP":
-            f.write('#define TASKPLANNER_ADDRESS "192.168.0.200"\n')
-        f.write('#define TASKPLANNER_PORT 50001\n')
+            f.append(self.main_h_address_template)
+        f.append(self.main_h_port_template)
         if self.name == "TP":
-            f.write('\nstatic const char* const subsystemList[] = {\n\t"HRI",\n\t"AC",\n\t"TC",\n\t"VC",\n\t"VS",\n\t"CG",\n\tNULL\n};\n')
-        f.close()
+            f.append(self.main_h_subsystem_list_template)
+        self.writeOutput(path, f)
+
+    def genMainCDispatchTable(self, f):
+        names = self.messageFunctionNames()
+        seen = set()
+        for name in names:
+            if name in seen:
+                raise Exception('MessageFunction "%s" is declared more than once' % name)
+            seen.add(name)
+        mask, seeds, slots = dispatch_table(names)
+        f.append(self.main_c_dispatch_start_template % {'prefix': self.name, 'mask': mask})
+        for n, seed in enumerate(seeds):
+            f.append('\n\t' if n % 8 == 0 else ' ')
+            f.append('%d,' % (seed))
+        f.append(self.main_c_dispatch_names_template)
+        for n in slots:
+            f.append(self.main_c_dispatch_name_template % (names[n]) if n is not None else self.main_c_dispatch_empty_template)
+        f.append(self.main_c_dispatch_functions_template % (self.name))
+        for n in slots:
+            f.append(self.main_c_dispatch_function_template % (names[n]) if n is not None else self.main_c_dispatch_empty_template)
+        f.append(self.main_c_dispatch_end_template % {'prefix': self.name})
 
     def genMainC(self, path):
-        f = open(path, 'w')
-        f.write('#include <stdio.h>\n')
-        f.write('#include "%s_Main.h"\n' % (self.name))
-        f.write('#include "OpenROBO.h"\n')
-        f.write('#include "%s_Message.h"\n\n' % (self.name))
+        f = [self.main_c_header_template % {'prefix': self.name}]
         for h in self.main_headers:
-            f.write('#include "%s"\n' % (h))
-        f.write('\n')
-        f.write('int main(int argc, char *argv[])\n{\n')
-        f.write('\tint res;\n')
-        f.write('\tres = OpenROBO_StartupMainThread("%s");\n' % (self.name))
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\tfprintf(stderr, "error: startup\\n");\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n')
+            f.append(self.main_c_include_template % (h))
+        if self.dispatch_table:
+            self.genMainCDispatchTable(f)
+        f.append(self.main_c_startup_template % (self.name))
         if self.name == "TP":
-            f.write('\tres = OpenROBO_Socket_AcceptConnection(TASKPLANNER_PORT, subsystemList);\n')
+            f.append(self.main_c_accept_template)
         else:
-            f.write('\tres = OpenROBO_Socket_MakeConnection(TASKPLANNER_ADDRESS, TASKPLANNER_PORT);\n')
-        f.write('\tif (res != OpenROBO_Return_Success) {\n')
-        f.write('\t\tfprintf(stderr, "error: make connection\\n");\n')
-        f.write('\t\treturn res;\n')
-        f.write('\t}\n\n')
+            f.append(self.main_c_connect_template)
+        f.append(self.main_c_connection_check_template)
         for i in self.subthread_infos:
-            f.write('\tres = OpenROBO_Thread_CreateSubthread(%s, "%s", argc, argv);\n' % (i, i))
-            f.write('\tif (res != OpenROBO_Return_Success) {\n')
-            f.write('\t\tfprintf(stderr, "error: create subthread \\"%s\\"\\n");\n' % (i))
-            f.write('\t\treturn res;\n')
-            f.write('\t}\n')
-        f.write('\n\tOpenROBO_MessageFunctionEntry_t messageFunctionEntry[] = {\n')
-        for i in self.func_infos:
-            f.write('\t\t{Message_%s, "%s"},\n' % (i.name, i.name))
-        f.write('\t\tOPENROBO_END_OF_MESSAGE_FUNCTION_ENTRY\n\t};\n')
-
-        f.write('\n\tres = OpenROBO_Main(messageFunctionEntry);\n\n')
+            f.append(self.main_c_subthread_template % {'subthread': i})
+        if self.dispatch_table:
+            f.append(self.main_c_lookup_template % (self.name))
+        else:
+            f.append(self.main_c_entry_start_template)
+            for name in self.messageFunctionNames():
+                f.append(self.main_c_entry_template % (name, name))
+            f.append(self.main_c_entry_end_template)
 
         for i in self.term_infos:
-            f.write('\t%s();\n' % (i))
-        f.write('\n\treturn res;\n}')
-        f.close()
+            f.append(self.main_c_term_template % (i))
+        f.append(self.main_c_end_template)
+        self.writeOutput(path, f)
+
+
+class HeaderWatcher:
+    """
+    Keeps the parse record of every header in memory, polls the headers
+    for changes and regenerates only the outputs (Command/Message/Main)
+    which depend on what changed.
+    """
+
+    empty_record = ((False, False, False), [], [], [], [], [])
+
+    def __init__(self, args, cache=None):
+        self.args = args
+        self.cache = cache
+        self.headers = []
+        self.records = {}
+        self.stats = {}
+        # outputs whose last regeneration failed
+        self.failed = set()
+
+    def listHeaders(self):
+        if self.args.header:
+            return list(self.args.header)
+        return glob.glob(self.args.header_dir + "/*.h")
+
+    def parseHeader(self, path, st):
+        if self.cache is not None:
+            record = self.cache.lookupStat(path, st)
+            if record is not None:
+                return record
+        digest, record = parse_header_record(path)
+        if self.cache is not None:
+            self.cache.put(digest, record)
+            self.cache.setStat(path, st, digest)
+        return record
+
+    def affectedOutputs(self, old, new):
+        old_ret, old_funcs, old_structs, old_subthreads, old_inits, old_terms = old
+        new_ret, new_funcs, new_structs, new_subthreads, new_inits, new_terms = new
+        outputs = set()
+        if old_funcs != new_funcs:
+            outputs.update(GEN_OUTPUTS)
+        if old_structs != new_structs:
+            outputs.add('Command')
+            if self.args.subscribe:
+                # Message pushes and Main dispatches Subscribe_<struct>
+                outputs.update(GEN_OUTPUTS)
+        if old_ret[0] != new_ret[0] or (self.args.subscribe and old_ret[1] != new_ret[1]):
+            outputs.add('Message')
+        if old_ret[2] != new_ret[2] or old_subthreads != new_subthreads or old_inits != new_inits or old_terms != new_terms:
+            outputs.add('Main')
+        return outputs
+
+    def poll(self):
+        """ re-parses changed headers and returns the affected outputs """
+        headers = self.listHeaders()
+        outputs = set()
+        for h in headers:
+            try:
+                st = os.stat(h)
+            except OSError:
+                continue
+            key = (st.st_mtime, st.st_size)
+            if self.stats.get(h) == key:
+                continue
+            self.stats[h] = key
+            try:
+                record = self.parseHeader(h, st)
+            except Exception as e:
+                # e.g. a header saved halfway; it is parsed again when it changes
+                self.error("%s: %s" % (h, e))
+                continue
+            outputs |= self.affectedOutputs(self.records.get(h, self.empty_record), record)
+            self.records[h] = record
+        headers = [h for h in headers if h in self.records]
+        for h in set(self.records) - set(headers):
+            outputs |= self.affectedOutputs(self.records.pop(h), self.empty_record)
+            del self.stats[h]
+        tagged = [h for h in headers if any(self.records[h][0])]
+        if tagged != [h for h in self.headers if any(self.records.get(h, self.empty_record)[0])]:
+            # the order of the infos follows the order of the headers
+            outputs.update(GEN_OUTPUTS)
+        self.headers = headers
+        if outputs and self.cache is not None:
+            self.cache.save()
+        return outputs
+
+    def regenerate(self, outputs):
+        scanner = CHeaderScanner()
+        include_headers = []
+        include_main_headers = []
+        for h in self.headers:
+            is_prototype, is_struct, is_subthreadinitterm = scanner.loadRecord(self.records[h])
+            if is_prototype or (is_struct and self.args.subscribe):
+                include_headers.append(h)
+            if is_subthreadinitterm:
+                include_main_headers.append(h)
+        return gen_sources(self.args, scanner, include_paths(self.args, include_headers), include_paths(self.args, include_main_headers), outputs)
+
+    def error(self, message):
+        sys.stderr.write("error: %s\n" % (message))
+        sys.stderr.flush()
+
+    def step(self, outputs):
+        """
+        regenerates outputs; an error is reported and the outputs are
+        regenerated again together with the next change
+        """
+        outputs = set(outputs) | self.failed
+        if not outputs:
+            return
+        self.failed = outputs
+        start = time.time()
+        try:
+            self.regenerate(outputs)
+        except Exception as e:
+            self.error(e)
+            return
+        self.failed = set()
+        if not self.args.quiet:
+            print("regenerated %s (%.1f ms)" % (", ".join(o for o in GEN_OUTPUTS if o in outputs), (time.time() - start) * 1000))
+            sys.stdout.flush()
+
+    def run(self, interval):
+        self.poll()
+        self.step(GEN_OUTPUTS)
+        try:
+            while True:
+                time.sleep(interval)
+                try:
+                    outputs = self.poll()
+                except Exception as e:
+                    self.error(e)
+                    continue
+                if outputs:
+                    self.step(outputs)
+        except KeyboardInterrupt:
+            pass
 
 
 def update_main(args):
@@ -896,21 +3740,121 @@ def clean_main(args):
         shutil.rmtree(BUILD_DIR)
 
 
+def sync_features(args):
+    if args.legacy:
+        return ()
+    features = [f for f in SYNC_FEATURES if f not in getattr(args, 'disable', [])]
+    if args.compress:
+        return tuple('zlib=%d' % (args.compress) if f == 'zlib' else f for f in features)
+    # the TP offers compression, subsystems ask for it only with --compress
+    return tuple(f for f in features if f != 'zlib' or args.name == 'TP')
+
+
 def sync_main(args):
     src_dir = args.src_dir
     header_dir = args.header_dir
-    s = SourceCodeSync(args.name, src_dir, header_dir)
+    features = sync_features(args)
+    if args.multicast and (args.name != "TP" or args.daemon):
+        print("error: --multicast is for a TP which is not a daemon")
+        exit(2)
+    if args.multicast:
+        try:
+            parse_multicast_addr(args.multicast)
+        except ValueError as e:
+            print("error: %s" % (e))
+            exit(2)
+    if not args.legacy and args.multicast:
+        features += ('multicast=%s' % (args.multicast),)
+    elif not args.legacy and args.name != "TP":
+        # subsystems receive by multicast whenever the TP offers it
+        features += ('multicast',)
+    s = SourceCodeSync(args.name, src_dir, header_dir, features=features, digest_cache=SyncDigestCache(DEFAULT_SYNC_DIGEST_CACHE_PATH))
+    s.multicast_if = args.multicast_if
+    s.multicast_rate = int(args.multicast_rate * 1000 * 1000)
     port = int(args.port)
-    if args.name == "TP":
-        s.server(port)
-    else:
+    if args.name != "TP":
         if not args.addr:
             print("error: argument -a/--addr is required")
             exit(2)
-        s.client(args.addr, port)
+        if args.push_only and args.pull_only:
+            print("error: --push-only and --pull-only are exclusive")
+            exit(2)
+    metrics_file = None
+    if args.metrics == "-":
+        s.metrics = SyncMetrics(sys.stdout)
+    elif args.metrics:
+        metrics_file = open(args.metrics, "a")
+        s.metrics = SyncMetrics(metrics_file)
+    try:
+        if args.name == "TP" and args.daemon:
+            members = [m.strip() for m in (args.members or "").split(",") if m.strip()]
+            s.daemon(port, SyncStore(DEFAULT_SYNC_STORE_PATH), members, float(args.member_timeout))
+        elif args.name == "TP":
+            s.server(port)
+        else:
+            s.clientWithRetry(args.addr, port, push=not args.pull_only, pull=not args.push_only, retries=args.retries)
+    finally:
+        if args.metrics:
+            s.metrics.report(sys.stdout)
+        if metrics_file is not None:
+            metrics_file.close()
+
+
+def include_paths(args, paths):
+    paths = [os.path.basename(h) for h in paths]
+    if args.include_prefix:
+        paths = [os.path.join(args.include_prefix, h) for h in paths]
+    return paths
+
+
+def parse_max_age(value):
+    """ returns value of --read-cache in seconds, which must be finite and not negative """
+    try:
+        max_age = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid max age: %s" % (value))
+    if not 0.0 <= max_age < float('inf'):
+        raise argparse.ArgumentTypeError("max age must be finite and not negative: %s" % (value))
+    return max_age
+
+
+def gen_sources(args, scanner, include_headers, include_main_headers, outputs=GEN_OUTPUTS):
+    c = scanner.prototype_parser
+    s = scanner.struct_parser
+    subthreadinitterm = scanner.subthreadinitterm_parser
+    gen = SourceCodeGenerator(name=args.name, func_infos=c.infos, struct_infos=s.infos, subthread_infos=subthreadinitterm.subthread_infos, init_infos=subthreadinitterm.init_infos, term_infos=subthreadinitterm.term_infos, include_headers=include_headers, include_main_headers=include_main_headers, codec=getattr(args, 'codec', 'text'), read_cache=getattr(args, 'read_cache', None), subscribe=getattr(args, 'subscribe', False), dispatch_table=getattr(args, 'dispatch_table', False), batch=getattr(args, 'batch', False))
+    out_src_dir = args.out_src_dir
+    out_header_dir = args.out_header_dir
+    targets = []
+    if 'Command' in outputs:
+        targets.append((gen.genCommandC, out_src_dir, "%s_Command.cpp"))
+        targets.append((gen.genCommandH, out_header_dir, "%s_Command.h"))
+    if 'Message' in outputs:
+        targets.append((gen.genMessageC, out_src_dir, "%s_Message.cpp"))
+        targets.append((gen.genMessageH, out_header_dir, "%s_Message.h"))
+    if 'Main' in outputs:
+        targets.append((gen.genMainC, out_src_dir, "%s_Main.cpp"))
+        targets.append((gen.genMainH, out_header_dir, "%s_Main.h"))
+    for gen_func, out_dir, basename in targets:
+        basename = basename % (args.name)
+        with phase_timings.phase("gen %s" % (basename)):
+            gen_func(os.path.join(out_dir, basename))
+    if not args.quiet:
+        for path in gen.updated_paths:
+            print("updated: %s" % (path))
+    return gen.updated_paths
 
 
 def gen_main(args):
+    cache = None
+    if not args.no_cache:
+        with phase_timings.phase("load parse cache"):
+            cache = HeaderParseCache(args.cache, args.cache_size)
+
+    if args.watch:
+        HeaderWatcher(args, cache).run(args.watch_interval)
+        return
+
     headers = args.header
     if not headers:
         headers = glob.glob(args.header_dir + "/*.h")
@@ -918,58 +3862,48 @@ def gen_main(args):
     include_headers = []
     include_main_headers = []
 
-    c = CPrototypeParser()
-    for h in headers:
-        if c.parseFromFile(h):
+    scanner = CHeaderScanner(cache)
+    with phase_timings.phase("parse %d headers" % (len(headers))):
+        rets = scanner.parseFiles(headers, args.jobs)
+    for h, (is_prototype, is_struct, is_subthreadinitterm) in zip(headers, rets):
+        if is_prototype or (is_struct and args.subscribe):
             include_headers.append(h)
-    if not args.quiet:
-        pprint.pprint(c.infos)
-
-    s = CStructParser()
-    for h in headers:
-        s.parseFromFile(h)
-    if not args.quiet:
-        pprint.pprint(s.infos)
-
-    subthreadinitterm = CsubthreadinittermTermParser()
-    for h in headers:
-        if subthreadinitterm.parseFromFile(h):
+        if is_subthreadinitterm:
             include_main_headers.append(h)
+    if cache is not None:
+        with phase_timings.phase("save parse cache"):
+            cache.save()
     if not args.quiet:
-        pprint.pprint(subthreadinitterm)
+        pprint.pprint(scanner.prototype_parser.infos)
+        pprint.pprint(scanner.struct_parser.infos)
+        pprint.pprint(scanner.subthreadinitterm_parser)
 
-    include_headers = [os.path.basename(h) for h in include_headers]
-    if args.include_prefix:
-        include_headers = [os.path.join(args.include_prefix, h) for h in include_headers]
-    include_main_headers = [os.path.basename(h) for h in include_main_headers]
-    if args.include_prefix:
-        include_main_headers = [os.path.join(args.include_prefix, h) for h in include_main_headers]
+    include_headers = include_paths(args, include_headers)
+    include_main_headers = include_paths(args, include_main_headers)
     if not args.quiet:
         pprint.pprint(include_headers)
         pprint.pprint(include_main_headers)
 
-    gen = SourceCodeGenerator(name=args.name, func_infos=c.infos, struct_infos=s.infos, subthread_infos=subthreadinitterm.subthread_infos, init_infos=subthreadinitterm.init_infos, term_infos=subthreadinitterm.term_infos, include_headers=include_headers, include_main_headers=include_main_headers)
-    out_src_dir = args.out_src_dir
-    out_header_dir = args.out_header_dir
-    gen.genCommandC(os.path.join(out_src_dir, "%s_Command.cpp" % (args.name)))
-    gen.genCommandH(os.path.join(out_header_dir, "%s_Command.h" % (args.name)))
-    gen.genMessageC(os.path.join(out_src_dir, "%s_Message.cpp" % (args.name)))
-    gen.genMessageH(os.path.join(out_header_dir, "%s_Message.h" % (args.name)))
-    gen.genMainC(os.path.join(out_src_dir, "%s_Main.cpp" % (args.name)))
-    gen.genMainH(os.path.join(out_header_dir, "%s_Main.h" % (args.name)))
+    gen_sources(args, scanner, include_headers, include_main_headers)
 
 
 def main():
+    config_wall = time.time()
+    config_cpu = cpu_time()
     name_required = True
     config = ConfigParser.SafeConfigParser(default_config)
     config.read(CONFIG_FILE_PATH)
     if config.get('DEFAULT', 'name') is not None:
         name_required = False
+    config_wall = time.time() - config_wall
+    config_cpu = cpu_time() - config_cpu
 
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers()
 
-    parser.add_argument('-v', '--version', action='version', version='%(prog)s ver.1.0.0')
+    parser.add_argument('-v', '--version', action='version', version='%(prog)s ver.' + VERSION)
+    parser.add_argument('--timings', action='store_true', help="report wall and CPU time of each phase to stderr")
+    parser.add_argument('--profile', metavar='FILE', help="run the command under cProfile and dump the stats to FILE")
 
     parser_gen = subparsers.add_parser('gen', help="Generate Source Code such as XX_Main.cpp, XX_Message.[cpp|h], XX_Command.[cpp|h]")
     parser_gen.add_argument('-n', '--name', required=name_required, help="Subsystem Name(Short-Name) such as TP,HRI,AC", default=config.get('DEFAULT', 'name'))
@@ -980,6 +3914,17 @@ def main():
     parser_gen.add_argument('--include-prefix', help='prefix of #include header; include dir, such as "include/"')
     parser_gen.add_argument('--out-src-dir', help='directory to output source code(*.cpp)', default=config.get('DEFAULT', 'source_dir'))
     parser_gen.add_argument('--out-header-dir', help='directory to output header(*.h)', default=config.get('DEFAULT', 'header_dir'))
+    parser_gen.add_argument('--codec', choices=GEN_CODECS, help='how Command/Message pack the parameters: "text" sets each by name, "binary" copies them at fixed offsets into one buffer checked by a layout hash', default='text')
+    parser_gen.add_argument('--read-cache', type=parse_max_age, metavar='SEC', help='generate XX_Read_<struct> which serve the last value read without a round trip while it is younger than SEC (changeable by XX_SetReadCacheMaxAge_<struct>)')
+    parser_gen.add_argument('--subscribe', action='store_true', help='generate XX_Subscribe_<struct>/XX_Receive_<struct> for the TP and XX_Publish_<struct> for the subsystem, which pushes the ReadWrite structs instead of being polled')
+    parser_gen.add_argument('--batch', action='store_true', help='generate XX_ReadBatch/XX_WriteBatch, which send the requests for several ReadWrite structs before collecting the replies; XX_Read_<struct>/XX_Write_<struct> then return the error of a failed send')
+    parser_gen.add_argument('--dispatch-table', action='store_true', help='generate XX_FindMessageFunction, which looks the MessageFunctions up in a collision-free hash table instead of comparing each name, and dispatch through it with OpenROBO_MainWithLookup (needs a runtime providing it)')
+    parser_gen.add_argument('-j', '--jobs', type=int, help='number of processes to parse headers', default=1)
+    parser_gen.add_argument('--cache', help='path of the header parse cache', default=DEFAULT_PARSE_CACHE_PATH)
+    parser_gen.add_argument('--cache-size', type=int, help='maximum number of headers kept in the parse cache', default=DEFAULT_PARSE_CACHE_SIZE)
+    parser_gen.add_argument('--no-cache', action='store_true', help='parse every header without the parse cache')
+    parser_gen.add_argument('-w', '--watch', action='store_true', help='keep running and regenerate sources when headers change')
+    parser_gen.add_argument('--watch-interval', type=float, help='polling interval of --watch in seconds', default=0.2)
     parser_gen.set_defaults(func=gen_main)
 
     sync_addr_required = True if config.get('DEFAULT', 'sync_TP_addr') is None else False
@@ -990,6 +3935,18 @@ def main():
     parser_sync.add_argument('-p', '--port', required=sync_port_required, help="port", default=config.get('DEFAULT', 'sync_TP_port'))
     parser_sync.add_argument('--src-dir', help='directory to output source code(*.cpp)', default=config.get('DEFAULT', 'source_dir'))
     parser_sync.add_argument('--header-dir', help='directory to output header(*.h)', default=config.get('DEFAULT', 'header_dir'))
+    parser_sync.add_argument('--legacy', action='store_true', help="use the original protocol without negotiating features")
+    parser_sync.add_argument('-d', '--daemon', action='store_true', help="TP: keep serving subsystems whenever they connect, from a versioned store")
+    parser_sync.add_argument('--members', help="TP daemon: comma separated names of the expected subsystems (sync_members in the config)", default=config.get('DEFAULT', 'sync_members'))
+    parser_sync.add_argument('--member-timeout', type=float, metavar='SEC', help="TP daemon: how long requests wait for an expected subsystem which has not pushed yet (sync_member_timeout in the config)", default=config.get('DEFAULT', 'sync_member_timeout') or DEFAULT_SYNC_MEMBER_TIMEOUT)
+    parser_sync.add_argument('--push-only', action='store_true', help="only upload our Command files")
+    parser_sync.add_argument('--pull-only', action='store_true', help="only download the Command files of the peers")
+    parser_sync.add_argument('--compress', type=int, choices=range(10), metavar='LEVEL', help="compress file payloads with zlib at LEVEL (1-9) if the TP supports it", default=0)
+    parser_sync.add_argument('--multicast', metavar='GROUP:PORT', help="TP: send the peer Command files once to all subsystems by UDP multicast; missed pieces are sent again by TCP")
+    parser_sync.add_argument('--multicast-if', metavar='ADDR', help="address of the local interface for multicast, such as 127.0.0.1 to test on one machine", default="0.0.0.0")
+    parser_sync.add_argument('--multicast-rate', type=float, metavar='MBIT', help="TP: multicast rate in Mbit/s", default=DEFAULT_SYNC_MULTICAST_RATE / 1000000)
+    parser_sync.add_argument('--metrics', metavar='FILE', help="append a JSON line for every transfer, connection, retry and error to FILE (- for stdout) and print a summary per peer at the end")
+    parser_sync.add_argument('--retries', type=int, metavar='N', help="reconnect up to N times after a failed connection, resuming interrupted files", default=DEFAULT_SYNC_RETRIES)
     parser_sync.set_defaults(func=sync_main)
 
     parser_update = subparsers.add_parser('update', help="update OpenROBO_utils.py and OpenROBO.[cpp|h] and SocketCom.[cpp|h]")
@@ -1006,7 +3963,22 @@ def main():
     parser_clean.set_defaults(func=clean_main)
 
     args = parser.parse_args()
-    args.func(args)
+    if args.timings:
+        phase_timings.enabled = True
+        phase_timings.add("load config", config_wall, config_cpu)
+    try:
+        with phase_timings.phase("total"):
+            if args.profile:
+                profiler = cProfile.Profile()
+                try:
+                    profiler.runcall(args.func, args)
+                finally:
+                    profiler.dump_stats(args.profile)
+            else:
+                args.func(args)
+    finally:
+        if args.timings:
+            phase_timings.report(sys.stderr)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,139 @@
+import json
+import os
+import random
+import StringIO
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OpenROBO_utils import SYNC_FEATURES, SourceCodeSync, SyncMetrics  # noqa: E402
+from OpenROBO_bench import find_free_port  # noqa: E402
+
+
+class LoopbackSync(object):
+    """
+    A TP and subsystems syncing their Command files over the loopback in
+    one process. Each subsystem asks for the files of the peers in
+    pulls[name], all the other subsystems by default.
+    """
+
+    def __init__(self, root, names, pulls=None, size=20000, seed=0):
+        self.names = names
+        self.pulls = dict((name, [peer for peer in names if peer != name]) for name in names)
+        self.pulls.update(pulls or {})
+        self.rng = random.Random(seed)
+        self.dirs = {}
+        for name in ['TP'] + names:
+            self.dirs[name] = os.path.join(root, name)
+            os.mkdir(self.dirs[name])
+        self.source = {}
+        for name in names:
+            for ext in ['cpp', 'h']:
+                self.write(name, ext, self.randomSource(size))
+            for peer in self.pulls[name]:
+                for ext in ['cpp', 'h']:
+                    # a stale copy makes the client ask for the peer
+                    open(os.path.join(self.dirs[name], '%s_Command.%s' % (peer, ext)), 'w').close()
+        self.server = None
+        self.clients = {}
+
+    def randomSource(self, size):
+        lines = []
+        while sum(len(line) for line in lines) < size:
+            lines.append("int f%d(double x) { return %d; }\n" % (self.rng.randint(0, 1 << 30), self.rng.randint(0, 1 << 30)))
+        return "".join(lines)[:size]
+
+    def write(self, name, ext, data):
+        base = '%s_Command.%s' % (name, ext)
+        self.source[base] = data
+        with open(os.path.join(self.dirs[name], base), 'w') as f:
+            f.write(data)
+
+    def run(self, features=SYNC_FEATURES, server_wrapper=None, client_wrappers=None, proxy=None, retries=None, multicast=None, delays=None, timeout=30.0):
+        """
+        syncs every subsystem once and returns the seconds each took; the
+        subsystems connect through proxy, a FlakyProxy made for the port
+        given, and reconnect up to retries times. With multicast,
+        "GROUP:PORT", the TP multicasts the files on the loopback. A
+        subsystem in delays connects that many seconds late.
+        """
+        port = find_free_port()
+        server_features = features + (('multicast=%s' % (multicast),) if multicast else ())
+        client_features = features + (('multicast',) if multicast else ())
+        self.server = SourceCodeSync('TP', self.dirs['TP'], self.dirs['TP'], features=server_features)
+        self.server.multicast_if = '127.0.0.1'
+        self.server.socket_wrapper = server_wrapper
+        self.server.metrics = SyncMetrics(StringIO.StringIO())
+        serversock = self.server.listen(port)
+        server_thread = threading.Thread(target=self.server.server, args=(port, len(self.names), serversock))
+        server_thread.daemon = True
+        server_thread.start()
+        if proxy is not None:
+            proxy = proxy(port)
+            proxy.start()
+        client_port = proxy.addr[1] if proxy is not None else port
+        start = time.time()
+        finish_times = {}
+        errors = []
+
+        def run_client(client):
+            time.sleep((delays or {}).get(client.name, 0))
+            try:
+                if retries is None:
+                    client.client('127.0.0.1', client_port)
+                else:
+                    client.clientWithRetry('127.0.0.1', client_port, retries=retries, backoff=0.01)
+            except Exception as e:
+                errors.append((client.name, e))
+            finish_times[client.name] = time.time() - start
+        threads = []
+        for name in self.names:
+            client = SourceCodeSync(name, self.dirs[name], self.dirs[name], features=client_features)
+            client.multicast_if = '127.0.0.1'
+            client.socket_wrapper = (client_wrappers or {}).get(name)
+            client.metrics = SyncMetrics(StringIO.StringIO())
+            self.clients[name] = client
+            t = threading.Thread(target=run_client, args=(client,))
+            t.daemon = True
+            t.start()
+            threads.append(t)
+        for t in threads + [server_thread]:
+            t.join(timeout)
+            assert not t.is_alive(), "loopback sync did not finish in %.1f sec" % (timeout)
+        if proxy is not None:
+            proxy.stop()
+        assert not errors
+        return finish_times
+
+    def records(self, name, event):
+        """ metrics records of event logged by name in the last run; name is "TP" for the TP """
+        sync = self.server if name == 'TP' else self.clients[name]
+        records = [json.loads(line) for line in sync.metrics.f.getvalue().splitlines()]
+        return [r for r in records if r['event'] == event]
+
+    def received(self, name):
+        """ sorted names of the files name received in the last run """
+        return sorted(r['file'] for r in self.records(name, 'recv'))
+
+    def verify(self):
+        for name in self.names:
+            for peer in self.pulls[name]:
+                for ext in ['cpp', 'h']:
+                    base = '%s_Command.%s' % (peer, ext)
+                    with open(os.path.join(self.dirs[name], base)) as f:
+                        assert f.read() == self.source[base], "%s of %s differs" % (base, name)
+
+
+@pytest.fixture
+def loopback_sync(tmpdir):
+    """ returns a function making a LoopbackSync in a new directory each call """
+    count = [0]
+
+    def make(names, **kwargs):
+        count[0] += 1
+        return LoopbackSync(str(tmpdir.mkdir('sync%d' % (count[0]))), names, **kwargs)
+    return make
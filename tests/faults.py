@@ -0,0 +1,182 @@
+"""
+Socket wrappers which inject the faults of real networks into a loopback
+sync: slow links, fragmented sends and receives, lost datagrams and
+killed connections.
+"""
+import socket
+import threading
+import time
+
+from OpenROBO_utils import SYNC_BUFFER_SIZE, SYNC_LISTEN_BACKLOG
+
+
+class DelayedSocket:
+    """ socket wrapper; every send waits delay seconds to emulate a slow link """
+
+    def __init__(self, sock, delay):
+        self.sock = sock
+        self.delay = delay
+
+    def sendall(self, data):
+        time.sleep(self.delay)
+        self.sock.sendall(data)
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+class FragmentingSocket:
+    """
+    socket wrapper; splits every send and every receive into pieces of
+    random size up to max_size bytes
+    """
+
+    def __init__(self, sock, max_size, rng):
+        self.sock = sock
+        self.max_size = max_size
+        self.rng = rng
+
+    def sendall(self, data):
+        pos = 0
+        while pos < len(data):
+            n = self.rng.randint(1, self.max_size)
+            self.sock.sendall(data[pos:pos + n])
+            pos += n
+
+    def recv_into(self, buf, nbytes=0):
+        n = self.rng.randint(1, self.max_size)
+        return self.sock.recv_into(buf, min(n, nbytes or len(buf)))
+
+    def recv(self, bufsize, *args):
+        return self.sock.recv(min(bufsize, self.rng.randint(1, self.max_size)), *args)
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+class DroppingSocket:
+    """ datagram socket wrapper; drops every n-th datagram it receives """
+
+    def __init__(self, sock, n):
+        self.sock = sock
+        self.n = n
+        self.count = 0
+        self.dropped = 0
+
+    def recv(self, size):
+        while True:
+            data = self.sock.recv(size)
+            self.count += 1
+            if self.count % self.n:
+                return data
+            self.dropped += 1
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+class FlakyProxy:
+    """
+    TCP proxy for tests; forwards connections to port on the loopback and
+    kills each of them with probability rate after a random number of
+    bytes, at least min_bytes and at most max_bytes, in either direction;
+    no more than max_kills connections are killed
+    """
+
+    def __init__(self, port, max_bytes, rate, rng, min_bytes=1, max_kills=None):
+        self.port = port
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.rate = rate
+        self.rng = rng
+        self.max_kills = max_kills
+        self.kills = 0
+        self.killing = 0
+        self.lock = threading.Lock()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(SYNC_LISTEN_BACKLOG)
+        self.sock.settimeout(0.1)
+        self.addr = self.sock.getsockname()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.acceptLoop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+    def acceptLoop(self):
+        while self.running:
+            try:
+                client, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            client.settimeout(None)
+            try:
+                server = socket.create_connection(('127.0.0.1', self.port))
+            except socket.error:
+                client.close()
+                continue
+            left = None
+            with self.lock:
+                if self.rng.random() < self.rate and (self.max_kills is None or self.killing < self.max_kills):
+                    self.killing += 1
+                    left = self.rng.randint(self.min_bytes, self.max_bytes)
+            t = threading.Thread(target=self.forward, args=(client, server, left))
+            t.daemon = True
+            t.start()
+
+    def forward(self, client, server, left):
+        # bytes until the connection is killed, shared by both directions
+        state = {'left': left, 'killed': False}
+        pumps = [threading.Thread(target=self.pump, args=(client, server, state)),
+                 threading.Thread(target=self.pump, args=(server, client, state))]
+        for t in pumps:
+            t.daemon = True
+            t.start()
+        for t in pumps:
+            t.join()
+        client.close()
+        server.close()
+
+    def pump(self, src, dst, state):
+        try:
+            while True:
+                data = src.recv(SYNC_BUFFER_SIZE)
+                if not data:
+                    dst.shutdown(socket.SHUT_WR)
+                    return
+                kill = False
+                with self.lock:
+                    if state['killed']:
+                        return
+                    if state['left'] is not None:
+                        if len(data) >= state['left']:
+                            data = data[:state['left']]
+                            kill = True
+                        state['left'] -= len(data)
+                dst.sendall(data)
+                if kill:
+                    self.kill(src, dst, state)
+                    return
+        except socket.error:
+            pass
+
+    def kill(self, a, b, state):
+        with self.lock:
+            if state['killed']:
+                return
+            state['killed'] = True
+            self.kills += 1
+        for sock in (a, b):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
@@ -0,0 +1,11 @@
+#define TASKPLANNER_PORT 50001
+
+static const char* const subsystemList[] = {
+	"HRI",
+	"AC",
+	"TC",
+	"VC",
+	"VS",
+	"CG",
+	NULL
+};
@@ -0,0 +1,13 @@
+void Message_Func_0_0(const char* message);
+void Message_Func_0_1(const char* message);
+void Message_Func_0_2(const char* message);
+void Message_Func_0_3(const char* message);
+void Message_Func_0_4(const char* message);
+void Message_Func_0_5(const char* message);
+void Message_Func_0_6(const char* message);
+void Message_Func_0_7(const char* message);
+void Message_Func_0_8(const char* message);
+void Message_Func_0_9(const char* message);
+void Message_Func_0_10(const char* message);
+void Message_Func_0_11(const char* message);
+void Message_Step(const char* message);
@@ -0,0 +1,50 @@
+#include <stdio.h>
+#include "TP_Main.h"
+#include "OpenROBO.h"
+#include "TP_Message.h"
+
+#include "Golden.h"
+
+int main(int argc, char *argv[])
+{
+	int res;
+	res = OpenROBO_StartupMainThread("TP");
+	if (res != OpenROBO_Return_Success) {
+		fprintf(stderr, "error: startup\n");
+		return res;
+	}
+	res = OpenROBO_Socket_AcceptConnection(TASKPLANNER_PORT, subsystemList);
+	if (res != OpenROBO_Return_Success) {
+		fprintf(stderr, "error: make connection\n");
+		return res;
+	}
+
+	res = OpenROBO_Thread_CreateSubthread(*Sub_0, "*Sub_0", argc, argv);
+	if (res != OpenROBO_Return_Success) {
+		fprintf(stderr, "error: create subthread \"*Sub_0\"\n");
+		return res;
+	}
+
+	OpenROBO_MessageFunctionEntry_t messageFunctionEntry[] = {
+		{Message_Func_0_0, "Func_0_0"},
+		{Message_Func_0_1, "Func_0_1"},
+		{Message_Func_0_2, "Func_0_2"},
+		{Message_Func_0_3, "Func_0_3"},
+		{Message_Func_0_4, "Func_0_4"},
+		{Message_Func_0_5, "Func_0_5"},
+		{Message_Func_0_6, "Func_0_6"},
+		{Message_Func_0_7, "Func_0_7"},
+		{Message_Func_0_8, "Func_0_8"},
+		{Message_Func_0_9, "Func_0_9"},
+		{Message_Func_0_10, "Func_0_10"},
+		{Message_Func_0_11, "Func_0_11"},
+		{Message_Step, "Step"},
+		OPENROBO_END_OF_MESSAGE_FUNCTION_ENTRY
+	};
+
+	res = OpenROBO_Main(messageFunctionEntry);
+
+	Term_0();
+
+	return res;
+}
\ No newline at end of file
@@ -0,0 +1,101 @@
+int VC_Func_0_0(int _p0[6]);
+int VC_Start_Func_0_0(int _p0[6]);
+int VC_Stop_Func_0_0();
+int VC_Wait_Func_0_0();
+
+int VC_Func_0_1(char * _p0, int _p1[6], char _p2[6]);
+int VC_Start_Func_0_1(char * _p0, int _p1[6], char _p2[6]);
+int VC_Stop_Func_0_1();
+int VC_Wait_Func_0_1();
+
+int VC_Func_0_2(double _p0[3], int _p1);
+int VC_Start_Func_0_2(double _p0[3], int _p1);
+int VC_Stop_Func_0_2();
+int VC_Wait_Func_0_2();
+
+int VC_Func_0_3(double * _p0, char _p1[5], double _p2[6]);
+int VC_Start_Func_0_3(double * _p0, char _p1[5], double _p2[6]);
+int VC_Stop_Func_0_3();
+int VC_Wait_Func_0_3();
+
+int VC_Func_0_4(int * _p0, float _p1[6]);
+int VC_Start_Func_0_4(int * _p0, float _p1[6]);
+int VC_Stop_Func_0_4();
+int VC_Wait_Func_0_4();
+
+int VC_Func_0_5(double _p0[6], char _p1[6], double _p2[6], double * _p3);
+int VC_Start_Func_0_5(double _p0[6], char _p1[6], double _p2[6], double * _p3);
+int VC_Stop_Func_0_5();
+int VC_Wait_Func_0_5();
+
+int VC_Func_0_6(int _p0[8], char _p1[6], int * _p2);
+int VC_Start_Func_0_6(int _p0[8], char _p1[6], int * _p2);
+int VC_Stop_Func_0_6();
+int VC_Wait_Func_0_6();
+
+int VC_Func_0_7(double _p0);
+int VC_Start_Func_0_7(double _p0);
+int VC_Stop_Func_0_7();
+int VC_Wait_Func_0_7();
+
+int VC_Func_0_8(float _p0[6], float _p1[6], double _p2[6]);
+int VC_Start_Func_0_8(float _p0[6], float _p1[6], double _p2[6]);
+int VC_Stop_Func_0_8();
+int VC_Wait_Func_0_8();
+
+int VC_Func_0_9();
+int VC_Start_Func_0_9();
+int VC_Stop_Func_0_9();
+int VC_Wait_Func_0_9();
+
+int VC_Func_0_10(float _p0[6], char _p1[8], int _p2[6]);
+int VC_Start_Func_0_10(float _p0[6], char _p1[8], int _p2[6]);
+int VC_Stop_Func_0_10();
+int VC_Wait_Func_0_10();
+
+int VC_Func_0_11(int _p0, int * _p1, int _p2[6], int _p3[5]);
+int VC_Start_Func_0_11(int _p0, int * _p1, int _p2[6], int _p3[5]);
+int VC_Stop_Func_0_11();
+int VC_Wait_Func_0_11();
+
+int VC_Step(int _n);
+int VC_Start_Step(int _n);
+int VC_Stop_Step();
+int VC_Wait_Step();
+
+struct VC_Odom {
+	double x;
+	double v[3];
+};
+int VC_Read_Odom(struct VC_Odom *_Odom);
+int VC_Write_Odom(const struct VC_Odom *_Odom);
+
+struct VC_Pose {
+	int id;
+	float q[4];
+};
+int VC_Read_Pose(struct VC_Pose *_Pose);
+int VC_Write_Pose(const struct VC_Pose *_Pose);
+
+struct VC_S_0_0 {
+	double e0[4];
+};
+int VC_Read_S_0_0(struct VC_S_0_0 *_S_0_0);
+int VC_Write_S_0_0(const struct VC_S_0_0 *_S_0_0);
+
+struct VC_S_0_1 {
+	int e0[4];
+	double e1;
+	double e2[4];
+};
+int VC_Read_S_0_1(struct VC_S_0_1 *_S_0_1);
+int VC_Write_S_0_1(const struct VC_S_0_1 *_S_0_1);
+
+struct VC_S_0_2 {
+	float e0[4];
+	float e1[4];
+	char e2[4];
+};
+int VC_Read_S_0_2(struct VC_S_0_2 *_S_0_2);
+int VC_Write_S_0_2(const struct VC_S_0_2 *_S_0_2);
+
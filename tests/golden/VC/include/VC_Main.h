@@ -0,0 +1,2 @@
+#define TASKPLANNER_ADDRESS "192.168.0.200"
+#define TASKPLANNER_PORT 50001
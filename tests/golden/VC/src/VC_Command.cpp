@@ -0,0 +1,1313 @@
+#include "OpenROBO.h"
+
+#include "VC_Command.h"
+
+static int *Func_0_0_p0;
+
+int VC_Start_Func_0_0(int _p0[6])
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_0");
+
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_0_p0 = _p0;
+
+	return res;
+}
+
+int VC_Stop_Func_0_0()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_0");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_0();
+}
+
+int VC_Wait_Func_0_0()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_0");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_intArray(message, "p0", Func_0_0_p0, 6);
+
+	return res;
+}
+
+int VC_Func_0_0(int _p0[6])
+{
+	int res;
+	res = VC_Start_Func_0_0(_p0);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_0();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static char * Func_0_1_p0;
+static int *Func_0_1_p1;
+static char *Func_0_1_p2;
+
+int VC_Start_Func_0_1(char * _p0, int _p1[6], char _p2[6])
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_1");
+
+	OpenROBO_Message_SetParam_char(message, "p0", &_p0);
+	OpenROBO_Message_SetParam_charArray(message, "p2", _p2, 6);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_1_p0 = _p0;
+	Func_0_1_p1 = _p1;
+	Func_0_1_p2 = _p2;
+
+	return res;
+}
+
+int VC_Stop_Func_0_1()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_1");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_1();
+}
+
+int VC_Wait_Func_0_1()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_1");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_char(message, "p0", Func_0_1_p0);
+	OpenROBO_Message_GetParam_intArray(message, "p1", Func_0_1_p1, 6);
+	OpenROBO_Message_GetParam_charArray(message, "p2", Func_0_1_p2, 6);
+
+	return res;
+}
+
+int VC_Func_0_1(char * _p0, int _p1[6], char _p2[6])
+{
+	int res;
+	res = VC_Start_Func_0_1(_p0, _p1, _p2);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_1();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static double *Func_0_2_p0;
+
+int VC_Start_Func_0_2(double _p0[3], int _p1)
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_2");
+
+	OpenROBO_Message_SetParam_doubleArray(message, "p0", _p0, 3);
+	OpenROBO_Message_SetParam_int(message, "p1", &_p1);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_2_p0 = _p0;
+
+	return res;
+}
+
+int VC_Stop_Func_0_2()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_2");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_2();
+}
+
+int VC_Wait_Func_0_2()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_2");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_doubleArray(message, "p0", Func_0_2_p0, 3);
+
+	return res;
+}
+
+int VC_Func_0_2(double _p0[3], int _p1)
+{
+	int res;
+	res = VC_Start_Func_0_2(_p0, _p1);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_2();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static double * Func_0_3_p0;
+static char *Func_0_3_p1;
+static double *Func_0_3_p2;
+
+int VC_Start_Func_0_3(double * _p0, char _p1[5], double _p2[6])
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_3");
+
+	OpenROBO_Message_SetParam_doubleArray(message, "p2", _p2, 6);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_3_p0 = _p0;
+	Func_0_3_p1 = _p1;
+	Func_0_3_p2 = _p2;
+
+	return res;
+}
+
+int VC_Stop_Func_0_3()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_3");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_3();
+}
+
+int VC_Wait_Func_0_3()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_3");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_double(message, "p0", Func_0_3_p0);
+	OpenROBO_Message_GetParam_charArray(message, "p1", Func_0_3_p1, 5);
+	OpenROBO_Message_GetParam_doubleArray(message, "p2", Func_0_3_p2, 6);
+
+	return res;
+}
+
+int VC_Func_0_3(double * _p0, char _p1[5], double _p2[6])
+{
+	int res;
+	res = VC_Start_Func_0_3(_p0, _p1, _p2);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_3();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static int * Func_0_4_p0;
+
+int VC_Start_Func_0_4(int * _p0, float _p1[6])
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_4");
+
+	OpenROBO_Message_SetParam_floatArray(message, "p1", _p1, 6);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_4_p0 = _p0;
+
+	return res;
+}
+
+int VC_Stop_Func_0_4()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_4");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_4();
+}
+
+int VC_Wait_Func_0_4()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_4");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_int(message, "p0", Func_0_4_p0);
+
+	return res;
+}
+
+int VC_Func_0_4(int * _p0, float _p1[6])
+{
+	int res;
+	res = VC_Start_Func_0_4(_p0, _p1);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_4();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static double *Func_0_5_p0;
+static char *Func_0_5_p1;
+static double *Func_0_5_p2;
+static double * Func_0_5_p3;
+
+int VC_Start_Func_0_5(double _p0[6], char _p1[6], double _p2[6], double * _p3)
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_5");
+
+	OpenROBO_Message_SetParam_charArray(message, "p1", _p1, 6);
+	OpenROBO_Message_SetParam_doubleArray(message, "p2", _p2, 6);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_5_p0 = _p0;
+	Func_0_5_p1 = _p1;
+	Func_0_5_p2 = _p2;
+	Func_0_5_p3 = _p3;
+
+	return res;
+}
+
+int VC_Stop_Func_0_5()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_5");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_5();
+}
+
+int VC_Wait_Func_0_5()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_5");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_doubleArray(message, "p0", Func_0_5_p0, 6);
+	OpenROBO_Message_GetParam_charArray(message, "p1", Func_0_5_p1, 6);
+	OpenROBO_Message_GetParam_doubleArray(message, "p2", Func_0_5_p2, 6);
+	OpenROBO_Message_GetParam_double(message, "p3", Func_0_5_p3);
+
+	return res;
+}
+
+int VC_Func_0_5(double _p0[6], char _p1[6], double _p2[6], double * _p3)
+{
+	int res;
+	res = VC_Start_Func_0_5(_p0, _p1, _p2, _p3);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_5();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static char *Func_0_6_p1;
+static int * Func_0_6_p2;
+
+int VC_Start_Func_0_6(int _p0[8], char _p1[6], int * _p2)
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_6");
+
+	OpenROBO_Message_SetParam_intArray(message, "p0", _p0, 8);
+	OpenROBO_Message_SetParam_charArray(message, "p1", _p1, 6);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_6_p1 = _p1;
+	Func_0_6_p2 = _p2;
+
+	return res;
+}
+
+int VC_Stop_Func_0_6()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_6");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_6();
+}
+
+int VC_Wait_Func_0_6()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_6");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_charArray(message, "p1", Func_0_6_p1, 6);
+	OpenROBO_Message_GetParam_int(message, "p2", Func_0_6_p2);
+
+	return res;
+}
+
+int VC_Func_0_6(int _p0[8], char _p1[6], int * _p2)
+{
+	int res;
+	res = VC_Start_Func_0_6(_p0, _p1, _p2);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_6();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+int VC_Start_Func_0_7(double _p0)
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_7");
+
+	OpenROBO_Message_SetParam_double(message, "p0", &_p0);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	return res;
+}
+
+int VC_Stop_Func_0_7()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_7");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_7();
+}
+
+int VC_Wait_Func_0_7()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_7");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+
+	return res;
+}
+
+int VC_Func_0_7(double _p0)
+{
+	int res;
+	res = VC_Start_Func_0_7(_p0);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_7();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static float *Func_0_8_p0;
+static float *Func_0_8_p1;
+static double *Func_0_8_p2;
+
+int VC_Start_Func_0_8(float _p0[6], float _p1[6], double _p2[6])
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_8");
+
+	OpenROBO_Message_SetParam_floatArray(message, "p0", _p0, 6);
+	OpenROBO_Message_SetParam_floatArray(message, "p1", _p1, 6);
+	OpenROBO_Message_SetParam_doubleArray(message, "p2", _p2, 6);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_8_p0 = _p0;
+	Func_0_8_p1 = _p1;
+	Func_0_8_p2 = _p2;
+
+	return res;
+}
+
+int VC_Stop_Func_0_8()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_8");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_8();
+}
+
+int VC_Wait_Func_0_8()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_8");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_floatArray(message, "p0", Func_0_8_p0, 6);
+	OpenROBO_Message_GetParam_floatArray(message, "p1", Func_0_8_p1, 6);
+	OpenROBO_Message_GetParam_doubleArray(message, "p2", Func_0_8_p2, 6);
+
+	return res;
+}
+
+int VC_Func_0_8(float _p0[6], float _p1[6], double _p2[6])
+{
+	int res;
+	res = VC_Start_Func_0_8(_p0, _p1, _p2);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_8();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+int VC_Start_Func_0_9()
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_9");
+
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	return res;
+}
+
+int VC_Stop_Func_0_9()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_9");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_9();
+}
+
+int VC_Wait_Func_0_9()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_9");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+
+	return res;
+}
+
+int VC_Func_0_9()
+{
+	int res;
+	res = VC_Start_Func_0_9();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_9();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static float *Func_0_10_p0;
+static char *Func_0_10_p1;
+static int *Func_0_10_p2;
+
+int VC_Start_Func_0_10(float _p0[6], char _p1[8], int _p2[6])
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_10");
+
+	OpenROBO_Message_SetParam_floatArray(message, "p0", _p0, 6);
+	OpenROBO_Message_SetParam_intArray(message, "p2", _p2, 6);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_10_p0 = _p0;
+	Func_0_10_p1 = _p1;
+	Func_0_10_p2 = _p2;
+
+	return res;
+}
+
+int VC_Stop_Func_0_10()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_10");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_10();
+}
+
+int VC_Wait_Func_0_10()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_10");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_floatArray(message, "p0", Func_0_10_p0, 6);
+	OpenROBO_Message_GetParam_charArray(message, "p1", Func_0_10_p1, 8);
+	OpenROBO_Message_GetParam_intArray(message, "p2", Func_0_10_p2, 6);
+
+	return res;
+}
+
+int VC_Func_0_10(float _p0[6], char _p1[8], int _p2[6])
+{
+	int res;
+	res = VC_Start_Func_0_10(_p0, _p1, _p2);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_10();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+static int * Func_0_11_p1;
+static int *Func_0_11_p3;
+
+int VC_Start_Func_0_11(int _p0, int * _p1, int _p2[6], int _p3[5])
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Func_0_11");
+
+	OpenROBO_Message_SetParam_int(message, "p0", &_p0);
+	OpenROBO_Message_SetParam_int(message, "p1", &_p1);
+	OpenROBO_Message_SetParam_intArray(message, "p2", _p2, 6);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	Func_0_11_p1 = _p1;
+	Func_0_11_p3 = _p3;
+
+	return res;
+}
+
+int VC_Stop_Func_0_11()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Func_0_11");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Func_0_11();
+}
+
+int VC_Wait_Func_0_11()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Func_0_11");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	OpenROBO_Message_GetParam_int(message, "p1", Func_0_11_p1);
+	OpenROBO_Message_GetParam_intArray(message, "p3", Func_0_11_p3, 5);
+
+	return res;
+}
+
+int VC_Func_0_11(int _p0, int * _p1, int _p2[6], int _p3[5])
+{
+	int res;
+	res = VC_Start_Func_0_11(_p0, _p1, _p2, _p3);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Func_0_11();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+int VC_Start_Step(int _n)
+{
+	int res;
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeOperationMessage(message, "Step");
+
+	OpenROBO_Message_SetParam_int(message, "n", &_n);
+
+	res = OpenROBO_Socket_SendCommandMessage("VC", message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	return res;
+}
+
+int VC_Stop_Step()
+{
+	char *message;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeStopMessage(message, "Step");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	return VC_Wait_Step();
+}
+
+int VC_Wait_Step()
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWaitMessage(message, "Step");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+
+	return res;
+}
+
+int VC_Step(int _n)
+{
+	int res;
+	res = VC_Start_Step(_n);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	res = VC_Wait_Step();
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	return OpenROBO_Return_Success;
+}
+
+int VC_Read_Odom(struct VC_Odom *_Odom)
+{
+	static double last_time = 0.0;
+	double time;
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeReadMessage(message, "Odom");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetTime(message, &time);
+	OpenROBO_Message_GetParam_double(message, "x", &_Odom->x);
+	OpenROBO_Message_GetParam_doubleArray(message, "v", _Odom->v, 3);
+
+	if (time > last_time) {
+		res = OpenROBO_Return_Success;
+		last_time = time;
+	} else {
+		res = OpenROBO_Return_NotUpdated;
+	}
+
+	return res;
+}
+
+int VC_Write_Odom(const struct VC_Odom *_Odom)
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWriteMessage(message, "Odom");
+	OpenROBO_Message_SetParam_double(message, "x", &_Odom->x);
+	OpenROBO_Message_SetParam_doubleArray(message, "v", _Odom->v, 3);
+
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	return res;
+}
+
+int VC_Read_Pose(struct VC_Pose *_Pose)
+{
+	static double last_time = 0.0;
+	double time;
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeReadMessage(message, "Pose");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetTime(message, &time);
+	OpenROBO_Message_GetParam_int(message, "id", &_Pose->id);
+	OpenROBO_Message_GetParam_floatArray(message, "q", _Pose->q, 4);
+
+	if (time > last_time) {
+		res = OpenROBO_Return_Success;
+		last_time = time;
+	} else {
+		res = OpenROBO_Return_NotUpdated;
+	}
+
+	return res;
+}
+
+int VC_Write_Pose(const struct VC_Pose *_Pose)
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWriteMessage(message, "Pose");
+	OpenROBO_Message_SetParam_int(message, "id", &_Pose->id);
+	OpenROBO_Message_SetParam_floatArray(message, "q", _Pose->q, 4);
+
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	return res;
+}
+
+int VC_Read_S_0_0(struct VC_S_0_0 *_S_0_0)
+{
+	static double last_time = 0.0;
+	double time;
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeReadMessage(message, "S_0_0");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetTime(message, &time);
+	OpenROBO_Message_GetParam_doubleArray(message, "e0", _S_0_0->e0, 4);
+
+	if (time > last_time) {
+		res = OpenROBO_Return_Success;
+		last_time = time;
+	} else {
+		res = OpenROBO_Return_NotUpdated;
+	}
+
+	return res;
+}
+
+int VC_Write_S_0_0(const struct VC_S_0_0 *_S_0_0)
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWriteMessage(message, "S_0_0");
+	OpenROBO_Message_SetParam_doubleArray(message, "e0", _S_0_0->e0, 4);
+
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	return res;
+}
+
+int VC_Read_S_0_1(struct VC_S_0_1 *_S_0_1)
+{
+	static double last_time = 0.0;
+	double time;
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeReadMessage(message, "S_0_1");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetTime(message, &time);
+	OpenROBO_Message_GetParam_intArray(message, "e0", _S_0_1->e0, 4);
+	OpenROBO_Message_GetParam_double(message, "e1", &_S_0_1->e1);
+	OpenROBO_Message_GetParam_doubleArray(message, "e2", _S_0_1->e2, 4);
+
+	if (time > last_time) {
+		res = OpenROBO_Return_Success;
+		last_time = time;
+	} else {
+		res = OpenROBO_Return_NotUpdated;
+	}
+
+	return res;
+}
+
+int VC_Write_S_0_1(const struct VC_S_0_1 *_S_0_1)
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWriteMessage(message, "S_0_1");
+	OpenROBO_Message_SetParam_intArray(message, "e0", _S_0_1->e0, 4);
+	OpenROBO_Message_SetParam_double(message, "e1", &_S_0_1->e1);
+	OpenROBO_Message_SetParam_doubleArray(message, "e2", _S_0_1->e2, 4);
+
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	return res;
+}
+
+int VC_Read_S_0_2(struct VC_S_0_2 *_S_0_2)
+{
+	static double last_time = 0.0;
+	double time;
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeReadMessage(message, "S_0_2");
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetTime(message, &time);
+	OpenROBO_Message_GetParam_floatArray(message, "e0", _S_0_2->e0, 4);
+	OpenROBO_Message_GetParam_floatArray(message, "e1", _S_0_2->e1, 4);
+	OpenROBO_Message_GetParam_charArray(message, "e2", _S_0_2->e2, 4);
+
+	if (time > last_time) {
+		res = OpenROBO_Return_Success;
+		last_time = time;
+	} else {
+		res = OpenROBO_Return_NotUpdated;
+	}
+
+	return res;
+}
+
+int VC_Write_S_0_2(const struct VC_S_0_2 *_S_0_2)
+{
+	char *message;
+	int res;
+
+	OpenROBO_Message_GetBuffer(&message);
+	OpenROBO_Message_MakeWriteMessage(message, "S_0_2");
+	OpenROBO_Message_SetParam_floatArray(message, "e0", _S_0_2->e0, 4);
+	OpenROBO_Message_SetParam_floatArray(message, "e1", _S_0_2->e1, 4);
+	OpenROBO_Message_SetParam_charArray(message, "e2", _S_0_2->e2, 4);
+
+	OpenROBO_Socket_SendCommandMessage("VC", message);
+
+	res = OpenROBO_Socket_ReceiveReturnMessage("VC", &message);
+	if (res != OpenROBO_Return_Success) {
+		return res;
+	}
+
+	OpenROBO_Message_GetReturnValue(message, &res);
+
+	return res;
+}
+
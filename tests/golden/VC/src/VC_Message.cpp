@@ -0,0 +1,312 @@
+#include "OpenROBO.h"
+
+#include "Golden.h"
+#include "Motion.h"
+
+void Message_Func_0_0(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	int _p0[6];
+
+
+	res = Func_0_0(_p0);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_0");
+
+	OpenROBO_Message_SetParam_intArray(returnMessage, "p0", _p0, 6);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_1(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	char _p0;
+	int _p1[6];
+	char _p2[6];
+
+	OpenROBO_Message_GetParam_char(message, "p0", &_p0);
+	OpenROBO_Message_GetParam_charArray(message, "p2", _p2, 6);
+
+	res = Func_0_1(&_p0, _p1, _p2);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_1");
+
+	OpenROBO_Message_SetParam_char(returnMessage, "p0", &_p0);
+	OpenROBO_Message_SetParam_intArray(returnMessage, "p1", _p1, 6);
+	OpenROBO_Message_SetParam_charArray(returnMessage, "p2", _p2, 6);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_2(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	double _p0[3];
+	int _p1;
+
+	OpenROBO_Message_GetParam_doubleArray(message, "p0", _p0, 3);
+	OpenROBO_Message_GetParam_int(message, "p1", &_p1);
+
+	res = Func_0_2(_p0, _p1);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_2");
+
+	OpenROBO_Message_SetParam_doubleArray(returnMessage, "p0", _p0, 3);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_3(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	double _p0;
+	char _p1[5];
+	double _p2[6];
+
+	OpenROBO_Message_GetParam_doubleArray(message, "p2", _p2, 6);
+
+	res = Func_0_3(&_p0, _p1, _p2);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_3");
+
+	OpenROBO_Message_SetParam_double(returnMessage, "p0", &_p0);
+	OpenROBO_Message_SetParam_charArray(returnMessage, "p1", _p1, 5);
+	OpenROBO_Message_SetParam_doubleArray(returnMessage, "p2", _p2, 6);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_4(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	int _p0;
+	float _p1[6];
+
+	OpenROBO_Message_GetParam_floatArray(message, "p1", _p1, 6);
+
+	res = Func_0_4(&_p0, _p1);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_4");
+
+	OpenROBO_Message_SetParam_int(returnMessage, "p0", &_p0);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_5(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	double _p0[6];
+	char _p1[6];
+	double _p2[6];
+	double _p3;
+
+	OpenROBO_Message_GetParam_charArray(message, "p1", _p1, 6);
+	OpenROBO_Message_GetParam_doubleArray(message, "p2", _p2, 6);
+
+	res = Func_0_5(_p0, _p1, _p2, &_p3);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_5");
+
+	OpenROBO_Message_SetParam_doubleArray(returnMessage, "p0", _p0, 6);
+	OpenROBO_Message_SetParam_charArray(returnMessage, "p1", _p1, 6);
+	OpenROBO_Message_SetParam_doubleArray(returnMessage, "p2", _p2, 6);
+	OpenROBO_Message_SetParam_double(returnMessage, "p3", &_p3);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_6(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	int _p0[8];
+	char _p1[6];
+	int _p2;
+
+	OpenROBO_Message_GetParam_intArray(message, "p0", _p0, 8);
+	OpenROBO_Message_GetParam_charArray(message, "p1", _p1, 6);
+
+	res = Func_0_6(_p0, _p1, &_p2);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_6");
+
+	OpenROBO_Message_SetParam_charArray(returnMessage, "p1", _p1, 6);
+	OpenROBO_Message_SetParam_int(returnMessage, "p2", &_p2);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_7(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	double _p0;
+
+	OpenROBO_Message_GetParam_double(message, "p0", &_p0);
+
+	res = Func_0_7(_p0);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_7");
+
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_8(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	float _p0[6];
+	float _p1[6];
+	double _p2[6];
+
+	OpenROBO_Message_GetParam_floatArray(message, "p0", _p0, 6);
+	OpenROBO_Message_GetParam_floatArray(message, "p1", _p1, 6);
+	OpenROBO_Message_GetParam_doubleArray(message, "p2", _p2, 6);
+
+	res = Func_0_8(_p0, _p1, _p2);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_8");
+
+	OpenROBO_Message_SetParam_floatArray(returnMessage, "p0", _p0, 6);
+	OpenROBO_Message_SetParam_floatArray(returnMessage, "p1", _p1, 6);
+	OpenROBO_Message_SetParam_doubleArray(returnMessage, "p2", _p2, 6);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_9(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+
+
+	res = Func_0_9();
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_9");
+
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_10(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	float _p0[6];
+	char _p1[8];
+	int _p2[6];
+
+	OpenROBO_Message_GetParam_floatArray(message, "p0", _p0, 6);
+	OpenROBO_Message_GetParam_intArray(message, "p2", _p2, 6);
+
+	res = Func_0_10(_p0, _p1, _p2);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_10");
+
+	OpenROBO_Message_SetParam_floatArray(returnMessage, "p0", _p0, 6);
+	OpenROBO_Message_SetParam_charArray(returnMessage, "p1", _p1, 8);
+	OpenROBO_Message_SetParam_intArray(returnMessage, "p2", _p2, 6);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Func_0_11(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	int _p0;
+	int _p1;
+	int _p2[6];
+	int _p3[5];
+
+	OpenROBO_Message_GetParam_int(message, "p0", &_p0);
+	OpenROBO_Message_GetParam_int(message, "p1", &_p1);
+	OpenROBO_Message_GetParam_intArray(message, "p2", _p2, 6);
+
+	res = Func_0_11(_p0, &_p1, _p2, _p3);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Func_0_11");
+
+	OpenROBO_Message_SetParam_int(returnMessage, "p1", &_p1);
+	OpenROBO_Message_SetParam_intArray(returnMessage, "p3", _p3, 5);
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
+void Message_Step(const char* message)
+{
+	int res;
+	char *returnMessage;
+
+	int _n;
+
+	OpenROBO_Message_GetParam_int(message, "n", &_n);
+
+	res = Step(_n);
+
+	OpenROBO_Message_GetBuffer(&returnMessage);
+	OpenROBO_Message_MakeReturnMessage(returnMessage, "Step");
+
+	OpenROBO_Message_SetReturnValue(returnMessage, res);
+
+	OpenROBO_Socket_SendReturnMessage(returnMessage);
+
+}
+
@@ -0,0 +1,145 @@
+#ifndef H0
+#define H0
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[out] p0 desc
+ */
+int Func_0_0(int p0[2][3]);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[in,out] p0 desc
+ * @param[out] p1 desc
+ * @param[in,out] p2 desc
+ */
+int Func_0_1(char *p0, int p1[2][3], char p2[2][3]);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[in,out] p0 desc
+ * @param[in] p1 desc
+ */
+int Func_0_2(double p0[3], int p1);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[out] p0 desc
+ * @param[out] p1 desc
+ * @param[in,out] p2 desc
+ */
+int Func_0_3(double *p0, char p1[5], double p2[2][3]);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[out] p0 desc
+ * @param[in] p1 desc
+ */
+int Func_0_4(int *p0, float p1[2][3]);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[out] p0 desc
+ * @param[in,out] p1 desc
+ * @param[in,out] p2 desc
+ * @param[out] p3 desc
+ */
+int Func_0_5(double p0[2][3], char p1[2][3], double p2[2][3], double *p3);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[in] p0 desc
+ * @param[in,out] p1 desc
+ * @param[out] p2 desc
+ */
+int Func_0_6(int p0[8], char p1[2][3], int *p2);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[in] p0 desc
+ */
+int Func_0_7(double p0);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[in,out] p0 desc
+ * @param[in,out] p1 desc
+ * @param[in,out] p2 desc
+ */
+int Func_0_8(float p0[2][3], float p1[2][3], double p2[2][3]);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ */
+int Func_0_9();
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[in,out] p0 desc
+ * @param[out] p1 desc
+ * @param[in,out] p2 desc
+ */
+int Func_0_10(float p0[2][3], char p1[8], int p2[2][3]);
+
+/**
+ * MessageFunction@OpenROBO
+ * @brief f
+ * @param[in] p0 desc
+ * @param[in,out] p1 desc
+ * @param[in] p2 desc
+ * @param[out] p3 desc
+ */
+int Func_0_11(int p0, int *p1, int p2[2][3], int p3[5]);
+
+/**
+ * ReadWrite@OpenROBO
+ */
+struct S_0_0 {
+	double e0[2][2];
+};
+
+/**
+ * ReadWrite@OpenROBO
+ */
+struct S_0_1 {
+	int e0[4];
+	double e1;
+	double e2[4];
+};
+
+/**
+ * ReadWrite@OpenROBO
+ */
+struct S_0_2 {
+	float e0[2][2];
+	float e1[4];
+	char e2[4];
+};
+
+/**
+ * Subthread@OpenROBO
+ */
+void *Sub_0(void *arg);
+
+/**
+ * init@OpenROBO
+ */
+int Init_0(void);
+
+/**
+ * term@OpenROBO
+ */
+void Term_0(void);
+
+#endif
@@ -0,0 +1,43 @@
+"""
+Builds a loopback harness: generates the VC sources of some headers with
+gen, compiles them with a harness from loopback/ and the runtime of
+loopback/runtime.h, runs it and parses what it prints.
+"""
+import os
+import re
+import shutil
+import subprocess
+import sys
+from distutils.spawn import find_executable
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LOOPBACK_DIR = os.path.join(TESTS_DIR, "loopback")
+UTILS = os.path.join(os.path.dirname(TESTS_DIR), "OpenROBO_utils.py")
+CXX = find_executable("g++")
+
+
+def run_harness(work, harness, headers, gen_args, sources=("VC_Command.cpp", "VC_Message.cpp")):
+    """
+    returns {step: {key: value}} of the lines "<step> <key>=<value> ..."
+    which loopback/<harness> prints; headers are names in loopback/
+    """
+    if CXX is None:
+        pytest.skip("g++ is not installed")
+    header_dir = os.path.join(work, "include")
+    src_dir = os.path.join(work, "src")
+    os.mkdir(header_dir)
+    os.mkdir(src_dir)
+    for name in headers:
+        shutil.copy(os.path.join(LOOPBACK_DIR, name), header_dir)
+    subprocess.check_call([sys.executable, UTILS, "gen", "-q", "-n", "VC", "--header-dir", header_dir, "--out-src-dir", src_dir,
+                           "--out-header-dir", header_dir, "--no-cache"] + list(gen_args))
+    binary = os.path.join(work, os.path.splitext(harness)[0])
+    subprocess.check_call([CXX, "-Wall", "-I", header_dir, "-I", os.path.join(LOOPBACK_DIR, "include"), "-I", LOOPBACK_DIR, "-o", binary,
+                           os.path.join(LOOPBACK_DIR, harness)] + [os.path.join(src_dir, source) for source in sources])
+    results = {}
+    for line in subprocess.check_output([binary]).decode().splitlines():
+        step, values = re.match(r"([a-z ]+?) (\w+=.*)$", line).groups()
+        results[step] = dict(re.findall(r"(\w+)=(\S+)", values))
+    return results
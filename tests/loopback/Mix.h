@@ -0,0 +1,12 @@
+#pragma once
+/**
+ * @brief mixes
+ * MessageFunction@OpenROBO
+ * @param[in] n n
+ * @param[in] gain gain
+ * @param[in,out] v v
+ * @param[out] sum sum
+ * @param[out] grid grid
+ * @param[out] tag tag
+ */
+int Mix(int n, double gain, float v[3], double *sum, int grid[4], char tag[4]);
@@ -0,0 +1,7 @@
+#pragma once
+/**
+ * @brief step the subsystem n times
+ * MessageFunction@OpenROBO
+ * @param[in] n n
+ */
+int Step(int n);
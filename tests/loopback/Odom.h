@@ -0,0 +1,9 @@
+#pragma once
+/**
+ * @brief odometry
+ * ReadWrite@OpenROBO
+ */
+struct Odom {
+	double x;
+	double v[3];
+};
@@ -0,0 +1,9 @@
+#pragma once
+/**
+ * @brief pose
+ * ReadWrite@OpenROBO
+ */
+struct Pose {
+	int id;
+	float q[4];
+};
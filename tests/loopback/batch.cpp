@@ -0,0 +1,63 @@
+/*
+ * Runs VC_Command.cpp generated with --batch against the runtime of
+ * runtime.h and prints the order in which the messages passed.
+ */
+#include <stdio.h>
+#include <string.h>
+#include "runtime.h"
+#include "Odom.h"
+#include "Pose.h"
+#include "VC_Command.h"
+
+/* the trace since the last call as "send:read:Odom,receive:Odom,..." */
+static std::string order()
+{
+	std::string s;
+	for (size_t i = 0; i < trace.size(); i++) {
+		std::string t = trace[i];
+		for (size_t k = 0; k < t.size(); k++) {
+			if (t[k] == ' ') t[k] = ':';
+		}
+		s += (i ? "," : "") + t;
+	}
+	trace.clear();
+	return s;
+}
+
+int main()
+{
+	struct VC_Odom o;
+	struct VC_Pose p;
+	int r;
+
+	memset(&o, 0, sizeof(o));
+	memset(&p, 0, sizeof(p));
+	o.x = 1.5;
+	o.v[2] = 3;
+	p.id = 7;
+	p.q[3] = 0.5f;
+	r = VC_WriteBatch(&o, &p);
+	printf("write r=%d order=%s\n", r, order().c_str());
+
+	memset(&o, 0, sizeof(o));
+	memset(&p, 0, sizeof(p));
+	r = VC_ReadBatch(&o, &p);
+	printf("read r=%d x=%g v2=%g id=%d q3=%g order=%s\n", r, o.x, o.v[2], p.id, p.q[3], order().c_str());
+
+	memset(&o, 0, sizeof(o));
+	r = VC_ReadBatch(&o, NULL);
+	printf("read one r=%d x=%g order=%s\n", r, o.x, order().c_str());
+
+	/* a failed send is returned and the other struct is still read */
+	fail_send = "Pose";
+	memset(&o, 0, sizeof(o));
+	r = VC_ReadBatch(&o, &p);
+	printf("failed send r=%d x=%g queued=%d order=%s\n", r, o.x, (int)toTP.size(), order().c_str());
+	fail_send = "";
+
+	/* every reply of a failed write is consumed */
+	write_result = -7;
+	r = VC_WriteBatch(&o, &p);
+	printf("failed write r=%d queued=%d order=%s\n", r, (int)toTP.size(), order().c_str());
+	return 0;
+}
@@ -0,0 +1,62 @@
+/*
+ * Runs VC_Command.cpp and VC_Message.cpp generated with --codec binary
+ * against each other through the runtime of runtime.h.
+ */
+#include <stdio.h>
+#include <string.h>
+#include "runtime.h"
+#include "Mix.h"
+#include "VC_Command.h"
+#include "VC_Message.h"
+
+static int calls = 0;
+
+/* the subsystem */
+int Mix(int n, double gain, float v[3], double *sum, int grid[4], char tag[4])
+{
+	calls++;
+	*sum = 0;
+	for (int i = 0; i < 3; i++) {
+		v[i] *= gain;
+		*sum += v[i];
+	}
+	for (int i = 0; i < 4; i++) {
+		grid[i] = n * 10 + i;
+	}
+	memcpy(tag, "mix", 4);
+	return n > 0 ? OpenROBO_Return_Success : n;
+}
+
+static void runOperation(const std::string &name, char *m)
+{
+	if (name == "Mix") Message_Mix(m);
+}
+
+int main()
+{
+	float v[3] = {1.0f, 2.0f, 3.5f};
+	double sum = -1;
+	int grid[4] = {0};
+	char tag[4] = "";
+	int r;
+
+	run_operation = runOperation;
+	r = VC_Mix(2, 0.5, v, &sum, grid, tag);
+	printf("round trip r=%d v=%g,%g,%g sum=%g grid=%d,%d,%d,%d tag=%s calls=%d\n",
+	       r, v[0], v[1], v[2], sum, grid[0], grid[1], grid[2], grid[3], tag, calls);
+
+	r = VC_Mix(-3, 1.0, v, &sum, grid, tag);
+	printf("function error r=%d calls=%d\n", r, calls);
+
+	/* a subsystem of the other byte order rejects the operation without calling Mix */
+	corrupt_operation = true;
+	r = VC_Mix(2, 1.0, v, &sum, grid, tag);
+	printf("operation mismatch r=%d calls=%d\n", r, calls);
+
+	/* and the TP rejects such a return without touching the outputs */
+	corrupt_return = true;
+	sum = -1;
+	r = VC_Mix(2, 1.0, v, &sum, grid, tag);
+	printf("return mismatch r=%d calls=%d sum=%g\n", r, calls, sum);
+	return 0;
+}
@@ -0,0 +1,60 @@
+/*
+ * Runs VC_Command.cpp generated with --read-cache against the runtime of
+ * runtime.h, whose subsystem keeps what was written.
+ */
+#include <stdio.h>
+#include <string.h>
+#include "runtime.h"
+#include "Odom.h"
+#include "VC_Command.h"
+
+static int reads()
+{
+	int n = 0;
+	for (size_t i = 0; i < trace.size(); i++) {
+		if (trace[i] == "send read Odom") n++;
+	}
+	return n;
+}
+
+static void write(double x, const char *step)
+{
+	struct VC_Odom o;
+	memset(&o, 0, sizeof(o));
+	o.x = x;
+	printf("%s r=%d\n", step, VC_Write_Odom(&o));
+}
+
+static void read(const char *step)
+{
+	struct VC_Odom o;
+	int r = VC_Read_Odom(&o);
+	printf("%s r=%d x=%g reads=%d\n", step, r, o.x, reads());
+}
+
+int main()
+{
+	unsigned long hits, misses;
+
+	VC_SetReadCacheMaxAge_Odom(100.0);
+	write(1, "write");
+	read("first read");
+	/* the subsystem's value changes, but the cached one is served */
+	structs["Odom"]["x"] = "2 ";
+	read("cached read");
+
+	write(3, "acknowledged write");
+	read("read after write");
+
+	write_result = -7;
+	write(4, "failed write");
+	read("read after failed write");
+	write_result = OpenROBO_Return_Success;
+
+	VC_SetReadCacheMaxAge_Odom(0.0);
+	read("expired read");
+
+	VC_GetReadCacheCount_Odom(&hits, &misses);
+	printf("count hits=%lu misses=%lu\n", hits, misses);
+	return 0;
+}
@@ -0,0 +1,43 @@
+/*
+ * Runs main of VC_Main.cpp generated with --dispatch-table. The runtime
+ * below hands every name in dispatch_names and dispatch_unknown to the
+ * lookup main passes to OpenROBO_MainWithLookup and reports what it found.
+ */
+#include <stdio.h>
+#include <string.h>
+#include "OpenROBO.h"
+
+/* defined by the test with a Message_<name> for each name, which sets dispatch_called to name */
+extern const char *const dispatch_names[];
+extern const int dispatch_name_count;
+extern const char *const dispatch_unknown[];
+extern const int dispatch_unknown_count;
+extern const char *dispatch_called;
+
+int OpenROBO_StartupMainThread(const char *n) { return OpenROBO_Return_Success; }
+int OpenROBO_Socket_MakeConnection(const char *a, int p) { return OpenROBO_Return_Success; }
+
+int OpenROBO_MainWithLookup(OpenROBO_MessageFunction_t (*find)(const char *name))
+{
+	int i, resolved = 0, wrong = 0, rejected = 0;
+	for (i = 0; i < dispatch_name_count; i++) {
+		OpenROBO_MessageFunction_t f = find(dispatch_names[i]);
+		dispatch_called = NULL;
+		if (f != NULL) {
+			f("message");
+		}
+		if (dispatch_called != NULL && strcmp(dispatch_called, dispatch_names[i]) == 0) {
+			resolved++;
+		} else {
+			wrong++;
+		}
+	}
+	for (i = 0; i < dispatch_unknown_count; i++) {
+		if (find(dispatch_unknown[i]) == NULL) {
+			rejected++;
+		}
+	}
+	printf("lookup resolved=%d wrong=%d rejected=%d\n", resolved, wrong, rejected);
+	/* main returns what the runtime returns */
+	return 3;
+}
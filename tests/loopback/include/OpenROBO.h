@@ -0,0 +1,32 @@
+/* the parts of the OpenROBO runtime API the generated sources use, served by runtime.h */
+#pragma once
+enum { OpenROBO_Return_Success = 0, OpenROBO_Return_NotUpdated = 1 };
+int OpenROBO_Message_GetBuffer(char **m);
+int OpenROBO_Message_MakeOperationMessage(char *m, const char *n);
+int OpenROBO_Message_MakeReturnMessage(char *m, const char *n);
+int OpenROBO_Message_MakeWaitMessage(char *m, const char *n);
+int OpenROBO_Message_MakeStopMessage(char *m, const char *n);
+int OpenROBO_Message_MakeReadMessage(char *m, const char *n);
+int OpenROBO_Message_MakeWriteMessage(char *m, const char *n);
+int OpenROBO_Message_SetReturnValue(char *m, int r);
+int OpenROBO_Message_GetReturnValue(const char *m, int *r);
+int OpenROBO_Message_GetTime(const char *m, double *t);
+int OpenROBO_Socket_SendReturnMessage(char *m);
+int OpenROBO_Socket_SendCommandMessage(const char *p, char *m);
+int OpenROBO_Socket_ReceiveReturnMessage(const char *p, char **m);
+#define OPENROBO_DECLARE_PARAM(T) \
+	int OpenROBO_Message_SetParam_##T(char *m, const char *n, const T *v); \
+	int OpenROBO_Message_GetParam_##T(const char *m, const char *n, T *v); \
+	int OpenROBO_Message_SetParam_##T##Array(char *m, const char *n, const T *v, int c); \
+	int OpenROBO_Message_GetParam_##T##Array(const char *m, const char *n, T *v, int c);
+OPENROBO_DECLARE_PARAM(double)
+OPENROBO_DECLARE_PARAM(float)
+OPENROBO_DECLARE_PARAM(int)
+/* main of a subsystem, served by dispatch.cpp */
+typedef void (*OpenROBO_MessageFunction_t)(const char *message);
+int OpenROBO_StartupMainThread(const char *n);
+int OpenROBO_Socket_MakeConnection(const char *a, int p);
+int OpenROBO_MainWithLookup(OpenROBO_MessageFunction_t (*find)(const char *name));
+/* the binary codec, served by runtime.h */
+int OpenROBO_Message_SetBinary(char *m, const char *data, int size);
+int OpenROBO_Message_GetBinary(const char *m, const char **data, int *size);
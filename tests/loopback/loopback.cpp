@@ -0,0 +1,96 @@
+/*
+ * Runs the Command side (TP) of VC_Command.cpp generated with --subscribe
+ * against the Message side (subsystem) of VC_Message.cpp through the
+ * runtime of runtime.h.
+ */
+#include <stdio.h>
+#include <string.h>
+#include "runtime.h"
+#include "Motion.h"
+#include "Odom.h"
+#include "Pose.h"
+#include "VC_Command.h"
+#include "VC_Message.h"
+
+static struct Odom odom;
+static struct Pose pose;
+
+static void runOperation(const std::string &name, char *m)
+{
+	static const struct { const char *name; void (*function)(const char*); } functions[] = {
+		{"Step", Message_Step},
+		{"Subscribe_Odom", Message_Subscribe_Odom},
+		{"Subscribe_Pose", Message_Subscribe_Pose},
+	};
+	for (size_t i = 0; i < sizeof(functions) / sizeof(functions[0]); i++) {
+		if (name == functions[i].name) functions[i].function(m);
+	}
+}
+
+static void fillRead(const std::string &name, char *r)
+{
+	if (name == "Pose") {
+		OpenROBO_Message_SetParam_int(r, "id", &pose.id);
+		OpenROBO_Message_SetParam_floatArray(r, "q", pose.q, 4);
+	}
+}
+
+/* the subsystem */
+int Step(int n)
+{
+	return n;
+}
+
+static void publishOdom(double x)
+{
+	odom.x = x;
+	odom.v[0] = x * 10;
+	VC_Publish_Odom(&odom);
+}
+
+int main()
+{
+	struct VC_Odom o;
+	struct VC_Pose q;
+	int r;
+	int before;
+
+	run_operation = runOperation;
+	fill_read = fillRead;
+	r = VC_Subscribe_Odom(0);
+	printf("subscribe r=%d queued=%d\n", r, (int)toTP.size());
+
+	publishOdom(1);
+	publishOdom(2);
+	pose.id = 7;
+	r = VC_Read_Pose(&q);
+	printf("read through pushes r=%d id=%d\n", r, q.id);
+	r = VC_Receive_Odom(&o);
+	printf("receive set aside r=%d x=%g v0=%g\n", r, o.x, o.v[0]);
+
+	r = VC_Start_Step(5);
+	publishOdom(3);
+	printf("start r=%d\n", r);
+	r = VC_Receive_Odom(&o);
+	printf("receive before return r=%d x=%g\n", r, o.x);
+	r = VC_Wait_Step();
+	printf("wait queued return r=%d\n", r);
+
+	VC_Subscribe_Pose(100);
+	before = pushes;
+	for (int k = 0; k < 10; k++) {
+		pose.id = k;
+		VC_Publish_Pose(&pose);
+	}
+	printf("rate limited pushes=%d\n", pushes - before);
+	r = VC_Receive_Pose(&q);
+	printf("receive pose r=%d id=%d\n", r, q.id);
+
+	r = VC_Unsubscribe_Odom();
+	before = pushes;
+	publishOdom(4);
+	printf("unsubscribe r=%d pushes=%d\n", r, pushes - before);
+	r = VC_Receive_Odom(&o);
+	printf("receive nothing r=%d queued=%d\n", r, (int)toTP.size());
+	return 0;
+}
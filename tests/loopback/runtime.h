@@ -0,0 +1,156 @@
+/*
+ * A fake OpenROBO runtime shared by the loopback harnesses. The Command
+ * side (TP) and the Message side (subsystem) run in one process and the
+ * runtime delivers messages in order like one connection: an operation is
+ * acked at once and the return of its MessageFunction follows as soon as
+ * it is sent, so it can be in front of or behind the pushes of
+ * XX_Publish_<struct>. A write stores the params of a struct when it
+ * succeeds and a read replies with the params stored last.
+ * Include it in exactly one source file.
+ */
+#include <deque>
+#include <map>
+#include <sstream>
+#include <string>
+#include <vector>
+#include "OpenROBO.h"
+
+struct Message {
+	std::string kind, name, binary;
+	std::map<std::string, std::string> params;
+	int ret;
+};
+
+static std::deque<Message*> toTP;
+static int pushes = 0;
+/* "send <kind> <name>" and "receive <name>" of every message of the TP, in order */
+static std::vector<std::string> trace;
+/* the params of each struct as last written */
+static std::map<std::string, std::map<std::string, std::string> > structs;
+/* what the subsystem returns for a write */
+static int write_result = OpenROBO_Return_Success;
+/* OpenROBO_Socket_SendCommandMessage fails with send_result for the struct or function named fail_send */
+static std::string fail_send;
+static int send_result = -5;
+/* flip the byte order marker of the binary of the next operation or return */
+static bool corrupt_operation = false, corrupt_return = false;
+/* set by the harness: runs the MessageFunction of an operation */
+static void (*run_operation)(const std::string &name, char *m) = NULL;
+/* set by the harness: adds the params of a read reply instead of the stored ones */
+static void (*fill_read)(const std::string &name, char *m) = NULL;
+
+int OpenROBO_Message_GetBuffer(char **m) { *m = (char*)new Message(); ((Message*)*m)->ret = 0; return 0; }
+static int make(char *m, const char *kind, const char *name) { ((Message*)m)->kind = kind; ((Message*)m)->name = name; return 0; }
+int OpenROBO_Message_MakeOperationMessage(char *m, const char *n) { return make(m, "operation", n); }
+int OpenROBO_Message_MakeReturnMessage(char *m, const char *n) { return make(m, "return", n); }
+int OpenROBO_Message_MakeWaitMessage(char *m, const char *n) { return make(m, "wait", n); }
+int OpenROBO_Message_MakeStopMessage(char *m, const char *n) { return make(m, "stop", n); }
+int OpenROBO_Message_MakeReadMessage(char *m, const char *n) { return make(m, "read", n); }
+int OpenROBO_Message_MakeWriteMessage(char *m, const char *n) { return make(m, "write", n); }
+int OpenROBO_Message_SetReturnValue(char *m, int r) { ((Message*)m)->ret = r; return 0; }
+int OpenROBO_Message_GetReturnValue(const char *m, int *r) { *r = ((Message*)m)->ret; return 0; }
+int OpenROBO_Message_GetTime(const char *m, double *t) { static double now; *t = ++now; return 0; }
+
+int OpenROBO_Message_SetBinary(char *m, const char *data, int size)
+{
+	((Message*)m)->binary.assign(data, size);
+	return 0;
+}
+
+int OpenROBO_Message_GetBinary(const char *m, const char **data, int *size)
+{
+	const Message *x = (const Message*)m;
+	if (x->binary.empty()) return -1;
+	*data = x->binary.data();
+	*size = (int)x->binary.size();
+	return 0;
+}
+
+template <class T> static int setParam(char *m, const char *n, const T *v, int c)
+{
+	std::ostringstream o;
+	for (int i = 0; i < c; i++) o << v[i] << " ";
+	((Message*)m)->params[n] = o.str();
+	return 0;
+}
+
+template <class T> static int getParam(const char *m, const char *n, T *v, int c)
+{
+	Message *x = (Message*)m;
+	if (!x->params.count(n)) return -1;
+	std::istringstream i(x->params[n]);
+	for (int k = 0; k < c; k++) i >> v[k];
+	return 0;
+}
+
+#define DEFINE_PARAM(T) \
+	int OpenROBO_Message_SetParam_##T(char *m, const char *n, const T *v) { return setParam(m, n, v, 1); } \
+	int OpenROBO_Message_GetParam_##T(const char *m, const char *n, T *v) { return getParam(m, n, v, 1); } \
+	int OpenROBO_Message_SetParam_##T##Array(char *m, const char *n, const T *v, int c) { return setParam(m, n, v, c); } \
+	int OpenROBO_Message_GetParam_##T##Array(const char *m, const char *n, T *v, int c) { return getParam(m, n, v, c); }
+DEFINE_PARAM(double)
+DEFINE_PARAM(float)
+DEFINE_PARAM(int)
+
+static void corrupt(Message *x)
+{
+	if (!x->binary.empty()) x->binary[0] ^= 0x7f;
+}
+
+int OpenROBO_Socket_SendReturnMessage(char *m)
+{
+	Message *x = (Message*)m;
+	if (x->params.count("_push")) pushes++;
+	if (corrupt_return) {
+		corrupt(x);
+		corrupt_return = false;
+	}
+	toTP.push_back(x);
+	return 0;
+}
+
+static void reply(const Message *request, int ret)
+{
+	char *r;
+	OpenROBO_Message_GetBuffer(&r);
+	OpenROBO_Message_MakeReturnMessage(r, request->name.c_str());
+	OpenROBO_Message_SetReturnValue(r, ret);
+	if (request->kind == "read") {
+		if (fill_read != NULL) {
+			fill_read(request->name, r);
+		} else {
+			((Message*)r)->params = structs[request->name];
+		}
+	}
+	toTP.push_back((Message*)r);
+}
+
+int OpenROBO_Socket_SendCommandMessage(const char *p, char *m)
+{
+	Message *x = (Message*)m;
+	if (x->name == fail_send) return send_result;
+	trace.push_back("send " + x->kind + " " + x->name);
+	if (x->kind == "operation") {
+		if (corrupt_operation) {
+			corrupt(x);
+			corrupt_operation = false;
+		}
+		reply(x, OpenROBO_Return_Success);
+		if (run_operation != NULL) run_operation(x->name, m);
+	} else if (x->kind == "read") {
+		reply(x, OpenROBO_Return_Success);
+	} else if (x->kind == "write") {
+		if (write_result == OpenROBO_Return_Success) structs[x->name] = x->params;
+		reply(x, write_result);
+	}
+	return 0;
+}
+
+int OpenROBO_Socket_ReceiveReturnMessage(const char *p, char **m)
+{
+	if (toTP.empty()) return -5;
+	*m = (char*)toTP.front();
+	toTP.pop_front();
+	trace.push_back("receive " + ((Message*)*m)->name);
+	return 0;
+}
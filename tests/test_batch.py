@@ -0,0 +1,33 @@
+"""
+Generates VC_Command.cpp with --batch from loopback/Odom.h and
+loopback/Pose.h and runs it through batch.cpp.
+"""
+import pytest
+
+from harness import run_harness
+
+
+@pytest.fixture(scope="module")
+def batch(tmpdir_factory):
+    return run_harness(str(tmpdir_factory.mktemp("batch")), "batch.cpp", ["Odom.h", "Pose.h"], ["--batch"], sources=["VC_Command.cpp"])
+
+
+def test_write_sends_every_request_before_the_replies(batch):
+    assert batch["write"] == {"r": "0", "order": "send:write:Odom,send:write:Pose,receive:Odom,receive:Pose"}
+
+
+def test_read_matches_the_replies_in_order(batch):
+    assert batch["read"] == {"r": "0", "x": "1.5", "v2": "3", "id": "7", "q3": "0.5",
+                             "order": "send:read:Odom,send:read:Pose,receive:Odom,receive:Pose"}
+
+
+def test_read_of_a_subset(batch):
+    assert batch["read one"] == {"r": "0", "x": "1.5", "order": "send:read:Odom,receive:Odom"}
+
+
+def test_failed_send_is_returned(batch):
+    assert batch["failed send"] == {"r": "-5", "x": "1.5", "queued": "0", "order": "send:read:Odom,receive:Odom"}
+
+
+def test_failed_write_consumes_every_reply(batch):
+    assert batch["failed write"] == {"r": "-7", "queued": "0", "order": "send:write:Odom,send:write:Pose,receive:Odom,receive:Pose"}
@@ -0,0 +1,31 @@
+"""
+Generates VC_Command.cpp/VC_Message.cpp with --codec binary from
+loopback/Mix.h and runs them against each other through binary.cpp.
+"""
+import pytest
+
+from harness import run_harness
+
+# OPENROBO_BINARY_LAYOUT_MISMATCH
+MISMATCH = "-1000"
+
+
+@pytest.fixture(scope="module")
+def binary(tmpdir_factory):
+    return run_harness(str(tmpdir_factory.mktemp("binary")), "binary.cpp", ["Mix.h"], ["--codec", "binary"])
+
+
+def test_params_round_trip(binary):
+    assert binary["round trip"] == {"r": "0", "v": "0.5,1,1.75", "sum": "3.25", "grid": "20,21,22,23", "tag": "mix", "calls": "1"}
+
+
+def test_function_error_is_returned(binary):
+    assert binary["function error"] == {"r": "-3", "calls": "2"}
+
+
+def test_layout_mismatch_of_the_operation(binary):
+    assert binary["operation mismatch"] == {"r": MISMATCH, "calls": "2"}
+
+
+def test_layout_mismatch_of_the_return(binary):
+    assert binary["return mismatch"] == {"r": MISMATCH, "calls": "3", "sum": "-1"}
@@ -0,0 +1,77 @@
+"""
+Generates VC_Main.cpp with --dispatch-table for many MessageFunctions and
+runs its main through loopback/dispatch.cpp, which looks every name up.
+"""
+import os
+import re
+import subprocess
+import sys
+from distutils.spawn import find_executable
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LOOPBACK_DIR = os.path.join(TESTS_DIR, "loopback")
+UTILS = os.path.join(os.path.dirname(TESTS_DIR), "OpenROBO_utils.py")
+CXX = find_executable("g++")
+
+NAMES = ["Fn_%d" % (n) for n in xrange(300)] + ["Step", "Stop", "S"]
+# near misses of the names, which hash into the same slots
+UNKNOWN = ["", "Fn", "Fn_", "fn_0", "Fn_0x", "Fn_00", "Fn_300", "Fn_1000", "St", "Ste", "Steps", "s", "Unknown"]
+
+
+def c_strings(names):
+    return ", ".join('"%s"' % (name) for name in names)
+
+
+@pytest.fixture(scope="module")
+def dispatch(tmpdir_factory):
+    if CXX is None:
+        pytest.skip("g++ is not installed")
+    work = str(tmpdir_factory.mktemp("dispatch"))
+    header_dir = os.path.join(work, "include")
+    src_dir = os.path.join(work, "src")
+    os.mkdir(header_dir)
+    os.mkdir(src_dir)
+    with open(os.path.join(header_dir, "Many.h"), "w") as f:
+        for name in NAMES:
+            f.write("/**\n * MessageFunction@OpenROBO\n * @param[in] n n\n */\nint %s(int n);\n\n" % (name))
+    subprocess.check_call([sys.executable, UTILS, "gen", "-q", "-n", "VC", "--header-dir", header_dir, "--out-src-dir", src_dir,
+                           "--out-header-dir", header_dir, "--no-cache", "--dispatch-table"])
+    stubs = os.path.join(src_dir, "stubs.cpp")
+    with open(stubs, "w") as f:
+        f.write('#include <stddef.h>\n#include "VC_Message.h"\n\n')
+        f.write("const char *dispatch_called = NULL;\n")
+        f.write("extern const char *const dispatch_names[] = {%s};\n" % (c_strings(NAMES)))
+        f.write("extern const int dispatch_name_count = %d;\n" % (len(NAMES)))
+        f.write("extern const char *const dispatch_unknown[] = {%s};\n" % (c_strings(UNKNOWN)))
+        f.write("extern const int dispatch_unknown_count = %d;\n\n" % (len(UNKNOWN)))
+        for name in NAMES:
+            f.write('void Message_%s(const char* message) { dispatch_called = "%s"; }\n' % (name, name))
+    main_c = os.path.join(src_dir, "VC_Main.cpp")
+    binary = os.path.join(work, "dispatch")
+    subprocess.check_call([CXX, "-Wall", "-I", header_dir, "-I", os.path.join(LOOPBACK_DIR, "include"), "-o", binary,
+                           os.path.join(LOOPBACK_DIR, "dispatch.cpp"), main_c, stubs])
+    proc = subprocess.Popen([binary], stdout=subprocess.PIPE)
+    output = proc.communicate()[0].decode()
+    with open(main_c) as f:
+        source = f.read()
+    return proc.returncode, dict(re.findall(r"(\w+)=(\S+)", output)), source
+
+
+def test_main_dispatches_through_the_table(dispatch):
+    returncode, _, source = dispatch
+    assert "OpenROBO_MainWithLookup(VC_FindMessageFunction)" in source
+    assert "messageFunctionEntry" not in source
+    assert returncode == 3
+
+
+def test_every_name_resolves_to_its_function(dispatch):
+    _, results, _ = dispatch
+    assert results["resolved"] == str(len(NAMES))
+    assert results["wrong"] == "0"
+
+
+def test_unknown_names_are_rejected(dispatch):
+    _, results, _ = dispatch
+    assert results["rejected"] == str(len(UNKNOWN))
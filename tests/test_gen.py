@@ -0,0 +1,195 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+import OpenROBO_utils
+from OpenROBO_utils import CHeaderScanner, HeaderParseCache, write_if_changed
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LOOPBACK_DIR = os.path.join(TESTS_DIR, "loopback")
+GOLDEN_DIR = os.path.join(TESTS_DIR, "golden")
+UTILS = os.path.join(os.path.dirname(TESTS_DIR), "OpenROBO_utils.py")
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_parse_cache_misses_when_mtime_or_size_changes(tmpdir):
+    header = tmpdir.join("Motion.h")
+    header.write(read(os.path.join(LOOPBACK_DIR, "Motion.h")))
+    path = str(header)
+    cache = HeaderParseCache(str(tmpdir.join("cache")))
+    CHeaderScanner(cache).parseFromFile(path)
+    assert cache.lookupStat(path, os.stat(path)) is not None
+
+    # whole seconds, so that the float mtimes compare exactly
+    os.utime(path, (1000000000, 1000000000))
+    assert cache.lookupStat(path, os.stat(path)) is None
+    # the content is unchanged, so the record is found by digest and indexed again
+    CHeaderScanner(cache).parseFromFile(path)
+    assert cache.lookupStat(path, os.stat(path)) is not None
+
+    header.write(header.read() + "\n")
+    os.utime(path, (1000000000, 1000000000))
+    assert cache.lookupStat(path, os.stat(path)) is None
+
+
+def test_parse_cache_save_replaces_the_old_file(tmpdir):
+    path = str(tmpdir.join("Motion.h"))
+    with open(path, "w") as f:
+        f.write(read(os.path.join(LOOPBACK_DIR, "Motion.h")))
+    cache_path = str(tmpdir.join("cache"))
+    cache = HeaderParseCache(cache_path)
+    CHeaderScanner(cache).parseFromFile(path)
+    cache.save()
+    cache = HeaderParseCache(cache_path)
+    assert cache.lookupStat(path, os.stat(path)) is not None
+    os.utime(path, (1000000000, 1000000000))
+    CHeaderScanner(cache).parseFromFile(path)
+    assert cache.dirty
+    cache.save()
+    assert HeaderParseCache(cache_path).lookupStat(path, os.stat(path)) is not None
+    assert sorted(os.listdir(str(tmpdir))) == ["Motion.h", "cache"]
+
+
+def test_parse_cache_save_failure_leaves_no_tmp_file(tmpdir, monkeypatch):
+    path = str(tmpdir.join("Motion.h"))
+    with open(path, "w") as f:
+        f.write(read(os.path.join(LOOPBACK_DIR, "Motion.h")))
+    cache = HeaderParseCache(str(tmpdir.join("cache")))
+    CHeaderScanner(cache).parseFromFile(path)
+
+    def dump(*args):
+        raise IOError("disk full")
+    monkeypatch.setattr(OpenROBO_utils.cPickle, "dump", dump)
+    with pytest.raises(IOError):
+        cache.save()
+    assert sorted(os.listdir(str(tmpdir))) == ["Motion.h"]
+
+
+def test_write_if_changed_keeps_unchanged_files(tmpdir):
+    path = str(tmpdir.join("VC_Command.cpp"))
+    assert write_if_changed(path, "int a;\n")
+    os.utime(path, (1000000000, 1000000000))
+    assert not write_if_changed(path, "int a;\n")
+    assert os.stat(path).st_mtime == 1000000000
+    assert write_if_changed(path, "int b;\n")
+    assert os.stat(path).st_mtime != 1000000000
+    assert read(path) == "int b;\n"
+    assert sorted(os.listdir(str(tmpdir))) == ["VC_Command.cpp"]
+
+
+def gen(tmpdir, name, *args, **kwargs):
+    """
+    generates the sources of the headers in loopback/ and of
+    kwargs["headers"], {name: text}, into a new directory and returns
+    {file: content}
+    """
+    out_dir = tmpdir.mkdir(name)
+    header_dir = out_dir.mkdir("include")
+    src_dir = out_dir.mkdir("src")
+    for header in ("Motion.h", "Odom.h", "Pose.h"):
+        header_dir.join(header).write(read(os.path.join(LOOPBACK_DIR, header)))
+    for header, text in kwargs.get("headers", {}).items():
+        header_dir.join(header).write(text)
+    run_gen(str(header_dir), str(src_dir), *args)
+    return outputs(str(out_dir))
+
+
+def run_gen(header_dir, src_dir, *args):
+    subprocess.check_call([sys.executable, UTILS, "gen", "-q", "-n", "VC", "--header-dir", header_dir,
+                           "--out-src-dir", src_dir, "--out-header-dir", header_dir, "--no-cache"] + list(args))
+
+
+def outputs(out_dir):
+    files = {}
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            files[os.path.relpath(path, out_dir)] = read(path)
+    return files
+
+
+def test_gen_rewrites_only_changed_outputs(tmpdir):
+    gen(tmpdir, "out")
+    src_dir = str(tmpdir.join("out", "src"))
+    header_dir = str(tmpdir.join("out", "include"))
+    paths = [os.path.join(src_dir, name) for name in os.listdir(src_dir)]
+    paths += [os.path.join(header_dir, name) for name in os.listdir(header_dir) if name.startswith("VC_")]
+    for path in paths:
+        os.utime(path, (1000000000, 1000000000))
+    run_gen(header_dir, src_dir)
+    assert all(os.stat(path).st_mtime == 1000000000 for path in paths)
+
+    old = dict((path, read(path)) for path in paths)
+    with open(os.path.join(header_dir, "Motion.h"), "a") as f:
+        f.write("/**\n * MessageFunction@OpenROBO\n * @param[in] n n\n */\nint Stop(int n);\n")
+    run_gen(header_dir, src_dir)
+    changed = set(path for path in paths if read(path) != old[path])
+    assert changed and len(changed) < len(paths)
+    for path in paths:
+        assert (os.stat(path).st_mtime != 1000000000) == (path in changed), path
+
+
+def test_gen_jobs_output_is_identical(tmpdir):
+    headers = {}
+    for n in xrange(12):
+        headers["Extra%d.h" % (n)] = "".join("/**\n * MessageFunction@OpenROBO\n * @param[in] x x\n */\nint Extra%d_%d(int x);\n" % (n, k) for k in xrange(5))
+    serial = gen(tmpdir, "jobs1", "-j", "1", headers=headers)
+    assert "Extra11_4" in serial[os.path.join("src", "VC_Command.cpp")]
+    assert gen(tmpdir, "jobs4", "-j", "4", headers=headers) == serial
+
+
+@pytest.mark.parametrize("name", ["TP", "VC"])
+def test_default_output_matches_the_original_generator(tmpdir, name):
+    # golden/<name> was generated from golden/include and loopback/ by the
+    # generator before any option was added; the default output must not change
+    header_dir = tmpdir.mkdir("headers")
+    header_dir.join("Golden.h").write(read(os.path.join(GOLDEN_DIR, "include", "Golden.h")))
+    for header in ("Motion.h", "Odom.h", "Pose.h"):
+        header_dir.join(header).write(read(os.path.join(LOOPBACK_DIR, header)))
+    out_dir = tmpdir.mkdir("out")
+    subprocess.check_call([sys.executable, UTILS, "gen", "-q", "-n", name, "--header-dir", str(header_dir), "--no-cache",
+                           "--out-src-dir", str(out_dir.mkdir("src")), "--out-header-dir", str(out_dir.mkdir("include"))])
+    assert outputs(str(out_dir)) == outputs(os.path.join(GOLDEN_DIR, name))
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_watch_survives_bad_headers(tmpdir):
+    header_dir = tmpdir.mkdir("include")
+    src_dir = tmpdir.mkdir("src")
+    header_dir.join("Motion.h").write(read(os.path.join(LOOPBACK_DIR, "Motion.h")))
+    command = src_dir.join("VC_Command.cpp")
+    stderr = tmpdir.join("stderr")
+    with open(str(stderr), "w") as err:
+        proc = subprocess.Popen([sys.executable, UTILS, "gen", "-q", "-n", "VC", "--header-dir", str(header_dir), "--out-src-dir", str(src_dir),
+                                 "--out-header-dir", str(header_dir), "--no-cache", "--dispatch-table", "--watch", "--watch-interval", "0.05"], stderr=err)
+    try:
+        wait_for(command.check)
+        # the parser rejects the pointer
+        header_dir.join("Bad.h").write("/**\n * ReadWrite@OpenROBO\n */\nstruct Bad {\n\tint *p;\n};\n")
+        wait_for(lambda: "has pointer" in stderr.read())
+        header_dir.join("Bad.h").write("/**\n * ReadWrite@OpenROBO\n */\nstruct Bad {\n\tint p;\n};\n")
+        wait_for(lambda: "Read_Bad" in command.read())
+        # the dispatch table rejects the second Step
+        header_dir.join("Again.h").write(read(os.path.join(LOOPBACK_DIR, "Motion.h")))
+        wait_for(lambda: "more than once" in stderr.read())
+        header_dir.join("Again.h").write(read(os.path.join(LOOPBACK_DIR, "Motion.h")).replace("Step", "Again"))
+        wait_for(lambda: "Again" in command.read())
+        assert proc.poll() is None
+    finally:
+        if proc.poll() is None:
+            proc.send_signal(signal.SIGINT)
+        proc.wait()
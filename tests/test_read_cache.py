@@ -0,0 +1,32 @@
+"""
+Generates VC_Command.cpp with --read-cache from loopback/Odom.h and runs it
+through cache.cpp.
+"""
+import pytest
+
+from harness import run_harness
+
+
+@pytest.fixture(scope="module")
+def cache(tmpdir_factory):
+    return run_harness(str(tmpdir_factory.mktemp("cache")), "cache.cpp", ["Odom.h"], ["--read-cache", "0.5"], sources=["VC_Command.cpp"])
+
+
+def test_hit_serves_the_cached_value_without_a_round_trip(cache):
+    assert cache["first read"] == {"r": "0", "x": "1", "reads": "1"}
+    assert cache["cached read"] == {"r": "0", "x": "1", "reads": "1"}
+
+
+def test_acknowledged_write_invalidates(cache):
+    assert cache["acknowledged write"] == {"r": "0"}
+    assert cache["read after write"] == {"r": "0", "x": "3", "reads": "2"}
+
+
+def test_failed_write_leaves_the_cache_alone(cache):
+    assert cache["failed write"] == {"r": "-7"}
+    assert cache["read after failed write"] == {"r": "0", "x": "3", "reads": "2"}
+
+
+def test_expired_entry_is_read_again(cache):
+    assert cache["expired read"] == {"r": "0", "x": "3", "reads": "3"}
+    assert cache["count"] == {"hits": "2", "misses": "3"}
@@ -0,0 +1,38 @@
+"""
+Generates VC_Command.cpp/VC_Message.cpp with --subscribe from the headers in
+loopback/ and runs them against each other through loopback.cpp.
+"""
+import pytest
+
+from harness import run_harness
+
+
+@pytest.fixture(scope="module")
+def loopback(tmpdir_factory):
+    work = str(tmpdir_factory.mktemp("loopback"))
+    return run_harness(work, "loopback.cpp", ["Motion.h", "Odom.h", "Pose.h"], ["--subscribe"])
+
+
+def test_subscribe_consumes_ack_and_return(loopback):
+    assert loopback["subscribe"] == {"r": "0", "queued": "0"}
+    assert loopback["unsubscribe"] == {"r": "0", "pushes": "0"}
+
+
+def test_replies_skip_pushes(loopback):
+    assert loopback["read through pushes"] == {"r": "0", "id": "7"}
+    assert loopback["receive set aside"] == {"r": "0", "x": "2", "v0": "20"}
+
+
+def test_reply_met_while_waiting_for_push_is_queued(loopback):
+    assert loopback["start"]["r"] == "0"
+    assert loopback["receive before return"] == {"r": "0", "x": "3"}
+    assert loopback["wait queued return"] == {"r": "5"}
+
+
+def test_publish_is_rate_limited(loopback):
+    assert loopback["rate limited"] == {"pushes": "1"}
+    assert loopback["receive pose"] == {"r": "0", "id": "0"}
+
+
+def test_receive_without_push_returns_error(loopback):
+    assert loopback["receive nothing"] == {"r": "-5", "queued": "0"}
@@ -0,0 +1,176 @@
+import random
+import socket
+import threading
+
+import pytest
+
+import OpenROBO_utils
+from faults import DelayedSocket, DroppingSocket, FlakyProxy, FragmentingSocket
+from OpenROBO_utils import SYNC_FEATURES, SourceCodeSync, SyncMulticastReceiver, SyncStream
+
+
+def test_slow_subsystem_does_not_stall_the_others(loopback_sync):
+    # nobody waits for the files of the slow subsystem, which pulls everyone's
+    sync = loopback_sync(['SLOW', 'A', 'B', 'C'], pulls={'A': ['B', 'C'], 'B': ['A', 'C'], 'C': ['A', 'B']})
+    finish_times = sync.run(client_wrappers={'SLOW': lambda sock: DelayedSocket(sock, 0.1)})
+    sync.verify()
+    fast = max(finish_times[name] for name in ['A', 'B', 'C'])
+    assert fast < finish_times['SLOW'] / 2
+
+
+def test_frames_are_exact_under_fragmentation():
+    a, b = socket.socketpair()
+    sync = SourceCodeSync('TEST')
+    rng = random.Random(1)
+    frames = ["".join(chr(rng.randint(0, 255)) for _ in xrange(size)) for size in [1, 7, 8, 9, 63, 64, 65, 1000, 70000]]
+    writer = SyncStream(FragmentingSocket(a, 5, random.Random(2)))
+    # a buffer smaller than most frames makes them span several receives
+    reader = SyncStream(FragmentingSocket(b, 3, random.Random(3)), buffer_size=64)
+
+    def send():
+        for frame in frames:
+            sync.sendString(writer, frame)
+        sync.sendNone(writer)
+        sync.sendString(writer, frames[-1])
+    t = threading.Thread(target=send)
+    t.start()
+    try:
+        for frame in frames:
+            assert sync.recvString(reader) == (frame, len(frame))
+        assert sync.recvString(reader) == (None, 0)
+        size = reader.readSize()
+        assert "".join(chunk.tobytes() for chunk in reader.readChunks(size)) == frames[-1]
+    finally:
+        t.join()
+        a.close()
+        b.close()
+
+
+@pytest.mark.parametrize('features', [SYNC_FEATURES, ('manifest', 'pipeline', 'sha1', 'resume'), ('manifest', 'zlib=6'), ()],
+                         ids=['all', 'no-bundle', 'no-pipeline', 'original'])
+def test_sync_under_fragmentation(loopback_sync, features):
+    sync = loopback_sync(['A', 'B', 'C'])
+    rng = random.Random(4)
+
+    def fragment(sock):
+        return FragmentingSocket(sock, 7, random.Random(rng.random()))
+    sync.run(features=features, server_wrapper=fragment, client_wrappers=dict((name, fragment) for name in sync.names))
+    sync.verify()
+
+
+def test_resync_sends_only_changed_files(loopback_sync):
+    sync = loopback_sync(['A', 'B', 'C'])
+    sync.run()
+    sync.verify()
+    assert sync.received('TP') == sorted('%s_Command.%s' % (name, ext) for name in sync.names for ext in ['cpp', 'h'])
+
+    sync.run()
+    assert sync.received('TP') == []
+    assert all(sync.received(name) == [] for name in sync.names)
+
+    sync.write('A', 'cpp', sync.randomSource(20000))
+    sync.run()
+    sync.verify()
+    assert sync.received('TP') == ['A_Command.cpp']
+    assert sync.received('A') == []
+    assert sync.received('B') == sync.received('C') == ['A_Command.cpp']
+
+
+def client_sends(loopback_sync, names, features):
+    sync = loopback_sync(names)
+    sync.run(features=features)
+    sync.verify()
+    return [sync.clients[name].sends for name in names]
+
+
+def test_pipeline_asks_for_all_peers_at_once(loopback_sync):
+    names = ['A', 'B', 'C', 'D', 'E']
+    pipelined = client_sends(loopback_sync, names, SYNC_FEATURES)
+    unpipelined = client_sends(loopback_sync, names, tuple(f for f in SYNC_FEATURES if f not in ('pipeline', 'bundle')))
+    # one request for all four peers instead of one round trip for each
+    assert [n - p for p, n in zip(pipelined, unpipelined)] == [len(names) - 2] * len(names)
+
+
+def killed_sync(loopback_sync, features):
+    # every connection the proxy kills dies in the middle of a file
+    sync = loopback_sync(['A', 'B', 'C'], size=200000)
+    proxies = []
+
+    def proxy(port):
+        proxies.append(FlakyProxy(port, 150000, 1.0, random.Random(1), min_bytes=50000, max_kills=3))
+        return proxies[0]
+    sync.run(features=features, proxy=proxy, retries=10)
+    sync.verify()
+    assert proxies[0].kills == 3
+    assert sum(client.reconnects for client in sync.clients.values()) == 3
+    return [r['offset'] for name in ['TP'] + sync.names for r in sync.records(name, 'recv')]
+
+
+def test_killed_transfers_resume(loopback_sync):
+    assert any(offset > 0 for offset in killed_sync(loopback_sync, SYNC_FEATURES))
+
+
+def test_killed_transfers_restart_without_resume(loopback_sync):
+    features = tuple(feature for feature in SYNC_FEATURES if feature != 'resume')
+    assert all(offset == 0 for offset in killed_sync(loopback_sync, features))
+
+
+
+def test_reconnect_does_not_count_as_another_subsystem(loopback_sync):
+    # A's first connection is killed and A reconnects before B has connected at all
+    sync = loopback_sync(['A', 'B'])
+    proxies = []
+
+    def proxy(port):
+        proxies.append(FlakyProxy(port, 200, 1.0, random.Random(1), min_bytes=20, max_kills=1))
+        return proxies[0]
+    sync.run(proxy=proxy, retries=10, delays={'B': 1.0})
+    sync.verify()
+    assert proxies[0].kills == 1
+    assert sync.clients['A'].reconnects == 1
+    assert sync.received('A') == ['B_Command.cpp', 'B_Command.h']
+
+MULTICAST_GROUP = "239.255.42.99"
+
+
+def multicast_port():
+    """ a port datagrams to MULTICAST_GROUP on the loopback arrive at; skips the test without one """
+    port = random.randint(40000, 60000)
+    try:
+        receiver = SyncMulticastReceiver(MULTICAST_GROUP, port, interface='127.0.0.1')
+    except socket.error as e:
+        pytest.skip("no multicast: %s" % (e))
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton('127.0.0.1'))
+        sock.sendto(OpenROBO_utils.SYNC_MULTICAST_HEADER.pack("probe000", 0), (MULTICAST_GROUP, port))
+        arrived = receiver.collect("probe000", [0])
+    except socket.error as e:
+        pytest.skip("no multicast: %s" % (e))
+    finally:
+        sock.close()
+        receiver.close()
+    if not arrived:
+        pytest.skip("no multicast on the loopback")
+    return port
+
+
+def test_lost_datagrams_are_repaired_over_tcp(loopback_sync, monkeypatch):
+    port = multicast_port()
+    receivers = []
+
+    class LossyMulticastReceiver(SyncMulticastReceiver):
+        def receive(self):
+            self.sock = DroppingSocket(self.sock, 5)
+            receivers.append(self)
+            SyncMulticastReceiver.receive(self)
+    monkeypatch.setattr(OpenROBO_utils, 'SyncMulticastReceiver', LossyMulticastReceiver)
+    sync = loopback_sync(['A', 'B', 'C'], size=50000)
+    sync.run(multicast="%s:%d" % (MULTICAST_GROUP, port))
+    sync.verify()
+    assert len(receivers) == 3 and all(r.sock.dropped > 0 for r in receivers)
+    repairs = [r['tcp_chunks'] for name in sync.names for r in sync.records(name, 'multicast')]
+    assert len(repairs) == 3 and all(n > 0 for n in repairs)
+    assert sync.server.multicast_repairs == sum(repairs)
+    # the repaired files are complete, so no peer file is sent again over TCP
+    assert all(sync.received(name) == [] for name in sync.names)